@@ -0,0 +1,259 @@
+# analytics.py
+"""
+Occupancy, ADR and RevPAR per hotel and room class, per day.
+
+Every stay overlapping the window that was neither cancelled nor a no-show
+is expanded into room-nights with a difference array instead of a loop over
+nights: +1 on the check-in day and -1 on the check-out day of its class row,
+then a cumulative sum along the days gives the rooms sold each night.
+Revenue is spread evenly over a stay's nights the same way. Supply is the
+number of rooms per class.
+
+    occupancy % = sold / rooms
+    ADR         = revenue / sold
+    RevPAR      = revenue / rooms
+
+Revenue is what was paid for the booking (Payment); rooms of a group booking
+use their quoted price, since the group's one payment sits on the lead booking.
+Archived bookings (archive.py) are only read with include_archive=True.
+
+Usage:
+    python analytics.py bench [classes] [bookings] [days]
+"""
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from archive import tables
+from database import fetch_all, read_connection
+
+SUPPLY_SQL = """
+    SELECT hc.class_id, hc.class_name, h.hotel_id, h.hotel_name, COUNT(r.room_id) AS rooms
+    FROM Hotel_Class hc
+    JOIN Hotel h ON h.hotel_id = hc.hotel_id
+    JOIN Rooms r ON r.class_id = hc.class_id
+    {where}
+    GROUP BY hc.class_id, hc.class_name, h.hotel_id, h.hotel_name
+    ORDER BY h.hotel_id, hc.class_id
+"""
+
+# day offsets from the window start come back as plain integers
+STAYS_SQL = """
+    SELECT r.class_id,
+           DATEDIFF(b.check_in, %s) AS ci,
+           DATEDIFF(b.check_out, %s) AS co,
+           CASE WHEN b.group_id IS NOT NULL THEN COALESCE(b.quoted_amt, 0)
+                ELSE (SELECT COALESCE(SUM(p.pay_amt), 0) FROM {payment} p WHERE p.book_id = b.book_id)
+           END AS amount
+    FROM {booking} b
+    JOIN Rooms r ON r.room_id = b.room_id
+    WHERE b.booking_status <> 'Cancelled' AND b.stay_status <> 'NoShow'
+      AND b.check_in < %s AND b.check_out > %s
+      {where}
+"""
+
+CHUNK_SIZE = 50000
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def room_nights(rows, check_ins, check_outs, amounts, n_rows, n_days):
+    """
+    Rooms sold and revenue per (row, day), each of shape (n_rows, n_days).
+    Stays are given as row index, check-in and check-out day offsets from the
+    window start (check-out exclusive) and amount; parts outside the window
+    are cut off, but the amount is still spread over all the stay's nights.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    ci = np.asarray(check_ins, dtype=np.int64)
+    co = np.asarray(check_outs, dtype=np.int64)
+    nightly = np.asarray(amounts, dtype=float) / np.maximum(co - ci, 1)
+    ci_w, co_w = np.clip(ci, 0, n_days), np.clip(co, 0, n_days)
+    keep = co_w > ci_w
+    width = n_days + 1  # one spare column takes the -1 of stays ending after the window
+    size = n_rows * width
+    start = rows[keep] * width + ci_w[keep]
+    end = rows[keep] * width + co_w[keep]
+
+    diff = np.bincount(start, minlength=size) - np.bincount(end, minlength=size)
+    sold = np.cumsum(diff.reshape(n_rows, width), axis=1)[:, :n_days]
+    rate = nightly[keep]
+    rdiff = (np.bincount(start, weights=rate, minlength=size)
+             - np.bincount(end, weights=rate, minlength=size))
+    revenue = np.cumsum(rdiff.reshape(n_rows, width), axis=1)[:, :n_days]
+    return sold, revenue
+
+
+def _ratio(num, den):
+    out = np.full(np.shape(num), np.nan)
+    np.divide(num, den, out=out, where=np.asarray(den) > 0)
+    return out
+
+
+def _num(v, digits=2):
+    return None if np.isnan(v) else round(float(v), digits)
+
+
+class Occupancy:
+    """Daily rooms sold and revenue for `classes` over the nights start .. end-1."""
+
+    def __init__(self, classes, start, end, sold, revenue):
+        self.classes = list(classes)
+        self.start, self.end = start, end
+        self.rooms = np.array([c['rooms'] for c in self.classes], dtype=float)
+        self.sold = sold
+        self.revenue = revenue
+
+    @classmethod
+    def load(cls, start, end, hotel_id=None, include_archive=False):
+        """Read supply and stays (from a replica when configured) for [start, end)."""
+        if (end - start).days <= 0:
+            raise ValueError("end must be after start")
+        if hotel_id:
+            classes = fetch_all(SUPPLY_SQL.format(where="WHERE h.hotel_id = %s"), (hotel_id,), cached=True)
+        else:
+            classes = fetch_all(SUPPLY_SQL.format(where=""), cached=True)
+        n_days = (end - start).days
+        class_ids = np.array([c['class_id'] for c in classes], dtype=np.int64)
+        if not classes:
+            empty = np.zeros((0, n_days))
+            return cls(classes, start, end, empty, empty)
+
+        query = STAYS_SQL.format(where="AND b.hotel_id = %s" if hotel_id else "",
+                                 **tables(include_archive))
+        params = (start, start, end, start) + ((hotel_id,) if hotel_id else ())
+        parts = []
+        with read_connection() as conn:
+            cur = conn.cursor(buffered=False)
+            cur.execute(query, params)
+            while True:
+                chunk = cur.fetchmany(CHUNK_SIZE)
+                if not chunk:
+                    break
+                parts.append(np.array([(r[0], r[1], r[2], float(r[3])) for r in chunk], dtype=float))
+            cur.close()
+        stays = np.concatenate(parts) if parts else np.zeros((0, 4))
+
+        # class_id -> matrix row; classes without rooms (not in supply) are dropped
+        order = np.argsort(class_ids)
+        pos = np.searchsorted(class_ids[order], stays[:, 0].astype(np.int64))
+        pos = np.minimum(pos, len(order) - 1)
+        known = class_ids[order][pos] == stays[:, 0]
+        sold, revenue = room_nights(order[pos][known], stays[known, 1], stays[known, 2],
+                                    stays[known, 3], len(classes), n_days)
+        return cls(classes, start, end, sold, revenue)
+
+    @property
+    def dates(self):
+        return [self.start + timedelta(days=d) for d in range(self.sold.shape[1])]
+
+    def _rollup(self, level):
+        """(labels, sold, revenue, rooms) per hotel or per class."""
+        if level == 'class':
+            labels = [{'hotel_id': c['hotel_id'], 'hotel_name': c['hotel_name'],
+                       'class_id': c['class_id'], 'class_name': c['class_name']} for c in self.classes]
+            return labels, self.sold, self.revenue, self.rooms
+        hotel_ids = [c['hotel_id'] for c in self.classes]
+        unique, idx = np.unique(hotel_ids, return_inverse=True)
+        names = {c['hotel_id']: c['hotel_name'] for c in self.classes}
+        labels = [{'hotel_id': int(h), 'hotel_name': names[h]} for h in unique]
+        sold = np.zeros((len(unique), self.sold.shape[1]))
+        revenue = np.zeros_like(sold)
+        np.add.at(sold, idx, self.sold)
+        np.add.at(revenue, idx, self.revenue)
+        return labels, sold, revenue, np.bincount(idx, weights=self.rooms, minlength=len(unique))
+
+    def summary(self, level='hotel'):
+        """Totals over the whole window, one row per hotel (or class)."""
+        labels, sold, revenue, rooms = self._rollup(level)
+        n_days = sold.shape[1]
+        sold, revenue, supply = sold.sum(axis=1), revenue.sum(axis=1), rooms * n_days
+        occ, adr, revpar = _ratio(sold * 100, supply), _ratio(revenue, sold), _ratio(revenue, supply)
+        return [dict(label, rooms=int(rooms[k]), room_nights=int(supply[k]), sold=int(sold[k]),
+                     occupancy_pct=_num(occ[k], 1), revenue=round(float(revenue[k]), 2),
+                     adr=_num(adr[k]), revpar=_num(revpar[k]))
+                for k, label in enumerate(labels)]
+
+    def totals(self):
+        """Occupancy, ADR and RevPAR over everything loaded."""
+        sold, revenue = self.sold.sum(), self.revenue.sum()
+        supply = self.rooms.sum() * self.sold.shape[1]
+        return {'rooms': int(self.rooms.sum()), 'sold': int(sold), 'revenue': round(float(revenue), 2),
+                'occupancy_pct': _num(_ratio(sold * 100, supply), 1),
+                'adr': _num(_ratio(revenue, sold)), 'revpar': _num(_ratio(revenue, supply))}
+
+    def daily(self, level='hotel'):
+        """One row per hotel (or class) per day."""
+        labels, sold, revenue, rooms = self._rollup(level)
+        occ = _ratio(sold * 100, rooms[:, None])
+        adr, revpar = _ratio(revenue, sold), _ratio(revenue, rooms[:, None])
+        dates = self.dates
+        return [dict(label, date=dates[d], rooms=int(rooms[k]), sold=int(sold[k, d]),
+                     occupancy_pct=_num(occ[k, d], 1), revenue=round(float(revenue[k, d]), 2),
+                     adr=_num(adr[k, d]), revpar=_num(revpar[k, d]))
+                for k, label in enumerate(labels) for d in range(len(dates))]
+
+    def calendar(self):
+        """One row per day across everything loaded, for the calendar heatmap."""
+        sold, revenue, rooms = self.sold.sum(axis=0), self.revenue.sum(axis=0), self.rooms.sum()
+        occ, adr, revpar = _ratio(sold * 100, rooms), _ratio(revenue, sold), _ratio(revenue, rooms)
+        out = []
+        for d, day in enumerate(self.dates):
+            out.append({
+                'date': day.isoformat(),
+                'week': (day - timedelta(days=day.weekday())).isoformat(),
+                'weekday': WEEKDAYS[day.weekday()],
+                'sold': int(sold[d]),
+                'occupancy_pct': _num(occ[d], 1),
+                'adr': _num(adr[d]),
+                'revpar': _num(revpar[d]),
+            })
+        return out
+
+
+def occupancy(start, end, hotel_id=None, include_archive=False):
+    return Occupancy.load(start, end, hotel_id, include_archive)
+
+
+# ---------- benchmark: vectorized vs per-night loop ----------
+def bench(n_classes=500, n_bookings=1000000, n_days=365):
+    import random
+    rnd = random.Random(1)
+    rows = np.array([rnd.randrange(n_classes) for _ in range(n_bookings)])
+    ci = np.array([rnd.randrange(-10, n_days) for _ in range(n_bookings)])
+    co = ci + np.array([rnd.randint(1, 7) for _ in range(n_bookings)])
+    amounts = np.array([rnd.randint(2000, 20000) for _ in range(n_bookings)], dtype=float)
+    nights = int(np.clip(co, 0, n_days).sum() - np.clip(ci, 0, n_days).sum())
+
+    t0 = time.perf_counter()
+    sold, revenue = room_nights(rows, ci, co, amounts, n_classes, n_days)
+    t1 = time.perf_counter()
+
+    # reference: one increment per booking per night, on a sample
+    n_loop = min(n_bookings, 100000)
+    t2 = time.perf_counter()
+    loop_sold = np.zeros((n_classes, n_days))
+    loop_rev = np.zeros((n_classes, n_days))
+    for k in range(n_loop):
+        rate = amounts[k] / (co[k] - ci[k])
+        for d in range(max(ci[k], 0), min(co[k], n_days)):
+            loop_sold[rows[k], d] += 1
+            loop_rev[rows[k], d] += rate
+    t3 = time.perf_counter()
+    s_sold, s_rev = room_nights(rows[:n_loop], ci[:n_loop], co[:n_loop], amounts[:n_loop],
+                                n_classes, n_days)
+
+    print(f"{n_bookings:,} bookings, {nights:,} room-nights, {n_classes} classes x {n_days} days")
+    print(f"vectorized            {(t1 - t0) * 1000:8.1f} ms")
+    print(f"per-night loop        {(t3 - t2) * 1000:8.1f} ms  ({n_loop:,} bookings, "
+          f"~{(t3 - t2) * n_bookings / n_loop:.1f} s for all)")
+    print(f"max difference        sold {np.abs(s_sold - loop_sold).max():.0f}, "
+          f"revenue {np.abs(s_rev - loop_rev).max():.4f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(*[int(a) for a in sys.argv[2:5]])
+    else:
+        print(__doc__)
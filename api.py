@@ -0,0 +1,482 @@
+# api.py
+"""
+Async HTTP API for channel managers and kiosks (ASGI, Starlette).
+
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+
+The endpoints reuse the SQL and logic of auth.py, catalog.py, availability.py,
+pricing.py and booking.py, but run on an aiomysql pool so one process serves
+many concurrent requests while their queries wait on MySQL.
+
+    POST /login                        {"identifier", "password"} -> {"token", ...}
+    GET  /hotels?page=1&page_size=10   catalog page
+    GET  /hotels/{id}/availability?check_in=&check_out=
+    GET  /quote?class_id=&check_in=&check_out=
+    POST /bookings                     {"hotel_id", "class_id" or "room_id", "check_in", "check_out", ...}
+    GET  /bookings                     the caller's bookings (staff: ?email=)
+    GET  /bookings/{id}
+    GET  /health                       liveness only
+    GET  /stats                        pool and cache counters (admin)
+
+Every endpoint but /login and /health takes "Authorization: Bearer <token>".
+Tokens are HMAC-signed with API_SECRET; set it in .env when running more
+than one worker, otherwise each process signs with its own random key.
+A token only says who the caller is: a system user's roles are looked up on
+each request (cached for the User_Roles TTL), so a revoked role stops
+working within a minute. Only hashed passwords log in here; accounts still
+holding a seeded plaintext password need it hashed first (see README).
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import secrets
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+
+import aiomysql
+from pymysql.err import MySQLError
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import availability
+import catalog
+import pricing
+import query_cache
+from auth import LOGIN_SQL, ROLES_SQL, USER_COLUMNS, has_password, verify_password
+from booking import CHECKOUT_COLUMNS
+from database import RETRYABLE_ERRNOS, MAX_RETRIES
+from db_config import DB
+
+API_SECRET = (os.getenv("API_SECRET") or secrets.token_hex(32)).encode()
+TOKEN_TTL = int(os.getenv("API_TOKEN_TTL", 8 * 3600))
+INDEX_MAX_AGE = 60
+MAX_NIGHTS = 30
+MAX_PAGE_SIZE = 50
+# free rooms tried, in random order, before a booking gives up
+BOOKING_ATTEMPTS = 3
+SIGNAL_ERRNO = 1644  # SIGNAL SQLSTATE '45000' from a stored procedure
+
+CUSTOMER_SQL = "SELECT cust_id, user_id, cust_name, cust_email, cust_pass FROM Customer WHERE cust_email = %s"
+
+BOOKING_SQL = """
+    SELECT b.book_id, b.book_date, b.check_in, b.check_out, b.book_type, b.booking_status,
+           b.stay_status, b.quoted_amt, b.hotel_id, h.hotel_name, b.room_id, r.room_number,
+           hc.class_id, hc.class_name, c.cust_id, c.cust_name, c.cust_email,
+           (SELECT COALESCE(SUM(p.pay_amt), 0) FROM Payment p WHERE p.book_id = b.book_id) AS paid
+    FROM Booking b
+    JOIN Hotel h ON h.hotel_id = b.hotel_id
+    JOIN Customer c ON c.cust_id = b.cust_id
+    LEFT JOIN Rooms r ON r.room_id = b.room_id
+    LEFT JOIN Hotel_Class hc ON hc.class_id = r.class_id
+    WHERE {where}
+    ORDER BY b.check_in DESC
+    LIMIT %s
+"""
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Conflict(Exception):
+    """A stored procedure refused the booking (SIGNAL 45000)."""
+
+
+def _json_default(v):
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return float(v)
+    raise TypeError(f"{type(v).__name__} is not JSON serializable")
+
+
+class JSON(JSONResponse):
+    def render(self, content):
+        return json.dumps(content, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+# ---------- database ----------
+_pool = None
+_cache = query_cache.QueryCache()
+_index = availability.AvailabilityIndex()
+_index_lock = asyncio.Lock()
+
+
+async def _query(kind, query, params):
+    async with _pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(query, params)
+            if kind == 'one':
+                return await cur.fetchone()
+            return await cur.fetchall()
+
+
+async def _cached(kind, query, params, cached):
+    """Same read-through cache rules as database.fetch_all (query_cache.py)."""
+    tables = query_cache.tables_in(query)
+    ttl = query_cache.ttl_for(tables) if cached else None
+    if ttl is None:
+        return await _query(kind, query, params)
+    key = query_cache.cache_key(kind, query, params)
+    hit, value = _cache.get(key)
+    if not hit:
+        generation = _cache.generation(tables)
+        value = await _query(kind, query, params)
+        _cache.put(key, value, ttl, tables, generation)
+    if value is None:
+        return None
+    if kind == 'one':
+        return dict(value)
+    return [dict(r) for r in value]
+
+
+async def fetch_all(query, params=(), cached=False):
+    return await _cached('all', query, params, cached)
+
+
+async def fetch_one(query, params=(), cached=False):
+    return await _cached('one', query, params, cached)
+
+
+async def call_proc(proc_name, params, retries=MAX_RETRIES):
+    """
+    CALL a procedure and return its first result set, re-running it after a
+    deadlock or lock wait timeout. Raises Conflict on SIGNAL 45000.
+    """
+    attempt = 0
+    while True:
+        try:
+            async with _pool.acquire() as conn:
+                async with conn.cursor() as cur:
+                    await cur.callproc(proc_name, params)
+                    rows = await cur.fetchall()
+                    # drain the remaining result sets so the connection can be reused
+                    while await cur.nextset():
+                        pass
+            break
+        except MySQLError as e:
+            errno = e.args[0] if e.args else None
+            if errno == SIGNAL_ERRNO:
+                raise Conflict(e.args[1]) from e
+            if errno not in RETRYABLE_ERRNOS or attempt >= retries:
+                raise
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+    _cache.invalidate(query_cache.PROC_WRITES.get(proc_name, query_cache.TABLE_TTLS))
+    return rows
+
+
+async def get_index():
+    """The availability index, reloaded when older than INDEX_MAX_AGE seconds."""
+    if time.monotonic() - _index.loaded_at > INDEX_MAX_AGE:
+        async with _index_lock:
+            if time.monotonic() - _index.loaded_at > INDEX_MAX_AGE:
+                rooms = await fetch_all(availability.ROOMS_SQL)
+                bookings = await fetch_all(availability.BOOKINGS_SQL, (date.today(),))
+                # building the calendars is CPU work; keep it off the event loop
+                await asyncio.to_thread(_index.load, rooms, bookings)
+    return _index
+
+
+async def rate_table(start, end, hotel_ids=None, class_ids=None):
+    """pricing.RateTable.load over the async pool."""
+    where = pricing.class_where(hotel_ids, class_ids)
+    classes = await fetch_all(pricing.CLASSES_SQL.format(where=where), cached=True)
+    calendar = []
+    if classes:
+        calendar = await fetch_all(pricing.CALENDAR_SQL.format(ids=pricing.class_ids_sql(classes)),
+                                   (start, end), cached=True)
+    rules = await fetch_all(pricing.RULES_SQL, cached=True)
+    return pricing.RateTable(classes, start, end, calendar, rules)
+
+
+# ---------- tokens ----------
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def make_token(claims):
+    body = _b64(json.dumps(dict(claims, exp=int(time.time()) + TOKEN_TTL)).encode())
+    sig = hmac.new(API_SECRET, body.encode(), hashlib.sha256).hexdigest()
+    return f"{body}.{sig}"
+
+
+def read_token(token):
+    body, _, sig = token.partition(".")
+    expected = hmac.new(API_SECRET, body.encode(), hashlib.sha256).hexdigest()
+    if not sig or not hmac.compare_digest(sig, expected):
+        return None
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+    except ValueError:
+        return None
+    return claims if claims.get('exp', 0) > time.time() else None
+
+
+async def _roles(user_type, user_id):
+    if user_type == 'customer':
+        return ['customer']
+    return [r['role_name'] for r in await fetch_all(ROLES_SQL, (user_id,), cached=True)]
+
+
+async def _claims(request, roles=None):
+    header = request.headers.get("authorization", "")
+    claims = read_token(header[7:]) if header.lower().startswith("bearer ") else None
+    if not claims:
+        raise ApiError(401, "missing or expired token")
+    claims['roles'] = await _roles(claims['type'], claims['id'])
+    if roles and not set(roles) & set(claims['roles']):
+        raise ApiError(403, "not allowed for this account")
+    return claims
+
+
+def _is_staff(claims):
+    return bool({'admin', 'staff'} & set(claims['roles']))
+
+
+# ---------- request parsing ----------
+def _int(value, name, default=None):
+    if value in (None, ""):
+        if default is None:
+            raise ApiError(400, f"{name} is required")
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{name} must be an integer")
+
+
+def _stay(values):
+    """(check_in, check_out) from query params or a JSON body."""
+    try:
+        check_in = date.fromisoformat(str(values['check_in']))
+        check_out = date.fromisoformat(str(values['check_out']))
+    except KeyError as e:
+        raise ApiError(400, f"{e.args[0]} is required")
+    except ValueError:
+        raise ApiError(400, "dates must be YYYY-MM-DD")
+    if check_out <= check_in:
+        raise ApiError(400, "check_out must be after check_in")
+    if (check_out - check_in).days > MAX_NIGHTS:
+        raise ApiError(400, f"stays are limited to {MAX_NIGHTS} nights")
+    return check_in, check_out
+
+
+async def _body(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ApiError(400, "request body must be JSON")
+    if not isinstance(body, dict):
+        raise ApiError(400, "request body must be a JSON object")
+    return body
+
+
+# ---------- endpoints ----------
+async def login(request):
+    body = await _body(request)
+    identifier, password = body.get('identifier') or '', body.get('password') or ''
+    if not identifier or not password:
+        raise ApiError(400, "identifier and password are required")
+
+    # no plaintext matches from the network: only hashed passwords log in here
+    row = await fetch_one(LOGIN_SQL, (identifier, identifier))
+    if row and verify_password(row['password'], password, allow_plaintext=False):
+        roles = await _roles('system', row['user_id'])
+        user = {k: row[k] for k in USER_COLUMNS}
+        claims = {'type': 'system', 'id': row['user_id'], 'email': row['user_email']}
+        return JSON({'token': make_token(claims), 'type': 'system', 'roles': roles, 'user': user})
+
+    cust = await fetch_one(CUSTOMER_SQL, (identifier,))
+    if (cust and has_password(cust['cust_pass'])
+            and verify_password(cust['cust_pass'], password, allow_plaintext=False)):
+        claims = {'type': 'customer', 'id': cust['cust_id'], 'email': cust['cust_email']}
+        customer = {k: cust[k] for k in ('cust_id', 'cust_name', 'cust_email')}
+        return JSON({'token': make_token(claims), 'type': 'customer', 'roles': ['customer'],
+                     'customer': customer})
+    raise ApiError(401, "invalid credentials")
+
+
+async def hotels(request):
+    await _claims(request)
+    page = max(1, _int(request.query_params.get('page'), 'page', 1))
+    page_size = min(MAX_PAGE_SIZE, max(1, _int(request.query_params.get('page_size'), 'page_size', 10)))
+    total_row = await fetch_one(catalog.COUNT_SQL, cached=True)
+    total = total_row['cnt'] if total_row else 0
+    pages = max(1, -(-total // page_size))
+    page = min(page, pages)
+    rows = await fetch_all(catalog.CATALOG_SQL, (page_size, (page - 1) * page_size), cached=True)
+    return JSON({'hotels': catalog.build_catalog(rows), 'total': total, 'page': page,
+                 'pages': pages, 'page_size': page_size})
+
+
+async def hotel_availability(request):
+    await _claims(request)
+    hotel_id = _int(request.path_params['hotel_id'], 'hotel_id')
+    check_in, check_out = _stay(request.query_params)
+    index = await get_index()
+    free = {}
+    for room_id in index.free_rooms(hotel_id, check_in, check_out):
+        free.setdefault(index.rooms[room_id][1], []).append(room_id)
+    table = await rate_table(check_in, check_out, hotel_ids=[hotel_id])
+    if not table.classes:
+        raise ApiError(404, "hotel not found")
+    _, totals = table.quote_many([check_in], [check_out])
+    nights = (check_out - check_in).days
+    classes = [{'class_id': c['class_id'], 'class_name': c['class_name'],
+                'class_rent': c['class_rent'], 'available': len(free.get(c['class_id'], ())),
+                'total': float(totals[k, 0]), 'avg_nightly': round(float(totals[k, 0]) / nights, 2)}
+               for k, c in enumerate(table.classes)]
+    return JSON({'hotel_id': hotel_id, 'check_in': check_in, 'check_out': check_out,
+                 'nights': nights, 'classes': classes})
+
+
+async def quote(request):
+    await _claims(request)
+    class_id = _int(request.query_params.get('class_id'), 'class_id')
+    check_in, check_out = _stay(request.query_params)
+    table = await rate_table(check_in, check_out, class_ids=[class_id])
+    if class_id not in table.row:
+        raise ApiError(404, "room class not found")
+    return JSON(dict(table.quote(class_id, check_in, check_out), class_id=class_id,
+                     check_in=check_in, check_out=check_out))
+
+
+async def create_booking(request):
+    claims = await _claims(request, roles=('customer', 'staff', 'admin'))
+    body = await _body(request)
+    hotel_id = _int(body.get('hotel_id'), 'hotel_id')
+    check_in, check_out = _stay(body)
+    if check_in < date.today():
+        raise ApiError(400, "check_in is in the past")
+    if claims['type'] == 'customer':
+        email = claims['email']
+    else:
+        email = body.get('email') or ''
+        if not email:
+            raise ApiError(400, "email of the guest is required")
+
+    index = await get_index()
+    if body.get('room_id'):
+        room_id = _int(body['room_id'], 'room_id')
+        room = index.rooms.get(room_id)
+        if room is None or room[0] != hotel_id:
+            raise ApiError(404, "room not found in this hotel")
+        class_id, candidates = room[1], [room_id]
+    else:
+        class_id = _int(body.get('class_id'), 'class_id')
+        free = index.free_rooms(hotel_id, check_in, check_out, class_id)
+        # random picks keep concurrent requests from all racing for the first free room
+        candidates = random.sample(free, min(len(free), BOOKING_ATTEMPTS))
+        if not candidates:
+            raise ApiError(409, "no rooms of this class are free for these dates")
+
+    table = await rate_table(check_in, check_out, class_ids=[class_id])
+    if class_id not in table.row:
+        raise ApiError(404, "room class not found")
+    total = table.quote(class_id, check_in, check_out)['total']
+
+    conflict = None
+    for room_id in candidates:
+        params = [email, hotel_id, room_id, check_in, check_out, body.get('book_type') or 'single',
+                  body.get('book_desc') or '', body.get('pay_method') or 'Card', total]
+        try:
+            rows = await call_proc('sp_checkout', params)
+        except Conflict as e:
+            conflict = e
+            continue
+        index.record_booking(room_id, check_in, check_out)
+        receipt = dict(zip(CHECKOUT_COLUMNS, rows[0]))
+        return JSON(dict(receipt, room_id=room_id, class_id=class_id, check_in=check_in,
+                         check_out=check_out), status_code=201)
+    raise ApiError(409, str(conflict))
+
+
+async def my_bookings(request):
+    claims = await _claims(request)
+    if claims['type'] == 'customer':
+        where, params = "b.cust_id = %s", (claims['id'],)
+    elif _is_staff(claims) and request.query_params.get('email'):
+        where, params = "c.cust_email = %s", (request.query_params['email'],)
+    else:
+        raise ApiError(400, "email is required")
+    limit = min(MAX_PAGE_SIZE, max(1, _int(request.query_params.get('limit'), 'limit', 20)))
+    rows = await fetch_all(BOOKING_SQL.format(where=where), params + (limit,))
+    return JSON({'bookings': rows})
+
+
+async def get_booking(request):
+    claims = await _claims(request)
+    book_id = _int(request.path_params['book_id'], 'book_id')
+    row = await fetch_one(BOOKING_SQL.format(where="b.book_id = %s"), (book_id, 1))
+    own = claims['type'] == 'customer' and row and row['cust_id'] == claims['id']
+    # customers only see their own; don't reveal whether someone else's exists
+    if not row or not (own or _is_staff(claims)):
+        raise ApiError(404, "booking not found")
+    return JSON(row)
+
+
+async def health(request):
+    return JSON({'ok': True})
+
+
+async def stats(request):
+    await _claims(request, roles=('admin',))
+    started = time.perf_counter()
+    await fetch_one("SELECT 1 AS ok")
+    return JSON({'status': 'ok', 'db_ms': round((time.perf_counter() - started) * 1000, 2),
+                 'pool': {'size': _pool.size, 'free': _pool.freesize, 'max': _pool.maxsize},
+                 'cache': _cache.stats()})
+
+
+async def api_error(request, exc):
+    return JSON({'error': exc.message}, status_code=exc.status)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global _pool
+    size = int(DB.get("api_pool_size", 20))
+    _pool = await aiomysql.create_pool(
+        host=DB.get("host", "localhost"),
+        port=int(DB.get("port", 3306)),
+        user=DB.get("user", "root"),
+        password=DB.get("password", ""),
+        db=DB.get("database", "hotel_booking"),
+        minsize=min(5, size),
+        maxsize=size,
+        autocommit=True,
+        pool_recycle=int(DB.get("pool_idle_timeout", 300)),
+    )
+    try:
+        yield
+    finally:
+        _pool.close()
+        await _pool.wait_closed()
+
+
+app = Starlette(
+    routes=[
+        Route("/login", login, methods=["POST"]),
+        Route("/hotels", hotels),
+        Route("/hotels/{hotel_id:int}/availability", hotel_availability),
+        Route("/quote", quote),
+        Route("/bookings", create_booking, methods=["POST"]),
+        Route("/bookings", my_bookings),
+        Route("/bookings/{book_id:int}", get_booking),
+        Route("/health", health),
+        Route("/stats", stats),
+    ],
+    exception_handlers={ApiError: api_error},
+    lifespan=lifespan,
+)
@@ -0,0 +1,201 @@
+# api_loadtest.py
+"""
+Load test for the async API (api.py): many concurrent clients for a fixed
+time, reporting requests/sec and p50/p95/p99 latency per endpoint.
+
+    uvicorn api:app --port 8000 --workers 4        # in another shell
+    python api_loadtest.py --clients 200 --duration 30
+    python api_loadtest.py --clients 500 --duration 60 --writes --out api.json
+
+Clients log in as a datagen guest (guest<N>@example.test / GUEST_PASSWORD)
+and then loop over a weighted mix of catalog, availability, quote and
+booking lookups. --writes adds bookings far in the future, so run it
+against a scratch database only.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmark import percentile
+from datagen import GUEST_PASSWORD
+
+# endpoint -> relative weight in the mix
+MIX = {
+    'catalog': 30,
+    'availability': 30,
+    'quote': 20,
+    'my_bookings': 10,
+    'booking_lookup': 10,
+}
+WRITE_MIX = {'book': 5}
+
+
+class Client:
+    def __init__(self, http, token, hotels, rnd):
+        self.http = http
+        self.headers = {'Authorization': f"Bearer {token}"}
+        self.hotels = hotels  # [(hotel_id, [class_id, ...])]
+        self.rnd = rnd
+        self.book_ids = []
+
+    def stay(self, far=False):
+        start = date.today() + timedelta(days=self.rnd.randrange(1000, 3000) if far else self.rnd.randrange(1, 120))
+        return start, start + timedelta(days=self.rnd.randint(1, 5))
+
+    async def get(self, path, params=None):
+        r = await self.http.get(path, params=params, headers=self.headers)
+        r.raise_for_status()
+        return r.json()
+
+    async def catalog(self):
+        await self.get("/hotels", {'page': self.rnd.randint(1, 5)})
+
+    async def availability(self):
+        hotel_id, _ = self.rnd.choice(self.hotels)
+        ci, co = self.stay()
+        await self.get(f"/hotels/{hotel_id}/availability", {'check_in': ci.isoformat(), 'check_out': co.isoformat()})
+
+    async def quote(self):
+        _, classes = self.rnd.choice(self.hotels)
+        ci, co = self.stay()
+        await self.get("/quote", {'class_id': self.rnd.choice(classes),
+                                  'check_in': ci.isoformat(), 'check_out': co.isoformat()})
+
+    async def my_bookings(self):
+        rows = (await self.get("/bookings", {'limit': 10}))['bookings']
+        self.book_ids = [r['book_id'] for r in rows] or self.book_ids
+
+    async def booking_lookup(self):
+        if not self.book_ids:
+            return await self.my_bookings()
+        await self.get(f"/bookings/{self.rnd.choice(self.book_ids)}")
+
+    async def book(self):
+        hotel_id, classes = self.rnd.choice(self.hotels)
+        ci, co = self.stay(far=True)
+        r = await self.http.post("/bookings", headers=self.headers, json={
+            'hotel_id': hotel_id, 'class_id': self.rnd.choice(classes),
+            'check_in': ci.isoformat(), 'check_out': co.isoformat(), 'book_desc': 'api loadtest'})
+        # 409 = no free room of that class; a correct answer, not an error
+        if r.status_code != 409:
+            r.raise_for_status()
+
+
+async def _hotels(http, headers):
+    hotels = []
+    for page in range(1, 6):
+        r = await http.get("/hotels", params={'page': page, 'page_size': 50}, headers=headers)
+        r.raise_for_status()
+        body = r.json()
+        hotels += [(h['hotel_id'], [c['class_id'] for c in h['classes']])
+                   for h in body['hotels'] if h['classes']]
+        if page >= body['pages']:
+            break
+    return hotels
+
+
+async def _login(http, email, password):
+    r = await http.post("/login", json={'identifier': email, 'password': password})
+    r.raise_for_status()
+    return r.json()['token']
+
+
+async def run(url, clients=100, duration=30.0, writes=False, guests=1000, seed=1):
+    mix = dict(MIX, **(WRITE_MIX if writes else {}))
+    names, weights = list(mix), list(mix.values())
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    first_error = {}
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as http:
+        tokens = await asyncio.gather(*[_login(http, f"guest{1 + k % guests}@example.test", GUEST_PASSWORD)
+                                        for k in range(min(clients, guests))])
+        hotels = await _hotels(http, {'Authorization': f"Bearer {tokens[0]}"})
+        if not hotels:
+            raise SystemExit("no hotels with room classes; load data with datagen.py first")
+
+        deadline = time.perf_counter() + duration
+
+        async def worker(k):
+            rnd = random.Random(seed * 100003 + k)
+            client = Client(http, tokens[k % len(tokens)], hotels, rnd)
+            while time.perf_counter() < deadline:
+                name = rnd.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    await getattr(client, name)()
+                except Exception as e:
+                    errors[name] += 1
+                    first_error.setdefault(name, f"{type(e).__name__}: {e}")
+                    continue
+                latencies[name].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(k) for k in range(clients)])
+        wall = time.perf_counter() - started
+
+    def summary(samples, n_errors):
+        ms = sorted(v * 1000 for v in samples)
+        return {
+            'count': len(ms),
+            'errors': n_errors,
+            'rps': len(ms) / wall if wall else 0.0,
+            'p50_ms': percentile(ms, 50),
+            'p95_ms': percentile(ms, 95),
+            'p99_ms': percentile(ms, 99),
+            'max_ms': ms[-1] if ms else 0.0,
+        }
+
+    report = {
+        'url': url,
+        'clients': clients,
+        'duration_s': wall,
+        'writes': writes,
+        'total': summary([v for name in names for v in latencies[name]], sum(errors.values())),
+        'endpoints': {name: dict(summary(latencies[name], errors[name]), first_error=first_error.get(name))
+                      for name in names},
+    }
+    return report
+
+
+def print_report(report):
+    print(f"{report['clients']} clients for {report['duration_s']:.1f}s against {report['url']}")
+    print(f"{'endpoint':<16} {'count':>8} {'err':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['total'])]
+    for name, s in rows:
+        print(f"{name:<16} {s['count']:>8} {s['errors']:>5} {s['rps']:>9.1f} "
+              f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}")
+    for name, s in report['endpoints'].items():
+        if s['first_error']:
+            print(f"first {name} error: {s['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the async hotel API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=100, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--guests", type=int, default=1000, help="distinct datagen guests to log in as")
+    parser.add_argument("--writes", action="store_true", help="include bookings in the mix")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.url, args.clients, args.duration, args.writes, args.guests, args.seed))
+    print_report(report)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.out}")
+    return 1 if report['total']['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
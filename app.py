@@ -2,10 +2,31 @@
 # app.py - Simplified 3-Role Version
 # ============================================
 import streamlit as st
+import altair as alt
 from auth import login_user, create_system_user, register_customer
-from database import fetch_all, fetch_one, execute, call_proc
-from datetime import date, timedelta
-from collections import defaultdict
+import database
+from database import fetch_all, fetch_one, execute
+import analytics
+import availability
+from catalog import load_catalog
+import bookings_grid
+import export
+import guest_search
+import inventory
+import pricing
+import rollups
+from rooms import room_status_counts, check_in as check_in_guest, REFRESH_SECONDS as ROOM_STATS_REFRESH
+import booking
+from booking import BookingConflict
+import glob
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Query counters for this script run (shown in the admin Diagnostics tab);
+# session_state keeps read-your-writes routing to the primary across reruns
+database.begin_run(st.session_state)
 
 # Page config with custom theme
 st.set_page_config(
@@ -211,7 +232,29 @@ st.markdown("""
 if 'auth' not in st.session_state:
     st.session_state['auth'] = {"logged_in": False, "type": None, "user": None, "roles": [], "login": None}
 
+# Admin exports are written to temp files. Streamlit holds a download's whole
+# file in memory on every rerun, so larger exports go through export.py instead.
+EXPORT_PREFIX = "hotel_export_"
+EXPORT_UI_MAX_BYTES = 50 * 1024 * 1024
+# temp exports of sessions that ended without logging out are removed after this
+EXPORT_MAX_AGE = 3600
+
+def discard_export():
+    old = st.session_state.pop('export_file', None)
+    if old and os.path.exists(old['path']):
+        os.remove(old['path'])
+
+def sweep_exports():
+    cutoff = time.time() - EXPORT_MAX_AGE
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), EXPORT_PREFIX + "*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
 def logout():
+    discard_export()
     st.session_state['auth'] = {"logged_in": False, "type": None, "user": None, "roles": [], "login": None}
     st.rerun()
 
@@ -424,11 +467,38 @@ else:
             </div>
         """, unsafe_allow_html=True)
         
+        # Header stats plus the Users and Staff tab lists are independent reads:
+        # run them as one concurrent batch so the page waits for the slowest only
+        admin_data = database.fetch_parallel({
+            'users': lambda: fetch_one("SELECT COUNT(*) as cnt FROM `User`", cached=True),
+            'hotels': lambda: fetch_one("SELECT COUNT(*) as cnt FROM Hotel", cached=True),
+            'bookings': lambda: fetch_one("SELECT COUNT(*) as cnt FROM Booking", cached=True),
+            'revenue': rollups.total_revenue,
+            'user_list': lambda: fetch_all("""
+                SELECT DISTINCT u.user_id, u.user_name, u.user_email, u.user_mobile,
+                       GROUP_CONCAT(r.role_name SEPARATOR ', ') as roles
+                FROM `User` u
+                LEFT JOIN User_Roles ur ON u.user_id = ur.user_id
+                LEFT JOIN Roles r ON ur.role_id = r.role_id
+                GROUP BY u.user_id, u.user_name, u.user_email, u.user_mobile
+                ORDER BY u.user_id
+            """),
+            'staff_count': lambda: fetch_one("SELECT COUNT(DISTINCT u.user_id) as cnt FROM `User` u JOIN User_Roles ur ON u.user_id = ur.user_id JOIN Roles r ON ur.role_id = r.role_id WHERE r.role_name = 'staff'", cached=True),
+            'staff_list': lambda: fetch_all("""
+                SELECT DISTINCT u.user_id, u.user_name, u.user_email
+                FROM `User` u
+                JOIN User_Roles ur ON u.user_id = ur.user_id
+                JOIN Roles r ON ur.role_id = r.role_id
+                WHERE r.role_name = 'staff'
+                ORDER BY u.user_name
+            """),
+        }, label="admin.page")
+        
         # Statistics Dashboard
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            total_users = fetch_one("SELECT COUNT(*) as cnt FROM `User`")
+            total_users = admin_data['users']
             st.markdown(f"""
                 <div class="stats-card">
                     <div style="font-size: 2rem;">👥</div>
@@ -438,7 +508,7 @@ else:
             """, unsafe_allow_html=True)
         
         with col2:
-            total_hotels = fetch_one("SELECT COUNT(*) as cnt FROM Hotel")
+            total_hotels = admin_data['hotels']
             st.markdown(f"""
                 <div class="stats-card">
                     <div style="font-size: 2rem;">🏨</div>
@@ -448,7 +518,7 @@ else:
             """, unsafe_allow_html=True)
         
         with col3:
-            total_bookings = fetch_one("SELECT COUNT(*) as cnt FROM Booking")
+            total_bookings = admin_data['bookings']
             st.markdown(f"""
                 <div class="stats-card">
                     <div style="font-size: 2rem;">📅</div>
@@ -458,31 +528,23 @@ else:
             """, unsafe_allow_html=True)
         
         with col4:
-            total_revenue = fetch_one("SELECT COALESCE(SUM(pay_amt),0) as revenue FROM Payment")
+            total_revenue = admin_data['revenue']
             st.markdown(f"""
                 <div class="stats-card">
                     <div style="font-size: 2rem;">💰</div>
-                    <div class="stats-number">₹{total_revenue['revenue']:,.0f}</div>
+                    <div class="stats-number">₹{total_revenue:,.0f}</div>
                     <div class="stats-label">Revenue</div>
                 </div>
             """, unsafe_allow_html=True)
         
         st.markdown("<br>", unsafe_allow_html=True)
         
-        tabs = st.tabs(["👥 Users", "👔 Staff Management", "🏨 Hotels", "📅 Bookings", "📊 Reports"])
+        tabs = st.tabs(["👥 Users", "👔 Staff Management", "🏨 Hotels", "📅 Bookings", "📊 Reports", "🩺 Diagnostics"])
         
         # Users Tab
         with tabs[0]:
             st.markdown("### 👥 System Users Management")
-            users = fetch_all("""
-                SELECT DISTINCT u.user_id, u.user_name, u.user_email, u.user_mobile,
-                       GROUP_CONCAT(r.role_name SEPARATOR ', ') as roles
-                FROM `User` u
-                LEFT JOIN User_Roles ur ON u.user_id = ur.user_id
-                LEFT JOIN Roles r ON ur.role_id = r.role_id
-                GROUP BY u.user_id, u.user_name, u.user_email, u.user_mobile
-                ORDER BY u.user_id
-            """)
+            users = admin_data['user_list']
             st.dataframe(users, use_container_width=True, height=300)
             
             with st.expander("➕ Create New System User", expanded=False):
@@ -515,7 +577,7 @@ else:
             st.markdown("### 👔 Staff Management Dashboard")
 
             # Staff count
-            staff_count = fetch_one("SELECT COUNT(DISTINCT u.user_id) as cnt FROM `User` u JOIN User_Roles ur ON u.user_id = ur.user_id JOIN Roles r ON ur.role_id = r.role_id WHERE r.role_name = 'staff'")
+            staff_count = admin_data['staff_count']
             cnt = staff_count.get('cnt', 0) if staff_count else 0
             st.markdown(f"\n<div class=\"stats-card\">\n  <div style=\"font-size: 2rem;\">{ROLE_EMOJIS.get('staff','👔')}</div>\n  <div class=\"stats-number\">{cnt}</div>\n  <div class=\"stats-label\">Staff Members</div>\n</div>\n", unsafe_allow_html=True)
 
@@ -523,14 +585,7 @@ else:
 
             # View All Staff (from User_Roles)
             st.markdown("#### 📋 All Staff Members")
-            all_staff = fetch_all("""
-                SELECT DISTINCT u.user_id, u.user_name, u.user_email
-                FROM `User` u
-                JOIN User_Roles ur ON u.user_id = ur.user_id
-                JOIN Roles r ON ur.role_id = r.role_id
-                WHERE r.role_name = 'staff'
-                ORDER BY u.user_name
-            """)
+            all_staff = admin_data['staff_list']
 
             if all_staff:
                 for staff in all_staff:
@@ -560,7 +615,7 @@ else:
                 if st.button("✨ Assign Staff Role", type="primary"):
                     try:
                         # find staff role id
-                        r = fetch_one("SELECT role_id FROM Roles WHERE role_name=%s", ('staff',))
+                        r = fetch_one("SELECT role_id FROM Roles WHERE role_name=%s", ('staff',), cached=True)
                         if not r:
                             role_id = execute("INSERT INTO Roles (role_name, role_desc) VALUES (%s,%s)", ('staff','Hotel staff'))
                         else:
@@ -599,47 +654,44 @@ else:
         # Hotels Tab
         with tabs[2]:
             st.markdown("### 🏨 Hotels & Rooms Management")
-            hotels = fetch_all("SELECT * FROM Hotel")
+            inv_search = st.text_input("🔍 Search hotels", key="inv_search", placeholder="name or type...")
+            if st.session_state.get('inv_search_sig') != inv_search:
+                st.session_state['inv_search_sig'] = inv_search
+                st.session_state['inv_page'] = 1
+            inv = inventory.load_inventory(page=st.session_state.get('inv_page', 1), page_size=20, search=inv_search)
+            st.session_state['inv_page'] = inv['page']
             
-            for hotel in hotels:
-                with st.expander(f"🏨 {hotel['hotel_name']} - {hotel.get('hotel_type', 'Standard')}"):
+            for hotel in inv['hotels']:
+                room_classes = hotel['classes']
+                with st.expander(f"🏨 {hotel['hotel_name']} - {hotel.get('hotel_type') or 'Standard'}"):
                     col1, col2 = st.columns([2, 1])
                     with col1:
-                        st.write(f"**Description:** {hotel.get('hotel_desc', 'N/A')}")
+                        st.write(f"**Description:** {hotel.get('hotel_desc') or 'N/A'}")
                         
                         # Show room classes for this hotel
                         st.markdown("#### 🛏️ Room Classes")
-                        room_classes = fetch_all("""
-                            SELECT class_id, class_name, class_rent, room_count
-                            FROM Hotel_Class
-                            WHERE hotel_id = %s
-                        """, (hotel['hotel_id'],))
-                        
                         if room_classes:
                             for rc in room_classes:
-                                st.write(f"- **{rc['class_name']}**: ₹{rc['class_rent']}/night ({rc['room_count']} rooms)")
+                                st.write(f"- **{rc['class_name']}**: ₹{rc['class_rent']}/night "
+                                         f"({rc['rooms_total']} of {rc['room_count']} rooms added) — "
+                                         f"{rc['rooms_available']} available, {rc['rooms_occupied']} occupied, "
+                                         f"{rc['rooms_reserved']} reserved, {rc['rooms_maintenance']} in maintenance")
                         else:
                             st.info("No room classes defined yet")
                         
-                        # Show individual rooms
+                        # Individual rooms are only fetched when asked for
                         st.markdown("#### 🏠 Room Inventory")
-                        rooms = fetch_all("""
-                            SELECT r.room_id, r.room_number, r.room_status, hc.class_name
-                            FROM Rooms r
-                            JOIN Hotel_Class hc ON r.class_id = hc.class_id
-                            WHERE r.hotel_id = %s
-                            ORDER BY r.room_number
-                        """, (hotel['hotel_id'],))
-                        
-                        if rooms:
-                            room_df = [{
-                                'Room #': r['room_number'],
-                                'Class': r['class_name'],
-                                'Status': r['room_status']
-                            } for r in rooms]
-                            st.dataframe(room_df, use_container_width=True, height=200)
-                        else:
-                            st.info("No rooms added yet")
+                        if st.checkbox("Show rooms", key=f"show_rooms_{hotel['hotel_id']}"):
+                            rooms = inventory.hotel_rooms(hotel['hotel_id'])
+                            if rooms:
+                                room_df = [{
+                                    'Room #': r['room_number'],
+                                    'Class': r['class_name'],
+                                    'Status': r['room_status']
+                                } for r in rooms]
+                                st.dataframe(room_df, use_container_width=True, height=200)
+                            else:
+                                st.info("No rooms added yet")
                         
                         # Add room form
                         with st.form(f"add_room_{hotel['hotel_id']}"):
@@ -659,10 +711,11 @@ else:
                             
                             if st.form_submit_button("Add Room") and class_id and room_num:
                                 try:
-                                    execute("""
+                                    new_room_id = execute("""
                                         INSERT INTO Rooms (hotel_id, class_id, room_number, room_status)
                                         VALUES (%s, %s, %s, 'Available')
                                     """, (hotel['hotel_id'], class_id, room_num))
+                                    availability.set_room(new_room_id, hotel['hotel_id'], class_id, 'Available')
                                     st.success(f"✅ Room {room_num} added!")
                                     st.rerun()
                                 except Exception as e:
@@ -671,6 +724,18 @@ else:
                     with col2:
                         st.image("https://images.unsplash.com/photo-1551882547-ff40c63fe5fa?w=400", use_container_width=True)
             
+            col_prev, col_info, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if st.button("⬅️ Previous", disabled=inv['page'] <= 1, use_container_width=True, key="inv_prev"):
+                    st.session_state['inv_page'] = inv['page'] - 1
+                    st.rerun()
+            with col_info:
+                st.caption(f"Page {inv['page']} of {inv['pages']} • {inv['total']} hotels")
+            with col_next:
+                if st.button("Next ➡️", disabled=inv['page'] >= inv['pages'], use_container_width=True, key="inv_next"):
+                    st.session_state['inv_page'] = inv['page'] + 1
+                    st.rerun()
+            
             st.markdown("---")
             with st.expander("➕ Add New Hotel", expanded=False):
                 col1, col2 = st.columns(2)
@@ -690,36 +755,239 @@ else:
         # Bookings Tab
         with tabs[3]:
             st.markdown("### 📅 All Bookings")
-            rows = fetch_all("""
-                SELECT b.book_id, b.book_date, b.check_in, b.check_out, b.book_type, b.booking_status,
-                       c.cust_name, c.cust_email, h.hotel_name, 
-                       r.room_number, hc.class_name as room_class,
-                       u.user_name as booked_by,
-                       p.pay_amt, p.pay_method
-                FROM Booking b
-                JOIN Customer c ON c.cust_id=b.cust_id
-                JOIN Hotel h ON h.hotel_id=b.hotel_id
-                JOIN User u ON u.user_id=b.user_id
-                LEFT JOIN Rooms r ON r.room_id=b.room_id
-                LEFT JOIN Hotel_Class hc ON r.class_id=hc.class_id
-                LEFT JOIN Payment p ON p.book_id=b.book_id
-                ORDER BY b.book_date DESC
-            """)
-            st.dataframe(rows, use_container_width=True, height=400)
+            hotel_opts = {"All hotels": None}
+            hotel_opts.update({h['hotel_name']: h['hotel_id'] for h in fetch_all("SELECT hotel_id, hotel_name FROM Hotel ORDER BY hotel_name", cached=True)})
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                f_hotel = st.selectbox("🏨 Hotel", options=list(hotel_opts.keys()), key="bk_f_hotel")
+            with col2:
+                f_status = st.selectbox("📌 Status", options=["All"] + list(bookings_grid.STATUSES), key="bk_f_status")
+            with col3:
+                f_from = st.date_input("📅 From", value=None, key="bk_f_from")
+            with col4:
+                f_to = st.date_input("📅 To", value=None, key="bk_f_to")
+            with col5:
+                f_cust = st.text_input("📧 Customer email", key="bk_f_cust", placeholder="starts with...")
+            filters = {
+                'hotel_id': hotel_opts[f_hotel],
+                'status': None if f_status == "All" else f_status,
+                'date_from': f_from,
+                'date_to': f_to,
+                'customer': f_cust.strip() or None,
+            }
+            bk_archive = st.checkbox("🗄️ Include archived bookings", key="bk_archive",
+                                     help="Also search bookings moved to the archive tables (slower)")
+            
+            # cursor stack: one keyset cursor per visited page, reset when filters change
+            sig = repr((sorted(filters.items()), bk_archive))
+            if st.session_state.get('bk_filter_sig') != sig:
+                st.session_state['bk_filter_sig'] = sig
+                st.session_state['bk_cursors'] = [None]
+            cursors = st.session_state['bk_cursors']
+            page = bookings_grid.fetch_page(filters, after=cursors[-1], page_size=50,
+                                            include_archive=bk_archive)
+            total = bookings_grid.estimate_total(filters, include_archive=bk_archive)
+            
+            st.dataframe(page['rows'], use_container_width=True, height=400)
+            col_prev, col_info, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if st.button("⬅️ Previous", disabled=len(cursors) <= 1, use_container_width=True, key="bk_prev"):
+                    cursors.pop()
+                    st.rerun()
+            with col_info:
+                if total['exact']:
+                    total_label = f"{total['count']:,}"
+                elif any(filters.values()):
+                    total_label = f"{total['count']:,}+"
+                else:
+                    total_label = f"~{total['count']:,}"
+                st.caption(f"Page {len(cursors)} • {total_label} bookings")
+            with col_next:
+                if st.button("Next ➡️", disabled=page['next'] is None, use_container_width=True, key="bk_next"):
+                    cursors.append(page['next'])
+                    st.rerun()
+            
+            # Streaming export (hotel and date filters from above) to a temp file, then download
+            with st.expander("⬇️ Export bookings / payments"):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    exp_dataset = st.selectbox("Dataset", options=sorted(export.DATASETS), key="exp_dataset")
+                with col2:
+                    exp_format = st.selectbox("Format", options=list(export.FORMATS), key="exp_format")
+                with col3:
+                    st.markdown("<br>", unsafe_allow_html=True)
+                    prepare = st.button("Prepare export", use_container_width=True, key="exp_prepare")
+                exp_filters = {
+                    'hotel_id': filters['hotel_id'],
+                    'date_from': filters['date_from'],
+                    'date_to': filters['date_to'],
+                    'include_archive': bk_archive,
+                }
+                if prepare:
+                    discard_export()
+                    sweep_exports()
+                    fd, path = tempfile.mkstemp(prefix=EXPORT_PREFIX, suffix=f".{exp_format}")
+                    os.close(fd)
+                    try:
+                        with st.spinner("Exporting..."):
+                            stats = export.export_to_path(exp_dataset, exp_format, path, exp_filters)
+                        size = os.path.getsize(path)
+                        if size > EXPORT_UI_MAX_BYTES:
+                            os.remove(path)
+                            cmd = [f"python export.py {exp_dataset} --format {exp_format}"]
+                            if exp_filters['date_from']:
+                                cmd.append(f"--from {exp_filters['date_from']}")
+                            if exp_filters['date_to']:
+                                cmd.append(f"--to {exp_filters['date_to']}")
+                            if exp_filters['hotel_id']:
+                                cmd.append(f"--hotel {exp_filters['hotel_id']}")
+                            if bk_archive:
+                                cmd.append("--include-archive")
+                            cmd.append(f"-o {exp_dataset}.{exp_format}")
+                            st.warning(f"{stats['rows']:,} rows ({size / 1048576:,.0f} MB) is too large to "
+                                       f"download here (limit {EXPORT_UI_MAX_BYTES // 1048576} MB). Run:")
+                            st.code(" ".join(cmd), language="bash")
+                        else:
+                            st.session_state['export_file'] = {
+                                'path': path, 'name': f"{exp_dataset}.{exp_format}", 'rows': stats['rows']}
+                    except Exception as e:
+                        os.remove(path)
+                        st.error(f"❌ Export failed: {e}")
+                exp_file = st.session_state.get('export_file')
+                if exp_file and os.path.exists(exp_file['path']):
+                    col_dl, col_discard = st.columns([3, 1])
+                    with col_dl:
+                        with open(exp_file['path'], 'rb') as f:
+                            st.download_button(f"💾 Download {exp_file['name']} ({exp_file['rows']:,} rows)",
+                                               data=f, file_name=exp_file['name'], key="exp_download")
+                    with col_discard:
+                        if st.button("🗑️ Discard", key="exp_discard"):
+                            discard_export()
+                            st.rerun()
         
         # Reports Tab
         with tabs[4]:
             st.markdown("### 📊 Revenue Analytics")
-            rpt = fetch_all("""
-                SELECT h.hotel_id, h.hotel_name, COALESCE(SUM(p.pay_amt),0) AS total_revenue,
-                       COUNT(DISTINCT b.book_id) as booking_count
-                FROM Hotel h
-                LEFT JOIN Booking b ON b.hotel_id = h.hotel_id
-                LEFT JOIN Payment p ON p.book_id = b.book_id
-                GROUP BY h.hotel_id, h.hotel_name
-                ORDER BY total_revenue DESC
-            """)
+            col1, col2 = st.columns(2)
+            with col1:
+                rpt_from = st.date_input("📅 From", value=date.today() - timedelta(days=30), key="rpt_from")
+            with col2:
+                rpt_to = st.date_input("📅 To", value=date.today(), key="rpt_to")
+            rpt = rollups.hotel_revenue(rpt_from, rpt_to)
             st.dataframe(rpt, use_container_width=True, height=350)
+            
+            st.markdown("### 🛏️ Occupancy, ADR & RevPAR")
+            col1, col2 = st.columns(2)
+            with col1:
+                occ_hotels = fetch_all("SELECT hotel_id, hotel_name FROM Hotel ORDER BY hotel_name", cached=True)
+                occ_hotel = st.selectbox("🏨 Hotel", [None] + [h['hotel_id'] for h in occ_hotels],
+                                         format_func=lambda hid: "All hotels" if hid is None else
+                                         next(h['hotel_name'] for h in occ_hotels if h['hotel_id'] == hid),
+                                         key="occ_hotel")
+            with col2:
+                occ_level = st.radio("Group by", ["hotel", "class"], horizontal=True, key="occ_level",
+                                     format_func=str.title)
+                occ_archive = st.checkbox("🗄️ Include archived bookings", key="occ_archive")
+            if rpt_to < rpt_from:
+                st.warning("Pick a 'To' date on or after 'From'")
+            else:
+                occ = analytics.occupancy(rpt_from, rpt_to + timedelta(days=1), occ_hotel, occ_archive)
+                totals = occ.totals()
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Occupancy", "—" if totals['occupancy_pct'] is None else f"{totals['occupancy_pct']}%")
+                col2.metric("ADR", "—" if totals['adr'] is None else f"₹{totals['adr']:,.0f}")
+                col3.metric("RevPAR", "—" if totals['revpar'] is None else f"₹{totals['revpar']:,.0f}")
+                
+                heat = alt.Chart(alt.Data(values=occ.calendar())).mark_rect().encode(
+                    x=alt.X('week:O', title='Week of'),
+                    y=alt.Y('weekday:O', sort=analytics.WEEKDAYS, title=None),
+                    color=alt.Color('occupancy_pct:Q', title='Occupancy %', scale=alt.Scale(scheme='greens')),
+                    tooltip=['date:N', 'occupancy_pct:Q', 'sold:Q', 'adr:Q', 'revpar:Q'],
+                )
+                st.altair_chart(heat, use_container_width=True)
+                
+                st.dataframe(occ.summary(occ_level), use_container_width=True, height=300)
+                with st.expander("📅 Daily breakdown"):
+                    st.dataframe(occ.daily(occ_level), use_container_width=True, height=350)
+        
+        # Diagnostics Tab
+        with tabs[5]:
+            st.markdown("### 🩺 Query Diagnostics")
+            last_run = st.session_state.get('last_run_stats')
+            if last_run:
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Queries (last run)", last_run['queries'])
+                col2.metric("DB time", f"{last_run['db_ms']:.0f} ms")
+                col3.metric("Pool wait", f"{last_run['acquire_ms']:.0f} ms")
+                col4.metric("Rows", f"{last_run['rows']:,}")
+                if last_run['repeated']:
+                    st.markdown("**Call sites run more than once in the last run** (possible N+1)")
+                    st.dataframe([{'Call site': label, 'Times': n} for label, n in last_run['repeated']],
+                                 use_container_width=True)
+                if last_run.get('parallel'):
+                    st.markdown("**Concurrent read batches in the last run** (wall time vs. the sum of its reads)")
+                    st.dataframe([{
+                        'Batch': b['batch'],
+                        'Wall ms': b['wall_ms'],
+                        'Sum ms': b['sum_ms'],
+                        'Reads (ms)': ", ".join(f"{name} {ms:.0f}" for name, ms in
+                                                sorted(b['reads'].items(), key=lambda x: -x[1])),
+                    } for b in last_run['parallel']], use_container_width=True)
+            else:
+                st.info("Run statistics appear after the next rerun")
+            
+            st.markdown("#### ⏱️ Busiest call sites")
+            st.dataframe([{
+                'Call site': q['label'],
+                'Kind': q['kind'],
+                'Calls': q['count'],
+                'Total ms': round(q['total_ms'], 1),
+                'Avg ms': round(q['avg_ms'], 2),
+                'Max ms': round(q['max_ms'], 1),
+                'Pool wait ms': round(q['acquire_ms'], 1),
+                'Rows': q['rows'],
+                'SQL': q['sql'],
+            } for q in database.query_stats(30)], use_container_width=True, height=300)
+            
+            st.markdown(f"#### 🐢 Slow queries (≥ {database.DB['slow_query_ms']:.0f} ms)")
+            slow = database.slow_queries()
+            if not slow:
+                st.success("No slow queries logged")
+            for q in slow[:50]:
+                with st.expander(f"{q['ms']:.0f} ms • {q['label']} • {q['at']}"):
+                    st.code(q['sql'], language="sql")
+                    st.caption(f"params {q['params']} • {q['rows']} rows • pool wait {q['acquire_ms']} ms")
+                    if q['plan']:
+                        st.dataframe(q['plan'], use_container_width=True)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("#### 🔌 Connection pool")
+                st.json(database.pool_stats())
+            with col2:
+                st.markdown("#### 🗄️ Query cache")
+                st.json(database.cache_stats())
+            
+            st.markdown("#### 🪞 Read replicas")
+            replicas = database.replica_stats()
+            if not replicas:
+                st.info("No replicas configured (DB_REPLICA_HOSTS): all reads go to the primary")
+            else:
+                if st.button("Check replicas now", key="diag_check_replicas"):
+                    replicas = database.check_replicas()
+                st.dataframe([{
+                    'Replica': r['replica'],
+                    'Healthy': '✅' if r['healthy'] else '❌',
+                    'Lag (s)': r['lag_s'],
+                    'Checked (s ago)': r['checked_s_ago'],
+                    'Reads': r['reads'],
+                    'Failures': r['failures'],
+                    'Pool open': r['pool']['open'],
+                    'Last error': r['last_error'],
+                } for r in replicas], use_container_width=True)
+            if st.button("Reset statistics", key="diag_reset"):
+                database.reset_query_stats()
+                st.rerun()
 
     # MANAGER role removed — managers are now staff. No specific manager UI.
 
@@ -732,12 +1000,12 @@ else:
             </div>
         """, unsafe_allow_html=True)
 
-        # Simple staff dashboard focused on bookings and quick actions
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("#### 📋 Today's Bookings & Check-ins")
-            recent_bookings = fetch_all("""
-                SELECT b.book_id, b.check_in, b.check_out, b.booking_status,
+        # The dashboard's independent reads run as one concurrent batch;
+        # room stats are for the hotel picked on the previous run
+        staff_hotel_id = st.session_state.get('staff_stats_hotel_id')
+        staff_data = database.fetch_parallel({
+            'upcoming': lambda: fetch_all("""
+                SELECT b.book_id, b.check_in, b.check_out, b.booking_status, b.stay_status,
                        c.cust_name, c.cust_email, h.hotel_name,
                        r.room_number, hc.class_name as room_type
                 FROM Booking b
@@ -748,31 +1016,52 @@ else:
                 WHERE b.check_in >= CURDATE()
                 ORDER BY b.check_in ASC
                 LIMIT 10
-            """)
+            """),
+            'hotels': lambda: fetch_all("SELECT hotel_id, hotel_name FROM Hotel ORDER BY hotel_name", cached=True),
+            'room_stats': lambda: room_status_counts(staff_hotel_id),
+            'rooms': lambda: fetch_all("""
+                SELECT r.room_id, r.hotel_id, r.class_id, r.room_number, h.hotel_name, r.room_status
+                FROM Rooms r
+                JOIN Hotel h ON r.hotel_id = h.hotel_id
+                ORDER BY h.hotel_name, r.room_number
+            """),
+        }, label="staff.page")
+        
+        # Simple staff dashboard focused on bookings and quick actions
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("#### 📋 Today's Bookings & Check-ins")
+            recent_bookings = staff_data['upcoming']
             st.dataframe(recent_bookings, use_container_width=True)
 
         with col2:
             st.markdown("#### 🏠 Room Management")
             
-            # Room status overview
-            room_stats = fetch_one("""
-                SELECT 
-                    COUNT(*) as total_rooms,
-                    SUM(CASE WHEN room_status = 'Available' THEN 1 ELSE 0 END) as available,
-                    SUM(CASE WHEN room_status = 'Occupied' THEN 1 ELSE 0 END) as occupied,
-                    SUM(CASE WHEN room_status = 'Reserved' THEN 1 ELSE 0 END) as reserved,
-                    SUM(CASE WHEN room_status = 'Maintenance' THEN 1 ELSE 0 END) as maintenance
-                FROM Rooms
-            """)
+            # Room status overview from the Room_Status_Counts counters;
+            # the fragment re-runs on its own without rerunning the page
+            stats_hotels = {"All hotels": None}
+            stats_hotels.update({h['hotel_name']: h['hotel_id'] for h in staff_data['hotels']})
+            stats_hotel = st.selectbox("🏨 Hotel", options=list(stats_hotels.keys()), key="staff_stats_hotel")
+            st.session_state['staff_stats_hotel_id'] = stats_hotels[stats_hotel]
             
-            if room_stats:
+            @st.fragment(run_every=ROOM_STATS_REFRESH)
+            def room_status_panel(hotel_id):
+                # first render uses the batch's counts; timed refreshes read them again
+                prefetched = staff_data.pop('room_stats', None)
+                if prefetched is not None and staff_hotel_id == hotel_id:
+                    room_stats = prefetched
+                else:
+                    room_stats = room_status_counts(hotel_id)
                 col_a, col_b = st.columns(2)
                 with col_a:
-                    st.metric("🟢 Available", room_stats.get('available', 0))
-                    st.metric("🔴 Occupied", room_stats.get('occupied', 0))
+                    st.metric("🟢 Available", room_stats['available'])
+                    st.metric("🔴 Occupied", room_stats['occupied'])
                 with col_b:
-                    st.metric("🟡 Reserved", room_stats.get('reserved', 0))
-                    st.metric("🔧 Maintenance", room_stats.get('maintenance', 0))
+                    st.metric("🟡 Reserved", room_stats['reserved'])
+                    st.metric("🔧 Maintenance", room_stats['maintenance'])
+                st.caption(f"{room_stats['total_rooms']} rooms • updated {datetime.now():%H:%M:%S}")
+            
+            room_status_panel(stats_hotels[stats_hotel])
             
             st.markdown("---")
             
@@ -781,60 +1070,44 @@ else:
             
             # Guest Search
             with st.expander("🔍 Search Guest", expanded=False):
-                search_email = st.text_input("Enter guest email", key="staff_search_email")
+                search_term = st.text_input("Name, email, mobile or booking #", key="staff_search_email")
                 if st.button("Search", key="btn_search_guest"):
-                    if search_email:
-                        guest_bookings = fetch_all("""
-                            SELECT b.book_id, b.check_in, b.check_out, b.booking_status,
-                                   c.cust_name, c.cust_email, h.hotel_name,
-                                   r.room_number, hc.class_name
-                            FROM Booking b
-                            JOIN Customer c ON c.cust_id = b.cust_id
-                            JOIN Hotel h ON h.hotel_id = b.hotel_id
-                            LEFT JOIN Rooms r ON r.room_id = b.room_id
-                            LEFT JOIN Hotel_Class hc ON r.class_id = hc.class_id
-                            WHERE c.cust_email LIKE %s
-                            ORDER BY b.book_date DESC
-                        """, (f"%{search_email}%",))
-                        
-                        if guest_bookings:
-                            st.success(f"Found {len(guest_bookings)} booking(s)")
-                            st.dataframe(guest_bookings, use_container_width=True)
+                    if len(search_term.strip()) >= guest_search.MIN_TERM:
+                        guests = guest_search.search_guests(search_term, limit=20)
+                        if guests:
+                            st.success(f"Found {len(guests)} guest(s)")
+                            st.dataframe([{
+                                'Name': g['cust_name'],
+                                'Email': g['cust_email'],
+                                'Mobile': g['cust_mobile'],
+                                'Matched on': g['match'],
+                            } for g in guests], use_container_width=True)
+                            guest_bookings = guest_search.guest_bookings([g['cust_id'] for g in guests[:5]])
+                            if guest_bookings:
+                                st.markdown("**Recent bookings of the top matches**")
+                                st.dataframe(guest_bookings, use_container_width=True)
                         else:
-                            st.warning("No bookings found for this email")
+                            st.warning("No guests found")
                     else:
-                        st.error("Please enter an email")
+                        st.error("Please enter at least 2 characters")
             
             # Mark Check-in
             with st.expander("✅ Mark Check-in", expanded=False):
                 booking_id = st.number_input("Booking ID", min_value=1, step=1, key="staff_checkin_id")
                 if st.button("Confirm Check-in", key="btn_mark_checkin"):
                     try:
-                        # Update booking status
-                        execute("UPDATE Booking SET booking_status = 'Confirmed' WHERE book_id = %s", (booking_id,))
-                        
-                        # Get room and update to Occupied
-                        room_info = fetch_one("""
-                            SELECT room_id FROM Booking WHERE book_id = %s
-                        """, (booking_id,))
-                        
-                        if room_info and room_info.get('room_id'):
-                            execute("UPDATE Rooms SET room_status = 'Occupied' WHERE room_id = %s", 
-                                    (room_info['room_id'],))
-                        
-                        st.success(f"✅ Check-in completed for Booking #{booking_id}")
-                        st.rerun()
+                        if check_in_guest(booking_id):
+                            st.success(f"✅ Check-in completed for Booking #{booking_id}")
+                            st.rerun()
+                        else:
+                            st.warning(f"Booking #{booking_id} can't be checked in: not found, cancelled, "
+                                       "already checked in, not staying tonight, or its room is under maintenance")
                     except Exception as e:
                         st.error(f"Error: {e}")
             
             # Update Room Status
             with st.expander("🔧 Update Room Status", expanded=False):
-                all_rooms = fetch_all("""
-                    SELECT r.room_id, r.room_number, h.hotel_name, r.room_status
-                    FROM Rooms r
-                    JOIN Hotel h ON r.hotel_id = h.hotel_id
-                    ORDER BY h.hotel_name, r.room_number
-                """)
+                all_rooms = staff_data['rooms']
                 
                 if all_rooms:
                     room_options = {f"{r['hotel_name']} - Room {r['room_number']} (Current: {r['room_status']})": r['room_id'] 
@@ -849,6 +1122,8 @@ else:
                             room_id = room_options[selected_room]
                             execute("UPDATE Rooms SET room_status = %s WHERE room_id = %s", 
                                     (new_status, room_id))
+                            room = next(r for r in all_rooms if r['room_id'] == room_id)
+                            availability.set_room(room_id, room['hotel_id'], room['class_id'], new_status)
                             st.success(f"✅ Room status updated to {new_status}")
                             st.rerun()
                         except Exception as e:
@@ -868,12 +1143,11 @@ else:
         
         st.markdown("<br>", unsafe_allow_html=True)
         
-        # Available Hotels
-        hotels = fetch_all("""
-            SELECT h.*, hc.class_id, hc.class_name, hc.class_rent, hc.room_count 
-            FROM Hotel h 
-            LEFT JOIN Hotel_Class hc ON hc.hotel_id=h.hotel_id
-        """)
+        # Available Hotels (one page: hotels, classes and availability in one pass)
+        if 'catalog_page' not in st.session_state:
+            st.session_state['catalog_page'] = 1
+        catalog = load_catalog(page=st.session_state['catalog_page'], page_size=10)
+        st.session_state['catalog_page'] = catalog['page']
         
         # Hotel images for variety
         hotel_images = [
@@ -884,16 +1158,13 @@ else:
             "https://images.unsplash.com/photo-1571896349842-33c89424de2d?w=600"
         ]
         
-        grouped = defaultdict(list)
-        for h in hotels:
-            grouped[h['hotel_id']].append(h)
-        
         # Display hotels in grid
         cols = st.columns(2)
-        for idx, (hid, rows) in enumerate(grouped.items()):
-            base = rows[0]
+        offset = (catalog['page'] - 1) * catalog['page_size']
+        for idx, base in enumerate(catalog['hotels']):
+            hid = base['hotel_id']
             with cols[idx % 2]:
-                st.image(hotel_images[idx % len(hotel_images)], use_container_width=True)
+                st.image(hotel_images[(offset + idx) % len(hotel_images)], use_container_width=True)
                 
                 st.markdown(f"""
                     <div class="hotel-card">
@@ -905,41 +1176,46 @@ else:
                 
                 with st.expander("📋 View Details & Book"):
                     st.markdown("#### 🛏️ Available Room Classes")
-                    has_rooms = False
-                    for r in rows:
-                        if r['class_id']:
-                            has_rooms = True
-                            # Get available room count for this class
-                            available_count = fetch_one("""
-                                SELECT COUNT(*) as cnt FROM Rooms 
-                                WHERE hotel_id = %s AND class_id = %s AND room_status = 'Available'
-                            """, (hid, r['class_id']))
-                            
-                            avail_cnt = available_count['cnt'] if available_count else 0
-                            total_cnt = r.get('room_count', 0)
-                            
-                            col_a, col_b, col_c = st.columns([2, 1, 1])
-                            with col_a:
-                                st.write(f"**{r['class_name']}**")
-                            with col_b:
-                                status_color = "🟢" if avail_cnt > 0 else "🔴"
-                                st.write(f"{status_color} {avail_cnt}/{total_cnt} available")
-                            with col_c:
-                                st.write(f"**₹{r['class_rent']:,.0f}**/night")
+                    for r in base['classes']:
+                        avail_cnt = r['available']
+                        total_cnt = r['room_count']
+                        
+                        col_a, col_b, col_c = st.columns([2, 1, 1])
+                        with col_a:
+                            st.write(f"**{r['class_name']}**")
+                        with col_b:
+                            status_color = "🟢" if avail_cnt > 0 else "🔴"
+                            st.write(f"{status_color} {avail_cnt}/{total_cnt} available")
+                        with col_c:
+                            st.write(f"**₹{r['class_rent']:,.0f}**/night")
                     
-                    if not has_rooms:
+                    if not base['classes']:
                         st.info("Room classes will be available soon")
                     
                     st.markdown("---")
                     if st.button(f"📅 Book {base['hotel_name']}", key=f"book_{hid}", type="primary", use_container_width=True):
                         st.session_state['booking_hotel_id'] = hid
                         st.rerun()
+        
+        # Pager
+        if catalog['pages'] > 1:
+            col_prev, col_info, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if st.button("⬅️ Previous", disabled=catalog['page'] <= 1, use_container_width=True, key="catalog_prev"):
+                    st.session_state['catalog_page'] = catalog['page'] - 1
+                    st.rerun()
+            with col_info:
+                st.caption(f"Page {catalog['page']} of {catalog['pages']} • {catalog['total']} hotels")
+            with col_next:
+                if st.button("Next ➡️", disabled=catalog['page'] >= catalog['pages'], use_container_width=True, key="catalog_next"):
+                    st.session_state['catalog_page'] = catalog['page'] + 1
+                    st.rerun()
 
         # Booking Form
         if 'booking_hotel_id' in st.session_state:
             st.markdown("<br><br>", unsafe_allow_html=True)
             hid = st.session_state['booking_hotel_id']
-            hotel_info = fetch_one("SELECT * FROM Hotel WHERE hotel_id = %s", (hid,))
+            hotel_info = fetch_one("SELECT * FROM Hotel WHERE hotel_id = %s", (hid,), cached=True)
             
             st.markdown(f"""
                 <div class="dashboard-header">
@@ -948,12 +1224,12 @@ else:
                 </div>
             """, unsafe_allow_html=True)
             
-            # Get available rooms for this hotel
-            available_rooms = fetch_all("""
-                SELECT r.room_id, r.room_number, hc.class_name, hc.class_rent, r.room_status
+            # Rooms of this hotel that are not out of service
+            hotel_rooms = fetch_all("""
+                SELECT r.room_id, r.room_number, r.class_id, hc.class_name, hc.class_rent, r.room_status
                 FROM Rooms r
                 JOIN Hotel_Class hc ON r.class_id = hc.class_id
-                WHERE r.hotel_id = %s AND r.room_status = 'Available'
+                WHERE r.hotel_id = %s AND r.room_status <> 'Maintenance'
                 ORDER BY hc.class_rent
             """, (hid,))
             
@@ -964,33 +1240,48 @@ else:
                                         value=user.get('cust_email', '') if st.session_state['auth']['type'] == 'customer' else '',
                                         placeholder="your.email@example.com")
                 checkin = st.date_input("📅 Check-in Date", value=date.today(), min_value=date.today())
+            
+            with col2:
+                checkout = st.date_input("📅 Check-out Date", value=date.today() + timedelta(days=1), 
+                                        min_value=date.today() + timedelta(days=1))
+                pay_method = st.selectbox("💳 Payment Method", ["Card", "UPI", "Cash", "Online"])
+                bdesc = st.text_area("📝 Special Requests", placeholder="Any special requirements...")
+            
+            # Only offer rooms that are free for the chosen stay, priced from the rate calendar
+            if checkout > checkin:
+                free_ids = set(availability.free_rooms(hid, checkin, checkout))
+                available_rooms = [r for r in hotel_rooms if r['room_id'] in free_ids]
+                rate_table = pricing.RateTable.load(checkin, checkout, hotel_ids=[hid])
+            else:
+                available_rooms = []
+            
+            with col1:
                 btype = st.selectbox("👥 Booking Type", ["single", "double", "family"], 
                                     format_func=lambda x: f"{'👤' if x=='single' else '👥' if x=='double' else '👨‍👩‍👧‍👦'} {x.title()}")
                 
                 # Room selection
                 if available_rooms:
-                    room_options = {f"Room {r['room_number']} - {r['class_name']} (₹{r['class_rent']:.0f}/night)": r['room_id'] 
-                                    for r in available_rooms}
+                    quotes = {cid: rate_table.quote(cid, checkin, checkout)
+                              for cid in {r['class_id'] for r in available_rooms}}
+                    room_options = {}
+                    for r in available_rooms:
+                        q = quotes[r['class_id']]
+                        room_options[f"Room {r['room_number']} - {r['class_name']} (₹{q['total'] / q['nights']:,.0f}/night avg)"] = r['room_id']
                     selected_room = st.selectbox("🏠 Select Room", options=list(room_options.keys()))
                     room_id = room_options[selected_room]
                     selected_room_info = next(r for r in available_rooms if r['room_id'] == room_id)
                 else:
-                    st.warning("⚠️ No rooms available at this hotel")
+                    st.warning("⚠️ No rooms available at this hotel for these dates")
                     room_id = None
                     selected_room_info = None
             
-            with col2:
-                checkout = st.date_input("📅 Check-out Date", value=date.today() + timedelta(days=1), 
-                                        min_value=date.today() + timedelta(days=1))
-                pay_method = st.selectbox("💳 Payment Method", ["Card", "UPI", "Cash", "Online"])
-                bdesc = st.text_area("📝 Special Requests", placeholder="Any special requirements...")
-            
-            # Calculate nights and total
-            pay_amt = 0.0
+            # Quote for the selected room (weekend uplift included, stay discount shown)
+            quote = None
             if checkout > checkin and selected_room_info:
-                nights = (checkout - checkin).days
-                pay_amt = selected_room_info['class_rent'] * nights
-                st.info(f"🌙 Total nights: **{nights}** | Total amount: **₹{pay_amt:,.2f}**")
+                quote = quotes[selected_room_info['class_id']]
+                adjustment = f" | Stay discount: ₹{-quote['adjustment']:,.2f}" if quote['adjustment'] < 0 else ""
+                st.info(f"🌙 Total nights: **{quote['nights']}** | Room: ₹{quote['subtotal']:,.2f}{adjustment} | "
+                        f"Total amount: **₹{quote['total']:,.2f}**")
             
             col_confirm, col_cancel = st.columns(2)
             with col_confirm:
@@ -1004,66 +1295,20 @@ else:
                     else:
                         try:
                             with st.spinner("Processing your booking..."):
-                                # Check if customer exists
-                                cust = fetch_one("SELECT * FROM Customer WHERE cust_email=%s", (c_email,))
-                                
-                                if cust:
-                                    cust_id = cust['cust_id']
-                                    user_id = cust.get('user_id')
-                                    
-                                    # If customer doesn't have user_id, create User entry
-                                    if not user_id:
-                                        user_id = execute("""
-                                            INSERT INTO User (user_name, user_email, user_mobile, user_address)
-                                            VALUES (%s, %s, %s, %s)
-                                        """, (cust['cust_name'], c_email, cust.get('cust_mobile', ''), 'Customer Address'))
-                                        
-                                        # Link customer to user
-                                        execute("UPDATE Customer SET user_id = %s WHERE cust_id = %s", (user_id, cust_id))
-                                        
-                                        # Assign customer role
-                                        customer_role = fetch_one("SELECT role_id FROM Roles WHERE role_name='customer'")
-                                        if customer_role:
-                                            execute("INSERT INTO User_Roles (user_id, role_id) VALUES (%s, %s)",
-                                                    (user_id, customer_role['role_id']))
-                                else:
-                                    # Create new User first
-                                    user_id = execute("""
-                                        INSERT INTO User (user_name, user_email, user_mobile, user_address)
-                                        VALUES (%s, %s, %s, %s)
-                                    """, (c_email.split('@')[0], c_email, '', 'Customer Address'))
-                                    
-                                    # Create Customer linked to User
-                                    cust_id = execute("""
-                                        INSERT INTO Customer (user_id, cust_name, cust_email, cust_mobile, cust_pass)
-                                        VALUES (%s, %s, %s, %s, %s)
-                                    """, (user_id, c_email.split('@')[0], c_email, '', 'defaultpass'))
-                                    
-                                    # Assign customer role
-                                    customer_role = fetch_one("SELECT role_id FROM Roles WHERE role_name='customer'")
-                                    if customer_role:
-                                        execute("INSERT INTO User_Roles (user_id, role_id) VALUES (%s, %s)",
-                                                (user_id, customer_role['role_id']))
+                                # One call: resolves/creates the customer, locks the room,
+                                # re-checks the dates and records the payment
+                                receipt = booking.checkout(
+                                    c_email, hid, room_id, checkin, checkout,
+                                    btype, bdesc, pay_method, quoted_amt=quote['total']
+                                )
                                 
-                                # Call stored procedure with all new parameters
-                                call_proc('sp_make_booking', [
-                                    user_id,        # p_user_id
-                                    cust_id,        # p_cust_id
-                                    hid,            # p_hotel_id
-                                    room_id,        # p_room_id
-                                    date.today(),   # p_book_date
-                                    checkin,        # p_check_in
-                                    checkout,       # p_check_out
-                                    btype,          # p_book_type
-                                    bdesc,          # p_book_desc
-                                    pay_amt,        # p_pay_amt
-                                    pay_method      # p_pay_method
-                                ])
-                                
-                                st.success("🎉 Booking confirmed successfully!")
+                                st.success(f"🎉 Booking #{receipt['booking_id']} confirmed: {receipt['nights']} night(s) × "
+                                           f"₹{receipt['nightly_rate']:,.2f} = ₹{receipt['total']:,.2f}")
                                 st.balloons()
                                 del st.session_state['booking_hotel_id']
                                 st.rerun()
+                        except BookingConflict as e:
+                            st.error(f"❌ {e}. Please pick another room or dates.")
                         except Exception as e:
                             st.error(f"❌ Booking failed: {e}")
             
@@ -1145,4 +1390,7 @@ else:
                 📞 24/7 Support • 💳 Secure Payments • ⚡ Instant Confirmation
             </p>
         </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+# Kept for the Diagnostics tab on the next rerun
+st.session_state['last_run_stats'] = database.run_stats()
@@ -0,0 +1,166 @@
+# archive.py
+"""
+Hot/cold archival of closed bookings (see schema.sql, ARCHIVE).
+
+A booking is closed once its stay ended (or, without dates, it was made)
+before the horizon and no guest is still checked in. Closed bookings move to
+Booking_Archive together with their Payment and Payment_Audit rows, one
+batch per transaction, pausing between batches so the live tables stay
+responsive. The revenue rollup keeps counting archived history.
+
+Everything on the hot path reads the live tables only. Historical reports
+opt in with include_archive=True, which reads the vw_*_all views instead.
+
+Usage:
+    python archive.py stats
+    python archive.py run --days 730 --batch 1000 --pause 0.2
+    python archive.py run --dry-run
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from database import fetch_all, fetch_one, run_in_transaction
+
+ARCHIVE_AFTER_DAYS = 730
+BATCH_SIZE = 1000
+PAUSE_SECONDS = 0.2
+
+BOOKING_COLUMNS = ('book_id', 'user_id', 'cust_id', 'hotel_id', 'room_id', 'book_date',
+                   'check_in', 'check_out', 'book_type', 'book_desc', 'quoted_amt', 'group_id',
+                   'booking_status', 'stay_status')
+PAYMENT_COLUMNS = ('pay_id', 'user_id', 'book_id', 'pay_date', 'pay_amt', 'pay_method', 'pay_desc')
+AUDIT_COLUMNS = ('audit_id', 'pay_id', 'book_id', 'pay_date', 'pay_amt', 'created_at')
+
+# live table, archive table, columns; children first when deleting
+MOVES = (
+    ('Booking', 'Booking_Archive', BOOKING_COLUMNS),
+    ('Payment', 'Payment_Archive', PAYMENT_COLUMNS),
+    ('Payment_Audit', 'Payment_Audit_Archive', AUDIT_COLUMNS),
+)
+
+CLOSED_WHERE = """
+    ((b.check_out < %s) OR (b.check_out IS NULL AND b.book_date < %s))
+    AND b.stay_status <> 'CheckedIn'
+"""
+
+BATCH_SQL = f"""
+    SELECT b.book_id FROM Booking b
+    WHERE {CLOSED_WHERE}
+    LIMIT %s
+    FOR UPDATE
+"""
+
+PENDING_SQL = f"SELECT COUNT(*) AS cnt FROM Booking b WHERE {CLOSED_WHERE}"
+
+SIZES_SQL = """
+    SELECT TABLE_NAME AS name, TABLE_ROWS AS est_rows,
+           ROUND((DATA_LENGTH + INDEX_LENGTH) / 1048576, 1) AS size_mb
+    FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = DATABASE()
+      AND TABLE_NAME IN ('Booking', 'Payment', 'Payment_Audit',
+                         'Booking_Archive', 'Payment_Archive', 'Payment_Audit_Archive')
+    ORDER BY TABLE_NAME
+"""
+
+
+def tables(include_archive=False):
+    """Table (or view) names for the booking history, live only unless include_archive."""
+    if include_archive:
+        return {'booking': 'vw_booking_all', 'payment': 'vw_payment_all',
+                'payment_audit': 'vw_payment_audit_all'}
+    return {'booking': 'Booking', 'payment': 'Payment', 'payment_audit': 'Payment_Audit'}
+
+
+def cutoff_for(days=ARCHIVE_AFTER_DAYS, today=None):
+    return (today or date.today()) - timedelta(days=days)
+
+
+def pending(cutoff):
+    """Closed bookings still in the live table."""
+    row = fetch_one(PENDING_SQL, (cutoff, cutoff))
+    return row['cnt'] if row else 0
+
+
+def move_batch(cutoff, batch_size=BATCH_SIZE):
+    """Archive up to batch_size closed bookings in one transaction. Returns rows moved per table."""
+    def work(tx):
+        ids = [r['book_id'] for r in tx.fetch_all(BATCH_SQL, (cutoff, cutoff, batch_size))]
+        moved = {live: 0 for live, _, _ in MOVES}
+        if not ids:
+            return moved
+        marks = ",".join(["%s"] * len(ids))
+        for live, archive, columns in MOVES:
+            cols = ", ".join(columns)
+            tx.execute(f"INSERT INTO {archive} ({cols}) SELECT {cols} FROM {live} WHERE book_id IN ({marks})",
+                       ids)
+            moved[live] = tx.rowcount
+        for live, _, _ in reversed(MOVES):
+            tx.execute(f"DELETE FROM {live} WHERE book_id IN ({marks})", ids)
+        return moved
+    return run_in_transaction(work, label="archive.move_batch")
+
+
+def run(days=ARCHIVE_AFTER_DAYS, batch_size=BATCH_SIZE, pause=PAUSE_SECONDS,
+        max_batches=None, max_seconds=None, progress=None):
+    """
+    Archive closed bookings older than `days`, batch by batch until none are
+    left (or max_batches / max_seconds is reached). Safe to stop and re-run.
+    Returns {'cutoff', 'batches', 'moved': {table: rows}, 'seconds'}.
+    """
+    cutoff = cutoff_for(days)
+    report = {'cutoff': cutoff, 'batches': 0, 'moved': {live: 0 for live, _, _ in MOVES}}
+    started = time.perf_counter()
+    while True:
+        moved = move_batch(cutoff, batch_size)
+        if not moved['Booking']:
+            break
+        report['batches'] += 1
+        for table, n in moved.items():
+            report['moved'][table] += n
+        if progress:
+            progress(report)
+        if max_batches and report['batches'] >= max_batches:
+            break
+        if max_seconds and time.perf_counter() - started >= max_seconds:
+            break
+        if moved['Booking'] < batch_size:
+            break
+        # let OLTP traffic in between batches
+        time.sleep(pause)
+    report['seconds'] = time.perf_counter() - started
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move closed bookings to the archive tables")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="live vs archive table sizes")
+    rn = sub.add_parser("run", help="archive closed bookings older than --days")
+    rn.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                    help=f"archive stays that ended more than this many days ago (default {ARCHIVE_AFTER_DAYS})")
+    rn.add_argument("--batch", type=int, default=BATCH_SIZE, help="bookings per transaction")
+    rn.add_argument("--pause", type=float, default=PAUSE_SECONDS, help="seconds to sleep between batches")
+    rn.add_argument("--max-batches", type=int)
+    rn.add_argument("--max-seconds", type=float)
+    rn.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        for r in fetch_all(SIZES_SQL):
+            print(f"{r['name']:<24} ~{int(r['est_rows'] or 0):>12,} rows  {r['size_mb'] or 0:>9} MB")
+    elif args.dry_run:
+        cutoff = cutoff_for(args.days)
+        print(f"{pending(cutoff):,} closed bookings ended before {cutoff} would be archived")
+    else:
+        def progress(report):
+            print(f"batch {report['batches']}: {report['moved']['Booking']:,} bookings archived so far")
+        report = run(args.days, args.batch, args.pause, args.max_batches, args.max_seconds, progress)
+        moved = report['moved']
+        print(f"Archived {moved['Booking']:,} bookings, {moved['Payment']:,} payments and "
+              f"{moved['Payment_Audit']:,} audit rows ended before {report['cutoff']} "
+              f"in {report['batches']} batches, {report['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
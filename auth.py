@@ -1,48 +1,77 @@
 # auth.py
 import hashlib
-from database import fetch_one, fetch_all, execute
+from mysql.connector import IntegrityError
+from database import fetch_one, fetch_all, execute, run_in_transaction
 
 def hash_pass(pw: str) -> str:
     return hashlib.sha256(pw.encode('utf-8')).hexdigest()
 
-def verify_password(stored: str, provided: str) -> bool:
+# Customers created at checkout (sp_checkout) have no password (NULL) and
+# can't log in; older versions stored this placeholder instead.
+PLACEHOLDER_PASSWORDS = {'defaultpass'}
+
+def has_password(stored) -> bool:
+    return bool(stored) and stored not in PLACEHOLDER_PASSWORDS
+
+def verify_password(stored: str, provided: str, allow_plaintext: bool = True) -> bool:
     # Accept seeded plaintext or sha256-hashed stored values
-    if stored == provided:
+    if allow_plaintext and stored == provided:
         return True
     return stored == hash_pass(provided)
 
+# System login by username or by the user's email, Login and User in one
+# round trip. The username match wins if both exist.
+LOGIN_SQL = """
+    SELECT * FROM (
+        SELECT 0 AS match_rank, l.login_id, l.user_id, l.username, l.password,
+               u.user_name, u.user_email, u.user_mobile, u.user_address
+        FROM Login l JOIN `User` u ON u.user_id = l.user_id
+        WHERE l.username = %s
+        UNION ALL
+        SELECT 1 AS match_rank, l.login_id, l.user_id, l.username, l.password,
+               u.user_name, u.user_email, u.user_mobile, u.user_address
+        FROM `User` u JOIN Login l ON l.user_id = u.user_id
+        WHERE u.user_email = %s
+    ) m
+    ORDER BY match_rank
+    LIMIT 1
+"""
+
+# Served from the query cache (see query_cache.py): entries expire after the
+# User_Roles TTL and are dropped as soon as anything writes User_Roles.
+ROLES_SQL = """
+    SELECT r.role_name FROM Roles r
+    JOIN User_Roles ur ON ur.role_id = r.role_id
+    WHERE ur.user_id = %s
+"""
+
+LOGIN_COLUMNS = ('login_id', 'user_id', 'username', 'password')
+USER_COLUMNS = ('user_id', 'user_name', 'user_email', 'user_mobile', 'user_address')
+
+def get_roles(user_id):
+    return [r['role_name'] for r in fetch_all(ROLES_SQL, (user_id,), cached=True)]
+
 def login_user(identifier: str, password: str):
     """
     Try to login:
-    1) Check Login table (system users by username)
-    2) Check Login table (system users by email)
-    3) If not found, check Customer table (customer login via email)
+    1) Check Login table (system users by username or by User.user_email)
+    2) If not found, check Customer table (customer login via email)
     Returns dict with keys: type ('system' or 'customer'), login_row/user_row/roles
     """
-    # 1) System user login (Login.username)
-    row = fetch_one("SELECT * FROM Login WHERE username = %s", (identifier,))
-    
-    # 2) If not found, try to find by email
-    if not row:
-        user_by_email = fetch_one("SELECT * FROM `User` WHERE user_email = %s", (identifier,))
-        if user_by_email:
-            row = fetch_one("SELECT * FROM Login WHERE user_id = %s", (user_by_email['user_id'],))
+    # 1) System user login (Login.username or User.user_email), one query
+    row = fetch_one(LOGIN_SQL, (identifier, identifier))
     
     if row:
         if verify_password(row['password'], password):
-            user = fetch_one("SELECT * FROM `User` WHERE user_id = %s", (row['user_id'],))
-            roles_rows = fetch_all("""
-                SELECT r.role_name FROM Roles r
-                JOIN User_Roles ur ON ur.role_id = r.role_id
-                WHERE ur.user_id = %s
-            """, (row['user_id'],))
-            roles = [r['role_name'] for r in roles_rows]
+            login = {k: row[k] for k in LOGIN_COLUMNS}
+            user = {k: row[k] for k in USER_COLUMNS}
+            roles = get_roles(row['user_id'])
 
             # If no roles found, auto-assign admin to first seeded user (id=1) for compatibility
             if not roles:
                 if row['user_id'] == 1:
                     # ensure admin role exists
-                    r = fetch_one("SELECT role_id FROM Roles WHERE role_name='admin'")
+                    r = fetch_one("SELECT role_id FROM Roles WHERE role_name='admin'", cached=True)
                     if not r:
                         role_id = execute("INSERT INTO Roles (role_name, role_desc) VALUES (%s,%s)", ('admin','System administrator'))
                     else:
@@ -54,65 +83,72 @@ def login_user(identifier: str, password: str):
                         pass
                     roles = ['admin']
 
-            return {"type":"system", "login": row, "user": user, "roles": roles}
+            return {"type":"system", "login": login, "user": user, "roles": roles}
 
     # 2) Customer login (allow customer to login by email)
     cust = fetch_one("SELECT * FROM Customer WHERE cust_email = %s", (identifier,))
     if cust:
-        stored = cust.get('cust_pass') or ''
-        if stored and verify_password(stored, password):
-            return {"type":"customer", "customer": cust, "roles": ['customer']}
-        # also accept if stored plaintext equals provided
-        if stored == password:
+        stored = cust.get('cust_pass')
+        if has_password(stored) and verify_password(stored, password):
             return {"type":"customer", "customer": cust, "roles": ['customer']}
 
     return None
 
+def _role_id(tx, role_name, role_desc=''):
+    r = fetch_one("SELECT role_id FROM Roles WHERE role_name=%s", (role_name,), cached=True)
+    if r:
+        return r['role_id']
+    return tx.execute("INSERT INTO Roles (role_name, role_desc) VALUES (%s,%s)", (role_name, role_desc))
+
 def create_system_user(user_name, user_email, user_mobile, user_address, username, password, assign_role_name=''):
-    # creates User + Login, stores hashed password in Login
-    user_id = execute("INSERT INTO `User` (user_name, user_email, user_mobile, user_address) VALUES (%s,%s,%s,%s)",
-                      (user_name, user_email, user_mobile, user_address))
+    # creates User + Login (+ role) in one transaction, stores hashed password in Login
     hp = hash_pass(password)
-    execute("INSERT INTO Login (user_id, username, password) VALUES (%s,%s,%s)", (user_id, username, hp))
-    if assign_role_name:
-        r = fetch_one("SELECT role_id FROM Roles WHERE role_name=%s", (assign_role_name,))
-        if not r:
-            role_id = execute("INSERT INTO Roles (role_name, role_desc) VALUES (%s,%s)", (assign_role_name, ''))
-        else:
-            role_id = r['role_id']
-        try:
-            execute("INSERT INTO User_Roles (user_id, role_id) VALUES (%s,%s)", (user_id, role_id))
-        except Exception:
-            pass
-    return user_id
+
+    def work(tx):
+        user_id = tx.execute("INSERT INTO `User` (user_name, user_email, user_mobile, user_address) VALUES (%s,%s,%s,%s)",
+                             (user_name, user_email, user_mobile, user_address))
+        tx.execute("INSERT INTO Login (user_id, username, password) VALUES (%s,%s,%s)", (user_id, username, hp))
+        if assign_role_name:
+            role_id = _role_id(tx, assign_role_name)
+            try:
+                with tx.savepoint():
+                    tx.execute("INSERT INTO User_Roles (user_id, role_id) VALUES (%s,%s)", (user_id, role_id))
+            except IntegrityError:
+                pass
+        return user_id
+
+    return run_in_transaction(work)
 
 def register_customer(cust_name, cust_email, cust_mobile, password):
     """
     Register a new customer with proper User table linkage
-    Creates: User -> Customer -> User_Roles (customer role)
+    Creates: User -> Customer -> User_Roles (customer role), all or nothing
     Stores hashed password in Customer table
     """
-    # Step 1: Create User record
-    user_id = execute("""
-        INSERT INTO `User` (user_name, user_email, user_mobile, user_address)
-        VALUES (%s, %s, %s, %s)
-    """, (cust_name, cust_email, cust_mobile, 'Customer Address'))
-    
-    # Step 2: Create Customer record linked to User
     hp = hash_pass(password)
-    cust_id = execute("""
-        INSERT INTO Customer (user_id, cust_name, cust_email, cust_mobile, cust_pass)
-        VALUES (%s, %s, %s, %s, %s)
-    """, (user_id, cust_name, cust_email, cust_mobile, hp))
-    
-    # Step 3: Assign customer role
-    customer_role = fetch_one("SELECT role_id FROM Roles WHERE role_name='customer'")
-    if customer_role:
-        try:
-            execute("INSERT INTO User_Roles (user_id, role_id) VALUES (%s, %s)",
-                    (user_id, customer_role['role_id']))
-        except Exception:
-            pass  # Role assignment may fail if already exists
-    
-    return cust_id
+    customer_role = fetch_one("SELECT role_id FROM Roles WHERE role_name='customer'", cached=True)
+
+    def work(tx):
+        # Step 1: Create User record
+        user_id = tx.execute("""
+            INSERT INTO `User` (user_name, user_email, user_mobile, user_address)
+            VALUES (%s, %s, %s, %s)
+        """, (cust_name, cust_email, cust_mobile, 'Customer Address'))
+
+        # Step 2: Create Customer record linked to User
+        cust_id = tx.execute("""
+            INSERT INTO Customer (user_id, cust_name, cust_email, cust_mobile, cust_pass)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (user_id, cust_name, cust_email, cust_mobile, hp))
+
+        # Step 3: Assign customer role
+        if customer_role:
+            try:
+                with tx.savepoint():
+                    tx.execute("INSERT INTO User_Roles (user_id, role_id) VALUES (%s, %s)",
+                               (user_id, customer_role['role_id']))
+            except IntegrityError:
+                pass  # Role assignment may fail if already exists
+        return cust_id
 
+    return run_in_transaction(work)
@@ -0,0 +1,235 @@
+# availability.py
+"""
+Date-range room availability.
+
+Each room keeps its booked stays as intervals sorted by check-in, plus a
+running maximum of check-out dates. A stay [check_in, check_out) overlaps an
+existing booking iff some booking starting before check_out ends after
+check_in, which is one bisect plus one lookup: O(log n) per room.
+
+The index is built once per process from Rooms/Booking and kept current by
+record_booking() and set_room(); it is reloaded after `max_age` seconds so
+changes made by other processes (bookings, the nightly no-shows) are picked up.
+"""
+import bisect
+import threading
+import time
+from datetime import date, timedelta
+
+from database import fetch_all
+
+ROOMS_SQL = """
+    SELECT room_id, hotel_id, class_id, room_status
+    FROM Rooms
+"""
+
+# Past stays can never conflict with a new booking, so only load live ones.
+BOOKINGS_SQL = """
+    SELECT room_id, check_in, check_out
+    FROM Booking
+    WHERE room_id IS NOT NULL
+      AND booking_status <> 'Cancelled' AND stay_status <> 'NoShow'
+      AND check_in IS NOT NULL AND check_out IS NOT NULL
+      AND check_out > %s
+    ORDER BY room_id, check_in
+"""
+
+
+class RoomCalendar:
+    __slots__ = ("starts", "ends", "max_end")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.max_end = []  # max_end[i] = max(ends[:i + 1])
+
+    def append(self, start, end):
+        # caller guarantees start >= self.starts[-1] (bulk load in check_in order)
+        self.starts.append(start)
+        self.ends.append(end)
+        prev = self.max_end[-1] if self.max_end else end
+        self.max_end.append(max(prev, end))
+
+    def add(self, start, end):
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.max_end.insert(i, end)
+        self._rebuild_from(i)
+
+    def remove(self, start, end):
+        i = bisect.bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.ends[i] == end:
+                del self.starts[i], self.ends[i], self.max_end[i]
+                self._rebuild_from(i)
+                return True
+            i += 1
+        return False
+
+    def _rebuild_from(self, i):
+        running = self.max_end[i - 1] if i > 0 else None
+        for j in range(i, len(self.starts)):
+            end = self.ends[j]
+            running = end if running is None or end > running else running
+            self.max_end[j] = running
+
+    def overlaps(self, start, end):
+        i = bisect.bisect_left(self.starts, end)
+        return i > 0 and self.max_end[i - 1] > start
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self.rooms = {}      # room_id -> (hotel_id, class_id, room_status)
+        self.by_hotel = {}   # hotel_id -> [room_id, ...]
+        self.calendars = {}  # room_id -> RoomCalendar
+        self.loaded_at = 0.0
+        self._lock = threading.RLock()
+
+    def load(self, rooms, bookings):
+        """Build from Rooms rows and Booking rows sorted by (room_id, check_in)."""
+        room_map, by_hotel, calendars = {}, {}, {}
+        for r in rooms:
+            room_map[r['room_id']] = (r['hotel_id'], r['class_id'], r['room_status'])
+            by_hotel.setdefault(r['hotel_id'], []).append(r['room_id'])
+        for b in bookings:
+            cal = calendars.get(b['room_id'])
+            if cal is None:
+                cal = calendars[b['room_id']] = RoomCalendar()
+            cal.append(b['check_in'], b['check_out'])
+        with self._lock:
+            self.rooms, self.by_hotel, self.calendars = room_map, by_hotel, calendars
+            self.loaded_at = time.monotonic()
+
+    def load_from_db(self, today=None):
+        rooms = fetch_all(ROOMS_SQL)
+        bookings = fetch_all(BOOKINGS_SQL, (today or date.today(),))
+        self.load(rooms, bookings)
+
+    def is_free(self, room_id, check_in, check_out):
+        with self._lock:
+            room = self.rooms.get(room_id)
+            if room is None or room[2] == 'Maintenance':
+                return False
+            cal = self.calendars.get(room_id)
+            return cal is None or not cal.overlaps(check_in, check_out)
+
+    def free_rooms(self, hotel_id, check_in, check_out, class_id=None):
+        """Room ids of hotel (optionally one class) free for [check_in, check_out)."""
+        with self._lock:
+            out = []
+            for room_id in self.by_hotel.get(hotel_id, ()):
+                _, cls, status = self.rooms[room_id]
+                if status == 'Maintenance' or (class_id is not None and cls != class_id):
+                    continue
+                cal = self.calendars.get(room_id)
+                if cal is None or not cal.overlaps(check_in, check_out):
+                    out.append(room_id)
+            return out
+
+    def record_booking(self, room_id, check_in, check_out):
+        with self._lock:
+            cal = self.calendars.get(room_id)
+            if cal is None:
+                cal = self.calendars[room_id] = RoomCalendar()
+            cal.add(check_in, check_out)
+
+    def cancel_booking(self, room_id, check_in, check_out):
+        with self._lock:
+            cal = self.calendars.get(room_id)
+            return bool(cal) and cal.remove(check_in, check_out)
+
+    def set_room(self, room_id, hotel_id, class_id, room_status):
+        with self._lock:
+            if room_id not in self.rooms:
+                self.by_hotel.setdefault(hotel_id, []).append(room_id)
+            self.rooms[room_id] = (hotel_id, class_id, room_status)
+
+
+_index = AvailabilityIndex()
+_load_lock = threading.Lock()
+
+def get_index(max_age=60):
+    """Shared per-process index, (re)loaded from the database when stale."""
+    if time.monotonic() - _index.loaded_at > max_age:
+        with _load_lock:
+            if time.monotonic() - _index.loaded_at > max_age:
+                _index.load_from_db()
+    return _index
+
+def free_rooms(hotel_id, check_in, check_out, class_id=None):
+    return get_index().free_rooms(hotel_id, check_in, check_out, class_id)
+
+def is_room_free(room_id, check_in, check_out):
+    return get_index().is_free(room_id, check_in, check_out)
+
+def record_booking(room_id, check_in, check_out):
+    if _index.loaded_at:
+        _index.record_booking(room_id, check_in, check_out)
+
+def set_room(room_id, hotel_id, class_id, room_status):
+    """Keep the index in step with a room added or changed in this process."""
+    if _index.loaded_at:
+        _index.set_room(room_id, hotel_id, class_id, room_status)
+
+
+# ---------- benchmark: python availability.py [rooms] [bookings] ----------
+def _synthetic(n_rooms, n_bookings, seed=7):
+    import random
+    rnd = random.Random(seed)
+    start = date.today()
+    rooms = [{'room_id': i, 'hotel_id': i // 50, 'class_id': (i // 50) * 4 + i % 4,
+              'room_status': 'Available'} for i in range(n_rooms)]
+    per_room = {}
+    for _ in range(n_bookings):
+        rid = rnd.randrange(n_rooms)
+        ci = start + timedelta(days=rnd.randrange(730))
+        per_room.setdefault(rid, []).append((ci, ci + timedelta(days=rnd.randint(1, 7))))
+    bookings = [{'room_id': rid, 'check_in': ci, 'check_out': co}
+                for rid in sorted(per_room) for ci, co in sorted(per_room[rid])]
+    return rooms, bookings
+
+def bench(n_rooms=5000, n_bookings=300000, n_queries=2000):
+    import random
+    rooms, bookings = _synthetic(n_rooms, n_bookings)
+    idx = AvailabilityIndex()
+    t0 = time.perf_counter()
+    idx.load(rooms, bookings)
+    load_s = time.perf_counter() - t0
+
+    rnd = random.Random(11)
+    n_hotels = n_rooms // 50
+    queries = []
+    for _ in range(n_queries):
+        ci = date.today() + timedelta(days=rnd.randrange(730))
+        queries.append((rnd.randrange(n_hotels), ci, ci + timedelta(days=rnd.randint(1, 5))))
+
+    t0 = time.perf_counter()
+    for hid, ci, co in queries:
+        idx.free_rooms(hid, ci, co)
+    indexed_s = time.perf_counter() - t0
+
+    # baseline: scan every booking of the hotel's rooms, as a per-request SQL scan would
+    by_room = {}
+    for b in bookings:
+        by_room.setdefault(b['room_id'], []).append((b['check_in'], b['check_out']))
+    t0 = time.perf_counter()
+    for hid, ci, co in queries:
+        [rid for rid in idx.by_hotel.get(hid, ())
+         if not any(s < co and e > ci for s, e in by_room.get(rid, ()))]
+    scan_s = time.perf_counter() - t0
+
+    print(f"rooms={n_rooms} bookings={n_bookings} queries={n_queries}")
+    print(f"index load: {load_s * 1000:.0f} ms")
+    print(f"indexed:    {indexed_s / n_queries * 1e6:.1f} us/query")
+    print(f"linear:     {scan_s / n_queries * 1e6:.1f} us/query")
+
+
+if __name__ == "__main__":
+    import sys
+    args = [int(a) for a in sys.argv[1:3]]
+    bench(*args)
@@ -0,0 +1,355 @@
+# benchmark.py
+"""
+Latency/throughput benchmark for the booking workload's hot paths.
+
+    python datagen.py --load                        # once, on a scratch database
+    python benchmark.py --iterations 500 --threads 8 --out bench.json
+    python benchmark.py --compare before.json after.json
+
+Runs against the database configured in db_config.py. The make_booking
+and checkout scenarios write bookings far in the future; group_booking and
+group_loop book GROUP_SIZE rooms of one class, in one sp_group_booking call
+versus one sp_make_booking call per room (skip all writes with --no-writes).
+Results are printed and, with --out, written as JSON for later comparison.
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import database
+import rollups
+import bookings_grid
+import guest_search
+from auth import login_user
+from booking import make_booking, checkout, group_booking
+from catalog import load_catalog
+from database import fetch_all, fetch_one
+from datagen import GUEST_PASSWORD
+from rooms import room_status_counts
+
+SAMPLE_SIZE = 2000
+GROUP_SIZE = 10
+
+
+class Context:
+    """Ids sampled once so every scenario draws realistic arguments."""
+
+    def __init__(self, seed):
+        self.rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.emails = [r['cust_email'] for r in fetch_all(
+            "SELECT cust_email FROM Customer WHERE cust_email LIKE %s LIMIT %s",
+            ('guest%@example.test', SAMPLE_SIZE))]
+        self.hotels = [r['hotel_id'] for r in fetch_all("SELECT hotel_id FROM Hotel")]
+        self.rooms = fetch_all(
+            "SELECT room_id, hotel_id, class_id FROM Rooms WHERE room_status <> 'Maintenance' LIMIT %s",
+            (SAMPLE_SIZE * 10,))
+        by_class = {}
+        for r in self.rooms:
+            by_class.setdefault((r['hotel_id'], r['class_id']), []).append(r['room_id'])
+        # (hotel_id, class_id, room_ids) with enough rooms for a group
+        self.groups = [(h, c, ids) for (h, c), ids in by_class.items() if len(ids) >= GROUP_SIZE]
+        self.customers = fetch_all(
+            "SELECT cust_id, user_id, cust_name, cust_mobile FROM Customer WHERE user_id IS NOT NULL LIMIT %s",
+            (SAMPLE_SIZE,))
+        pages = fetch_one("SELECT COUNT(*) AS cnt FROM Hotel")['cnt']
+        self.catalog_pages = max(1, -(-pages // 10))
+
+    def choice(self, seq):
+        with self._lock:
+            return self.rnd.choice(seq)
+
+    def randint(self, a, b):
+        with self._lock:
+            return self.rnd.randint(a, b)
+
+
+# ---------- scenarios: each returns a callable run once per iteration ----------
+def scenario_login(ctx, cold):
+    def op():
+        if not login_user(ctx.choice(ctx.emails), GUEST_PASSWORD):
+            raise RuntimeError("login failed")
+    return op
+
+
+def scenario_catalog(ctx, cold):
+    def op():
+        if cold:
+            database.clear_cache()
+        load_catalog(page=ctx.randint(1, ctx.catalog_pages))
+    return op
+
+
+def scenario_make_booking(ctx, cold):
+    # far-future stays so benchmark bookings don't collide with generated ones
+    horizon = date.today() + timedelta(days=3 * 365)
+
+    def op():
+        room = ctx.choice(ctx.rooms)
+        cust = ctx.choice(ctx.customers)
+        check_in = horizon + timedelta(days=ctx.randint(0, 3650))
+        check_out = check_in + timedelta(days=ctx.randint(1, 4))
+        make_booking(cust['user_id'], cust['cust_id'], room['hotel_id'], room['room_id'],
+                     date.today(), check_in, check_out, 'double', 'benchmark', 1000.00, 'Card')
+    return op
+
+
+def scenario_checkout(ctx, cold):
+    horizon = date.today() + timedelta(days=3 * 365)
+
+    def op():
+        room = ctx.choice(ctx.rooms)
+        check_in = horizon + timedelta(days=ctx.randint(0, 3650))
+        check_out = check_in + timedelta(days=ctx.randint(1, 4))
+        checkout(ctx.choice(ctx.emails), room['hotel_id'], room['room_id'], check_in, check_out,
+                 'double', 'benchmark', 'Card')
+    return op
+
+
+def scenario_group_booking(ctx, cold):
+    horizon = date.today() + timedelta(days=3 * 365)
+
+    def op():
+        hotel_id, class_id, _ = ctx.choice(ctx.groups)
+        cust = ctx.choice(ctx.customers)
+        check_in = horizon + timedelta(days=ctx.randint(0, 3650))
+        check_out = check_in + timedelta(days=ctx.randint(1, 4))
+        group_booking(cust['user_id'], cust['cust_id'], hotel_id, check_in, check_out,
+                      {class_id: GROUP_SIZE}, book_desc='benchmark')
+    return op
+
+
+def scenario_group_loop(ctx, cold):
+    # the same group as scenario_group_booking, one room per call
+    horizon = date.today() + timedelta(days=3 * 365)
+
+    def op():
+        hotel_id, _, room_ids = ctx.choice(ctx.groups)
+        cust = ctx.choice(ctx.customers)
+        check_in = horizon + timedelta(days=ctx.randint(0, 3650))
+        check_out = check_in + timedelta(days=ctx.randint(1, 4))
+        for room_id in room_ids[:GROUP_SIZE]:
+            make_booking(cust['user_id'], cust['cust_id'], hotel_id, room_id, date.today(),
+                         check_in, check_out, 'group', 'benchmark', 1000.00, 'Card')
+    return op
+
+
+def scenario_guest_search(ctx, cold):
+    # the staff search box: names (a third with a typo), mobile prefixes, email prefixes
+    def term():
+        cust = ctx.choice(ctx.customers)
+        kind = ctx.randint(0, 3)
+        if kind == 0 and cust['cust_mobile']:
+            return cust['cust_mobile'][:6]
+        if kind == 1:
+            return ctx.choice(ctx.emails).split('@')[0]
+        name = cust['cust_name']
+        if kind == 2 and len(name) > 3:
+            k = ctx.randint(1, len(name) - 2)
+            name = name[:k] + name[k + 1] + name[k] + name[k + 2:]
+        return name
+
+    def op():
+        guest_search.search_guests(term(), limit=20)
+    return op
+
+
+def scenario_room_stats(ctx, cold):
+    def op():
+        if cold:
+            database.clear_cache()
+        room_status_counts(ctx.choice(ctx.hotels) if ctx.randint(0, 1) else None)
+    return op
+
+
+def scenario_bookings_grid(ctx, cold):
+    def op():
+        filters = {}
+        if ctx.randint(0, 1):
+            filters['hotel_id'] = ctx.choice(ctx.hotels)
+        bookings_grid.fetch_page(filters, page_size=50)
+    return op
+
+
+def scenario_reports(ctx, cold):
+    def op():
+        if cold:
+            database.clear_cache()
+        rollups.hotel_revenue(date.today() - timedelta(days=30), date.today())
+    return op
+
+
+SCENARIOS = {
+    'login': scenario_login,
+    'catalog': scenario_catalog,
+    'make_booking': scenario_make_booking,
+    'checkout': scenario_checkout,
+    'group_booking': scenario_group_booking,
+    'group_loop': scenario_group_loop,
+    'guest_search': scenario_guest_search,
+    'room_stats': scenario_room_stats,
+    'bookings_grid': scenario_bookings_grid,
+    'reports': scenario_reports,
+}
+WRITE_SCENARIOS = {'make_booking', 'checkout', 'group_booking', 'group_loop'}
+
+
+# ---------- harness ----------
+def percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(pct / 100 * len(sorted_vals))) - 1))
+    return sorted_vals[k]
+
+
+def run_scenario(op, iterations, threads):
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def timed(_):
+        started = time.perf_counter()
+        try:
+            op()
+            ok = True
+        except Exception as e:
+            ok = False
+            err = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors.append(err)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(timed, range(iterations)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        'count': len(latencies),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'mean_ms': sum(ms) / len(ms) if ms else 0.0,
+        'p50_ms': percentile(ms, 50),
+        'p90_ms': percentile(ms, 90),
+        'p95_ms': percentile(ms, 95),
+        'p99_ms': percentile(ms, 99),
+        'max_ms': ms[-1] if ms else 0.0,
+        'throughput_ops': len(latencies) / wall if wall else 0.0,
+        'wall_s': wall,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def _table_sizes():
+    sizes = {}
+    for t in ('Hotel', 'Rooms', 'Customer', 'Booking', 'Payment'):
+        sizes[t] = fetch_one(f"SELECT COUNT(*) AS cnt FROM `{t}`")['cnt']
+    return sizes
+
+
+def run(names, iterations=200, threads=4, seed=1, cold=True, warmup=10):
+    ctx = Context(seed)
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'iterations': iterations,
+            'threads': threads,
+            'cold_cache': cold,
+            'tables': _table_sizes(),
+        },
+        'results': {},
+    }
+    for name in names:
+        op = SCENARIOS[name](ctx, cold)
+        run_scenario(op, warmup, 1)
+        res = run_scenario(op, iterations, threads)
+        report['results'][name] = res
+        print(f"{name:<14} p50 {res['p50_ms']:8.2f} ms  p95 {res['p95_ms']:8.2f} ms  "
+              f"p99 {res['p99_ms']:8.2f} ms  {res['throughput_ops']:8.1f} ops/s  "
+              f"errors {res['errors']}")
+        if res['first_error']:
+            print(f"{'':<14} first error: {res['first_error']}")
+    report['pool'] = database.pool_stats()
+    report['cache'] = database.cache_stats()
+    return report
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    print(f"{before_path} ({before['meta'].get('commit')}) -> "
+          f"{after_path} ({after['meta'].get('commit')})")
+    print(f"{'scenario':<14} {'p50 ms':>18} {'p99 ms':>18} {'ops/s':>20}")
+
+    def delta(a, b):
+        return f"{(b - a) / a * 100:+.0f}%" if a else "n/a"
+
+    for name, b in after['results'].items():
+        a = before['results'].get(name)
+        if not a:
+            continue
+        print(f"{name:<14} {a['p50_ms']:7.2f}->{b['p50_ms']:7.2f} "
+              f"{a['p99_ms']:7.2f}->{b['p99_ms']:7.2f} "
+              f"{a['throughput_ops']:7.1f}->{b['throughput_ops']:7.1f} "
+              f"({delta(a['throughput_ops'], b['throughput_ops'])})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hotel booking hot paths")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--warm-cache", action="store_true",
+                        help="let cached reads hit the query cache")
+    parser.add_argument("--no-writes", action="store_true", help="skip scenarios that write")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two results files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    if args.no_writes:
+        names = [n for n in names if n not in WRITE_SCENARIOS]
+
+    report = run(names, iterations=args.iterations, threads=args.threads,
+                 seed=args.seed, cold=not args.warm_cache)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Results written to {args.out}")
+    else:
+        json.dump(report, sys.stdout, indent=2, default=str)
+        print()
+
+
+if __name__ == "__main__":
+    main()
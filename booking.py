@@ -0,0 +1,96 @@
+# booking.py
+"""
+Booking writes. sp_make_booking and sp_checkout lock the room row and
+re-check date overlaps inside their transaction, so two customers racing for
+the same room cannot both succeed: the loser gets BookingConflict. Deadlocks
+and lock wait timeouts are retried with jittered backoff.
+
+group_booking reserves many rooms of one hotel with sp_group_booking: one
+round trip, one transaction, one combined payment.
+"""
+import json
+
+from mysql.connector import Error
+
+import availability
+import pricing
+from database import call_proc, with_retries, MAX_RETRIES
+
+
+CHECKOUT_COLUMNS = ('booking_id', 'cust_id', 'user_id', 'nights', 'nightly_rate', 'total')
+GROUP_COLUMNS = ('group_id', 'rooms_requested', 'rooms_booked', 'total', 'lead_book_id')
+GROUP_ROOM_COLUMNS = ('book_id', 'room_id', 'room_number', 'class_id', 'quoted_amt')
+
+
+class BookingConflict(Exception):
+    """The room can't be booked for these dates (taken, under maintenance, ...)."""
+
+
+def make_booking(user_id, cust_id, hotel_id, room_id, book_date, check_in, check_out,
+                 book_type, book_desc, pay_amt, pay_method, quoted_amt=None, retries=MAX_RETRIES):
+    """Book one room via sp_make_booking. Returns the new book_id."""
+    params = [user_id, cust_id, hotel_id, room_id, book_date, check_in, check_out,
+              book_type, book_desc, pay_amt, pay_method, quoted_amt]
+    try:
+        results = with_retries(lambda: call_proc('sp_make_booking', params), retries)
+    except Error as e:
+        if e.sqlstate == '45000':
+            raise BookingConflict(e.msg) from e
+        raise
+    if room_id is not None:
+        availability.record_booking(room_id, check_in, check_out)
+    return results[0][0][0] if results and results[0] else None
+
+
+def checkout(email, hotel_id, room_id, check_in, check_out, book_type, book_desc, pay_method,
+             quoted_amt=None, retries=MAX_RETRIES):
+    """
+    Customer booking form in one round trip (sp_checkout): finds or creates
+    the customer for this email and books the room at quoted_amt (from
+    pricing.py; None = class rent per night).
+    Returns {'booking_id', 'cust_id', 'user_id', 'nights', 'nightly_rate', 'total'}.
+    """
+    params = [email, hotel_id, room_id, check_in, check_out, book_type, book_desc, pay_method,
+              quoted_amt]
+    try:
+        results = with_retries(lambda: call_proc('sp_checkout', params), retries)
+    except Error as e:
+        if e.sqlstate == '45000':
+            raise BookingConflict(e.msg) from e
+        raise
+    availability.record_booking(room_id, check_in, check_out)
+    return dict(zip(CHECKOUT_COLUMNS, results[0][0]))
+
+
+def group_booking(user_id, cust_id, hotel_id, check_in, check_out, rooms_by_class,
+                  allow_partial=False, book_type='group', book_desc=None, pay_method='Card',
+                  retries=MAX_RETRIES):
+    """
+    Book several rooms of one hotel at once. rooms_by_class: {class_id: rooms}.
+    Each room is priced with pricing.RateTable for the stay. All-or-nothing
+    unless allow_partial, in which case whatever is free (at least one room)
+    is booked. Returns {'group_id', 'rooms_requested', 'rooms_booked',
+    'total', 'lead_book_id', 'rooms': [{'book_id', 'room_id', ...}]}.
+    """
+    rooms_by_class = {int(k): int(n) for k, n in rooms_by_class.items() if n > 0}
+    if not rooms_by_class:
+        raise ValueError("no rooms requested")
+    table = pricing.RateTable.load(check_in, check_out, class_ids=list(rooms_by_class))
+    request = [{'class_id': class_id, 'rooms': n,
+                'quoted_amt': table.quote(class_id, check_in, check_out)['total']}
+               for class_id, n in rooms_by_class.items() if class_id in table.row]
+    if len(request) != len(rooms_by_class):
+        raise ValueError("unknown room class")
+    params = [user_id, cust_id, hotel_id, check_in, check_out, json.dumps(request),
+              bool(allow_partial), book_type, book_desc, pay_method]
+    try:
+        results = with_retries(lambda: call_proc('sp_group_booking', params), retries)
+    except Error as e:
+        if e.sqlstate == '45000':
+            raise BookingConflict(e.msg) from e
+        raise
+    group = dict(zip(GROUP_COLUMNS, results[0][0]))
+    group['rooms'] = [dict(zip(GROUP_ROOM_COLUMNS, r)) for r in results[1]]
+    for room in group['rooms']:
+        availability.record_booking(room['room_id'], check_in, check_out)
+    return group
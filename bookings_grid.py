@@ -0,0 +1,122 @@
+# bookings_grid.py
+"""
+Admin bookings grid: keyset pagination over Booking ordered by
+(book_date DESC, book_id DESC) with server-side filters, so each page is a
+bounded index range scan no matter how many bookings exist. Archived
+bookings are only included when asked for (include_archive).
+"""
+from archive import tables
+from database import fetch_all, fetch_one
+
+# Inner query walks Booking by the keyset and picks only the page's ids;
+# the wide join then runs for those rows alone.
+PAGE_SQL = """
+    SELECT b.book_id, b.book_date, b.check_in, b.check_out, b.book_type, b.booking_status,
+           c.cust_name, c.cust_email, h.hotel_name,
+           r.room_number, hc.class_name as room_class,
+           u.user_name as booked_by,
+           p.pay_amt, p.pay_method
+    FROM (
+        SELECT b.book_id FROM {booking} b
+        {customer_join}
+        {where}
+        ORDER BY b.book_date DESC, b.book_id DESC
+        LIMIT %s
+    ) pg
+    JOIN {booking} b ON b.book_id = pg.book_id
+    JOIN Customer c ON c.cust_id = b.cust_id
+    JOIN Hotel h ON h.hotel_id = b.hotel_id
+    JOIN User u ON u.user_id = b.user_id
+    LEFT JOIN Rooms r ON r.room_id = b.room_id
+    LEFT JOIN Hotel_Class hc ON r.class_id = hc.class_id
+    LEFT JOIN {payment} p ON p.book_id = b.book_id
+    ORDER BY b.book_date DESC, b.book_id DESC
+"""
+
+COUNT_SQL = """
+    SELECT COUNT(*) AS cnt FROM (
+        SELECT 1 FROM {booking} b
+        {customer_join}
+        {where}
+        LIMIT %s
+    ) t
+"""
+
+ESTIMATE_SQL = """
+    SELECT SUM(TABLE_ROWS) AS cnt FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({names})
+"""
+
+STATUSES = ('Pending', 'Confirmed', 'Cancelled')
+
+
+def _filter_sql(filters, after=None):
+    """
+    filters: hotel_id, status, date_from, date_to (on book_date),
+             customer (email prefix, uses idx_customer_email)
+    after:   (book_date, book_id) of the last row of the previous page
+    """
+    filters = filters or {}
+    clauses, params = [], []
+    customer_join = ""
+    if filters.get('hotel_id'):
+        clauses.append("b.hotel_id = %s")
+        params.append(filters['hotel_id'])
+    if filters.get('status'):
+        clauses.append("b.booking_status = %s")
+        params.append(filters['status'])
+    if filters.get('date_from'):
+        clauses.append("b.book_date >= %s")
+        params.append(filters['date_from'])
+    if filters.get('date_to'):
+        clauses.append("b.book_date <= %s")
+        params.append(filters['date_to'])
+    if filters.get('customer'):
+        customer_join = "JOIN Customer c ON c.cust_id = b.cust_id"
+        clauses.append("c.cust_email LIKE %s")
+        params.append(filters['customer'].replace('%', r'\%').replace('_', r'\_') + '%')
+    if after:
+        clauses.append("(b.book_date < %s OR (b.book_date = %s AND b.book_id < %s))")
+        params.extend([after[0], after[0], after[1]])
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    return customer_join, where, params
+
+
+def fetch_page(filters=None, after=None, page_size=50, include_archive=False):
+    """
+    Returns {'rows': [...], 'next': cursor or None}. Pass 'next' back as
+    `after` to get the following page.
+    """
+    customer_join, where, params = _filter_sql(filters, after)
+    sql = PAGE_SQL.format(customer_join=customer_join, where=where, **tables(include_archive))
+    rows = fetch_all(sql, tuple(params) + (page_size + 1,))
+
+    # a booking with several payments spans several rows; page on bookings
+    ids = []
+    for r in rows:
+        if not ids or ids[-1] != r['book_id']:
+            ids.append(r['book_id'])
+    has_more = len(ids) > page_size
+    if has_more:
+        rows = [r for r in rows if r['book_id'] != ids[-1]]
+    last = rows[-1] if rows else None
+    return {
+        'rows': rows,
+        'next': (last['book_date'], last['book_id']) if has_more and last else None,
+    }
+
+
+def estimate_total(filters=None, cap=10000, include_archive=False):
+    """
+    Returns {'count': n, 'exact': bool}. Unfiltered uses the InnoDB row
+    estimate; filtered counts at most `cap` matching rows.
+    """
+    if not any((filters or {}).values()):
+        names = "'Booking', 'Booking_Archive'" if include_archive else "'Booking'"
+        row = fetch_one(ESTIMATE_SQL.format(names=names))
+        return {'count': int(row['cnt'] or 0) if row else 0, 'exact': False}
+    customer_join, where, params = _filter_sql(filters)
+    sql = COUNT_SQL.format(customer_join=customer_join, where=where, **tables(include_archive))
+    row = fetch_one(sql, tuple(params) + (cap + 1,))
+    cnt = row['cnt'] if row else 0
+    return {'count': min(cnt, cap), 'exact': cnt <= cap}
@@ -0,0 +1,350 @@
+# bulk_import.py
+"""
+Bulk import of users, hotels, classes, rooms, customers, bookings and
+payments from CSV or JSONL files.
+
+    python bulk_import.py --users users.csv --hotels hotels.csv \
+        --classes classes.csv --rooms rooms.csv --customers customers.jsonl \
+        --bookings bookings.jsonl --payments payments.jsonl
+
+- Files are streamed row by row; columns are named like the table columns.
+- Foreign keys are validated in memory against ids already in the database
+  plus ids imported earlier in the run, so the session can load with
+  foreign_key_checks off. Give primary keys (hotel_id, class_id, ...) in the
+  files for any rows that later files reference.
+- Rows are written with multi-row INSERTs, one transaction per chunk.
+  Progress is committed with each chunk in Import_Progress, so re-running
+  the same command resumes after the last committed chunk (--restart to
+  start over).
+- Bookings without a stay_status get one from their dates (CheckedOut,
+  CheckedIn or Expected), so past stays aren't taken for no-shows by the
+  nightly job (rooms.py).
+- Invalid rows are skipped and written to <file>.rejects.jsonl
+  (--strict to stop at the first one instead). That includes rows that
+  collide on a unique key (user_email, cust_email, hotel + room_number): a
+  chunk that hits one is re-inserted row by row and only the colliding rows
+  are rejected.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import date
+
+from mysql.connector import IntegrityError
+
+from database import connection, invalidate
+
+STAY_STATUSES = ('Expected', 'Arriving', 'CheckedIn', 'CheckedOut', 'NoShow')
+
+
+def stay_status_for(check_in, check_out, today=None):
+    """Front desk state of a stay from its dates: over, in house tonight, or still to come."""
+    today = today or date.today()
+    if check_in is None or check_out is None:
+        return 'Expected'
+    check_in = date.fromisoformat(str(check_in)[:10])
+    check_out = date.fromisoformat(str(check_out)[:10])
+    if check_out <= today:
+        return 'CheckedOut'
+    if check_in <= today:
+        return 'CheckedIn'
+    return 'Expected'
+
+
+# Load order matters: parents before children.
+TABLES = [
+    ('User', {
+        'pk': 'user_id',
+        'columns': ['user_id', 'user_name', 'user_email', 'user_mobile', 'user_address'],
+        'required': ['user_name', 'user_email'],
+        'fks': {},
+        'defaults': {},
+    }),
+    ('Hotel', {
+        'pk': 'hotel_id',
+        'columns': ['hotel_id', 'hotel_name', 'hotel_type', 'hotel_desc', 'user_id'],
+        'required': ['hotel_name'],
+        'fks': {'user_id': 'User'},
+        'defaults': {},
+    }),
+    ('Hotel_Class', {
+        'pk': 'class_id',
+        'columns': ['class_id', 'hotel_id', 'class_name', 'class_rent', 'room_count'],
+        'required': ['hotel_id', 'class_name', 'class_rent'],
+        'fks': {'hotel_id': 'Hotel'},
+        'defaults': {'room_count': 0},
+    }),
+    ('Rooms', {
+        'pk': 'room_id',
+        'columns': ['room_id', 'hotel_id', 'class_id', 'room_number', 'room_status'],
+        'required': ['hotel_id', 'class_id', 'room_number'],
+        'fks': {'hotel_id': 'Hotel', 'class_id': 'Hotel_Class'},
+        'defaults': {'room_status': 'Available'},
+    }),
+    ('Customer', {
+        'pk': 'cust_id',
+        'columns': ['cust_id', 'user_id', 'cust_name', 'cust_email', 'cust_mobile', 'cust_pass'],
+        'required': ['cust_name'],
+        'fks': {'user_id': 'User'},
+        'defaults': {},
+    }),
+    ('Booking', {
+        'pk': 'book_id',
+        'columns': ['book_id', 'user_id', 'cust_id', 'hotel_id', 'room_id', 'book_date',
+                    'check_in', 'check_out', 'book_type', 'book_desc', 'quoted_amt', 'group_id',
+                    'booking_status', 'stay_status'],
+        'required': ['user_id', 'cust_id', 'hotel_id', 'book_date'],
+        'fks': {'user_id': 'User', 'cust_id': 'Customer', 'hotel_id': 'Hotel', 'room_id': 'Rooms',
+                'group_id': 'Booking_Group'},
+        'defaults': {'booking_status': 'Confirmed'},
+        'choices': {'stay_status': STAY_STATUSES},
+        'derived': {'stay_status': lambda rec: stay_status_for(rec.get('check_in'), rec.get('check_out'))},
+    }),
+    ('Payment', {
+        'pk': 'pay_id',
+        'columns': ['pay_id', 'user_id', 'book_id', 'pay_date', 'pay_amt', 'pay_method', 'pay_desc'],
+        'required': ['user_id', 'book_id', 'pay_date', 'pay_amt'],
+        'fks': {'user_id': 'User', 'book_id': 'Booking'},
+        'defaults': {'pay_method': 'Cash'},
+    }),
+]
+SPECS = dict(TABLES)
+PKS = {t: spec['pk'] for t, spec in TABLES}
+# referenced but not imported
+PKS['Booking_Group'] = 'group_id'
+
+PROGRESS_SQL = """
+    INSERT INTO Import_Progress (source, table_name, rows_done) VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE rows_done = VALUES(rows_done)
+"""
+
+
+class BulkImportError(Exception):
+    pass
+
+
+def read_rows(path):
+    """Yield dicts from a .csv or .jsonl file; empty strings become None."""
+    if path.endswith('.jsonl') or path.endswith('.ndjson'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            for rec in csv.DictReader(f):
+                yield {k: (v if v != '' else None) for k, v in rec.items()}
+
+
+class KnownIds:
+    """Primary keys that exist in the database or were imported this run."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._ids = {}
+
+    def get(self, table):
+        ids = self._ids.get(table)
+        if ids is None:
+            cur = self.conn.cursor()
+            cur.execute(f"SELECT {PKS[table]} FROM `{table}`")
+            ids = {row[0] for row in cur}
+            cur.close()
+            self._ids[table] = ids
+        return ids
+
+
+def validate(rec, spec, known):
+    for col in spec['required']:
+        if rec.get(col) is None:
+            return f"missing {col}"
+    pk = rec.get(spec['pk'])
+    if pk is not None:
+        try:
+            rec[spec['pk']] = pk = int(pk)
+        except ValueError:
+            return f"bad {spec['pk']} {pk!r}"
+        if pk in known.get(spec['table']):
+            return f"duplicate {spec['pk']} {pk}"
+    for col, parent in spec['fks'].items():
+        val = rec.get(col)
+        if val is None:
+            continue
+        try:
+            rec[col] = val = int(val)
+        except ValueError:
+            return f"bad {col} {val!r}"
+        if val not in known.get(parent):
+            return f"unknown {col} {val}"
+    for col, derive in spec.get('derived', {}).items():
+        if rec.get(col) is None:
+            try:
+                rec[col] = derive(rec)
+            except ValueError as e:
+                return f"can't derive {col}: {e}"
+    for col, allowed in spec.get('choices', {}).items():
+        if rec.get(col) is not None and rec[col] not in allowed:
+            return f"bad {col} {rec[col]!r}"
+    return None
+
+
+def _source_key(table, path):
+    key = f"{table}:{os.path.abspath(path)}"
+    return key[-255:]
+
+
+def import_file(conn, table, path, known, chunk_size=2000, restart=False, strict=False):
+    spec = dict(SPECS[table], table=table)
+    cols = spec['columns']
+    insert_sql = (f"INSERT INTO `{table}` ({', '.join(cols)}) "
+                  f"VALUES ({', '.join(['%s'] * len(cols))})")
+    source = _source_key(table, path)
+
+    cur = conn.cursor()
+    done = 0
+    if not restart:
+        cur.execute("SELECT rows_done FROM Import_Progress WHERE source = %s", (source,))
+        row = cur.fetchone()
+        done = row[0] if row else 0
+    conn.commit()
+
+    stats = {'table': table, 'file': path, 'resumed_at': done,
+             'inserted': 0, 'rejected': 0, 'seconds': 0.0}
+    rejects = None
+    batch, new_ids = [], set()
+    lines = []  # (lineno, rec) of each batch row, for row-by-row retries
+    consumed = done
+    started = time.perf_counter()
+
+    def reject(lineno, err, rec):
+        nonlocal rejects
+        if strict:
+            raise BulkImportError(f"{path}:{lineno}: {err}")
+        if rejects is None:
+            rejects = open(path + '.rejects.jsonl', 'a', encoding='utf-8')
+        rejects.write(json.dumps({'line': lineno, 'error': err, 'row': rec}, default=str) + '\n')
+        stats['rejected'] += 1
+
+    def insert_rows():
+        """Insert the batch; on a unique key collision, row by row, rejecting the colliders."""
+        try:
+            cur.executemany(insert_sql, batch)
+            return len(batch)
+        except IntegrityError:
+            pass  # only the failed statement is rolled back; the chunk's transaction goes on
+        inserted = 0
+        for values, (lineno, rec) in zip(batch, lines):
+            try:
+                cur.execute(insert_sql, values)
+                inserted += 1
+            except IntegrityError as e:
+                new_ids.discard(rec.get(spec['pk']))
+                reject(lineno, f"duplicate key: {e.msg}", rec)
+        return inserted
+
+    def flush():
+        inserted = insert_rows() if batch else 0
+        cur.execute(PROGRESS_SQL, (source, table, consumed))
+        conn.commit()
+        stats['inserted'] += inserted
+        known.get(table).update(new_ids)
+        batch.clear()
+        lines.clear()
+        new_ids.clear()
+
+    try:
+        for lineno, rec in enumerate(read_rows(path), 1):
+            if lineno <= done:
+                continue
+            consumed = lineno
+            err = validate(rec, spec, known)
+            pk = rec.get(spec['pk'])
+            if err is None and pk is not None and pk in new_ids:
+                err = f"duplicate {spec['pk']} {pk}"
+            if err:
+                reject(lineno, err, rec)
+            else:
+                batch.append(tuple(rec[c] if rec.get(c) is not None else spec['defaults'].get(c)
+                                   for c in cols))
+                lines.append((lineno, rec))
+                if pk is not None:
+                    new_ids.add(pk)
+            if (consumed - done) % chunk_size == 0:
+                flush()
+        flush()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        if rejects is not None:
+            rejects.close()
+        stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+def run(files, chunk_size=2000, restart=False, strict=False):
+    """files: {table_name: path}. Returns per-file stats in load order."""
+    results = []
+    with connection() as conn:
+        cur = conn.cursor()
+        # FKs were validated above; skip InnoDB's per-row parent lookups
+        cur.execute("SET SESSION foreign_key_checks = 0")
+        cur.close()
+        try:
+            known = KnownIds(conn)
+            for table, _ in TABLES:
+                if files.get(table):
+                    result = import_file(conn, table, files[table], known,
+                                         chunk_size=chunk_size, restart=restart, strict=strict)
+                    results.append(result)
+                    _report(result)
+        finally:
+            cur = conn.cursor()
+            cur.execute("SET SESSION foreign_key_checks = 1")
+            cur.close()
+    invalidate(*[t for t, _ in TABLES])
+    return results
+
+
+def _report(result):
+    rate = result['inserted'] / result['seconds'] if result['seconds'] else 0
+    resumed = f" (resumed after row {result['resumed_at']})" if result['resumed_at'] else ""
+    print(f"{result['table']:<12} {result['inserted']:>10,} rows  {result['rejected']:>6,} rejected  "
+          f"{result['seconds']:>8.1f}s  {rate:>10,.0f} rows/s{resumed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import hotel data from CSV/JSONL files")
+    parser.add_argument("--users")
+    parser.add_argument("--hotels")
+    parser.add_argument("--classes")
+    parser.add_argument("--rooms")
+    parser.add_argument("--customers")
+    parser.add_argument("--bookings")
+    parser.add_argument("--payments")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="rows per transaction")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress")
+    parser.add_argument("--strict", action="store_true", help="stop at the first invalid row")
+    args = parser.parse_args()
+
+    files = {
+        'User': args.users, 'Hotel': args.hotels, 'Hotel_Class': args.classes, 'Rooms': args.rooms,
+        'Customer': args.customers, 'Booking': args.bookings, 'Payment': args.payments,
+    }
+    if not any(files.values()):
+        parser.error("give at least one input file")
+
+    started = time.perf_counter()
+    results = run(files, chunk_size=args.chunk_size, restart=args.restart, strict=args.strict)
+    total = sum(r['inserted'] for r in results)
+    elapsed = time.perf_counter() - started
+    print(f"{'TOTAL':<12} {total:>10,} rows  in {elapsed:.1f}s  "
+          f"({total / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
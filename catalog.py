@@ -0,0 +1,74 @@
+# catalog.py
+"""
+Customer hotel catalog: hotels, their room classes and the number of
+currently available rooms per class, loaded for one page in a single
+aggregated query (plus one COUNT for the pager).
+"""
+from database import fetch_all, fetch_one, query_count
+
+# The derived table picks the page of hotels first so the class/room joins
+# and the per-class aggregate only touch hotels that will be rendered.
+CATALOG_SQL = """
+    SELECT h.hotel_id, h.hotel_name, h.hotel_type, h.hotel_desc,
+           hc.class_id, hc.class_name, hc.class_rent, hc.room_count,
+           COUNT(r.room_id) AS available
+    FROM (SELECT hotel_id FROM Hotel ORDER BY hotel_id LIMIT %s OFFSET %s) pg
+    JOIN Hotel h ON h.hotel_id = pg.hotel_id
+    LEFT JOIN Hotel_Class hc ON hc.hotel_id = h.hotel_id
+    LEFT JOIN Rooms r ON r.class_id = hc.class_id AND r.room_status = 'Available'
+    GROUP BY h.hotel_id, h.hotel_name, h.hotel_type, h.hotel_desc,
+             hc.class_id, hc.class_name, hc.class_rent, hc.room_count
+    ORDER BY h.hotel_id, hc.class_rent
+"""
+
+COUNT_SQL = "SELECT COUNT(*) AS cnt FROM Hotel"
+
+
+def build_catalog(rows):
+    """Group flat catalog rows into [{hotel fields..., 'classes': [...]}]."""
+    hotels = []
+    by_id = {}
+    for r in rows:
+        hotel = by_id.get(r['hotel_id'])
+        if hotel is None:
+            hotel = {
+                'hotel_id': r['hotel_id'],
+                'hotel_name': r['hotel_name'],
+                'hotel_type': r['hotel_type'],
+                'hotel_desc': r['hotel_desc'],
+                'classes': [],
+            }
+            by_id[r['hotel_id']] = hotel
+            hotels.append(hotel)
+        if r['class_id']:
+            hotel['classes'].append({
+                'class_id': r['class_id'],
+                'class_name': r['class_name'],
+                'class_rent': r['class_rent'],
+                'room_count': r['room_count'] or 0,
+                'available': int(r['available'] or 0),
+            })
+    return hotels
+
+
+def load_catalog(page=1, page_size=10):
+    """
+    Returns {'hotels', 'total', 'page', 'pages', 'page_size', 'queries'}.
+    'queries' is the number of statements issued, so callers/benchmarks can
+    check it stays constant regardless of how many hotels/classes exist.
+    """
+    page = max(1, int(page))
+    issued = query_count()
+    total_row = fetch_one(COUNT_SQL, cached=True)
+    total = total_row['cnt'] if total_row else 0
+    pages = max(1, -(-total // page_size))
+    page = min(page, pages)
+    rows = fetch_all(CATALOG_SQL, (page_size, (page - 1) * page_size), cached=True)
+    return {
+        'hotels': build_catalog(rows),
+        'total': total,
+        'page': page,
+        'pages': pages,
+        'page_size': page_size,
+        'queries': query_count() - issued,
+    }
@@ -1,56 +1,546 @@
-# database.py
-from mysql.connector import connect, Error
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+from mysql.connector import connect, Error, InterfaceError
 from db_config import DB
+from db_pool import ConnectionPool, PoolTimeout
+from db_replicas import Replica, ReplicaSet
+import query_cache
+import query_log
 
-def get_conn():
+def get_conn(host=None, port=None):
     try:
         return connect(
-            host=DB.get("host", "localhost"),
+            host=host or DB.get("host", "localhost"),
             user=DB.get("user", "root"),
             password=DB.get("password", ""),
             database=DB.get("database", "hotel_booking"),
-            port=int(DB.get("port", 3306))
+            port=int(port or DB.get("port", 3306))
         )
     except Error as e:
         print("Database connection failed:", e)
         raise
 
-def fetch_all(query, params=()):
-    conn = get_conn()
-    cur = conn.cursor(dictionary=True)
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    cur.close(); conn.close()
+def _new_pool(factory):
+    return ConnectionPool(
+        factory,
+        size=int(DB.get("pool_size", 5)),
+        max_overflow=int(DB.get("pool_max_overflow", 10)),
+        timeout=float(DB.get("pool_timeout", 10)),
+        idle_timeout=int(DB.get("pool_idle_timeout", 300)),
+        ping_interval=int(DB.get("pool_ping_interval", 30))
+    )
+
+# One pool per process: Streamlit imports this module once, so every rerun
+# and every session reuses the same open connections.
+_pool = _new_pool(get_conn)
+
+def connection():
+    """Context manager yielding a pooled connection to the primary (returned on exit)."""
+    return _pool.connection()
+
+def pool_stats():
+    return _pool.stats()
+
+# ---------- read replicas ----------
+# fetch_all/fetch_one go to a healthy replica; writes and transactions always
+# use the primary. A session that wrote in the last read_your_writes_seconds
+# reads from the primary too, so it sees its own writes despite replica lag.
+def _replica(spec):
+    host, _, port = spec.partition(':')
+    return Replica(spec, _new_pool(lambda: get_conn(host, port or None)))
+
+_replicas = ReplicaSet(
+    [_replica(spec) for spec in DB.get("replica_hosts", [])],
+    max_lag=float(DB.get("replica_max_lag", 5)),
+    check_interval=float(DB.get("replica_check_interval", 10))
+)
+_READ_YOUR_WRITES = float(DB.get("read_your_writes_seconds", 5))
+_last_write = 0.0  # any session in this process
+
+# client errors meaning the server is unreachable (can't connect, gone away, lost)
+CONNECTION_ERRNOS = {2003, 2005, 2006, 2013, 2055}
+
+def replica_stats():
+    return _replicas.stats()
+
+def check_replicas():
+    """Run the health/lag check on every replica now."""
+    return _replicas.check_all()
+
+def _session():
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = {}
+    return session
+
+def _wrote():
+    global _last_write
+    _last_write = time.monotonic()
+    _session()['_db_last_write'] = _last_write
+
+def _sticky():
+    last = _session().get('_db_last_write')
+    return last is not None and time.monotonic() - last < _READ_YOUR_WRITES
+
+def _pick_replica(primary):
+    if primary or not _replicas or _sticky():
+        return None
+    return _replicas.pick()
+
+def _replica_failed(replica, e):
+    """True if the read should fall back to the primary; takes an unreachable replica out of rotation."""
+    if isinstance(e, PoolTimeout):
+        return True
+    if isinstance(e, InterfaceError) or (isinstance(e, Error) and e.errno in CONNECTION_ERRNOS):
+        _replicas.mark_down(replica, e)
+        return True
+    return False
+
+def _read(fn, primary=False):
+    """fn(conn) on a replica, or on the primary if none is usable or the replica fails mid-read."""
+    replica = _pick_replica(primary)
+    if replica is not None:
+        try:
+            with replica.pool.connection() as conn:
+                return fn(conn)
+        except (Error, PoolTimeout) as e:
+            if not _replica_failed(replica, e):
+                raise
+    with connection() as conn:
+        return fn(conn)
+
+@contextmanager
+def read_connection(primary=False):
+    """Pooled connection for long reads (exports): a replica when one is usable, else the primary."""
+    replica = _pick_replica(primary)
+    with ExitStack() as stack:
+        conn = None
+        if replica is not None:
+            try:
+                conn = stack.enter_context(replica.pool.connection())
+            except (Error, PoolTimeout) as e:
+                if not _replica_failed(replica, e):
+                    raise
+        if conn is None:
+            conn = stack.enter_context(connection())
+        yield conn
+
+# Statements issued by the current thread (one Streamlit script run = one thread)
+_local = threading.local()
+
+def _count():
+    _local.queries = getattr(_local, 'queries', 0) + 1
+
+def query_count():
+    return getattr(_local, 'queries', 0)
+
+def _new_run():
+    return {'queries': 0, 'db_ms': 0.0, 'acquire_ms': 0.0, 'rows': 0, 'by_label': {}, 'parallel': []}
+
+def begin_run(session=None):
+    """
+    Reset the per-run counters; call at the top of each script run. `session`
+    (st.session_state) carries read-your-writes stickiness across reruns.
+    """
+    _local.queries = 0
+    _local.run = _new_run()
+    if session is not None:
+        _local.session = session
+
+def run_stats():
+    """Statements, time and rows for the current run, plus repeated call sites."""
+    run = getattr(_local, 'run', None) or _new_run()
+    stats = dict(run, by_label=dict(run['by_label']), parallel=list(run['parallel']))
+    stats['repeated'] = sorted(((label, n) for label, n in run['by_label'].items() if n > 1),
+                               key=lambda x: -x[1])
+    return stats
+
+# Per-statement timing, per-caller totals and the slow query log
+_log = query_log.QueryLog(
+    slow_ms=float(DB.get("slow_query_ms", 200)),
+    max_entries=int(DB.get("slow_query_log_size", 200))
+)
+
+def query_stats(n=20):
+    return _log.top(n)
+
+def slow_queries():
+    return _log.slow()
+
+def reset_query_stats():
+    _log.clear()
+
+def _explain(query, params):
+    try:
+        with connection() as conn:
+            cur = conn.cursor(dictionary=True)
+            cur.execute("EXPLAIN " + query, params)
+            plan = cur.fetchall()
+            cur.close()
+        return plan
+    except Error as e:
+        return [{'error': str(e)}]
+
+def _record(kind, query, params, started, acquired, rows, label):
+    ms = (time.perf_counter() - started) * 1000
+    acquire_ms = (acquired - started) * 1000
+    label = label or query_log.caller_label()
+    run = getattr(_local, 'run', None)
+    if run is None:
+        run = _local.run = _new_run()
+    run['queries'] += 1
+    run['db_ms'] += ms
+    run['acquire_ms'] += acquire_ms
+    run['rows'] += rows
+    run['by_label'][label] = run['by_label'].get(label, 0) + 1
+    entry = _log.record(label, kind, query, params, ms, acquire_ms, rows)
+    if (entry is not None and DB.get("slow_query_explain")
+            and query.lstrip()[:6].upper() == 'SELECT'):
+        entry['plan'] = _explain(query, params)
+
+# Read-through cache for reference data; see query_cache.py for TTLs
+_cache = query_cache.QueryCache()
+
+def cache_stats():
+    return _cache.stats()
+
+def clear_cache():
+    _cache.clear()
+
+def invalidate(*tables):
+    """Drop cached reads of these tables (for writers that bypass execute())."""
+    _wrote()
+    _cache.invalidate(query_cache.written_tables({t.lower() for t in tables}))
+
+def _cached(kind, query, params, loader):
+    tables = query_cache.tables_in(query)
+    ttl = query_cache.ttl_for(tables)
+    if ttl is None:
+        return loader()
+    key = query_cache.cache_key(kind, query, params)
+    hit, value = _cache.get(key)
+    if not hit:
+        generation = _cache.generation(tables)
+        value = loader()
+        _cache.put(key, value, ttl, tables, generation)
+    # hand out copies so callers can't mutate the cached rows
+    if value is None:
+        return None
+    if kind == 'one':
+        return dict(value)
+    return [dict(r) for r in value]
+
+def _fill_primary(primary):
+    # a cache fill from a lagging replica would outlive the invalidation a write just did
+    return primary or time.monotonic() - _last_write < _READ_YOUR_WRITES
+
+def fetch_all(query, params=(), cached=False, label=None, primary=False):
+    if cached:
+        return _cached('all', query, params,
+                       lambda: fetch_all(query, params, label=label, primary=_fill_primary(primary)))
+    _count()
+    started = time.perf_counter()
+
+    def run(conn):
+        acquired = time.perf_counter()
+        cur = conn.cursor(dictionary=True)
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        cur.close()
+        return rows, acquired
+    rows, acquired = _read(run, primary)
+    _record('all', query, params, started, acquired, len(rows), label)
     return rows
 
-def fetch_one(query, params=()):
-    conn = get_conn()
-    cur = conn.cursor(dictionary=True)
-    cur.execute(query, params)
-    row = cur.fetchone()
-    cur.close(); conn.close()
+def fetch_one(query, params=(), cached=False, label=None, primary=False):
+    if cached:
+        return _cached('one', query, params,
+                       lambda: fetch_one(query, params, label=label, primary=_fill_primary(primary)))
+    _count()
+    started = time.perf_counter()
+
+    def run(conn):
+        acquired = time.perf_counter()
+        cur = conn.cursor(dictionary=True)
+        cur.execute(query, params)
+        row = cur.fetchone()
+        # drain any remaining rows so the connection can be reused
+        if cur.with_rows:
+            cur.fetchall()
+        cur.close()
+        return row, acquired
+    row, acquired = _read(run, primary)
+    _record('one', query, params, started, acquired, 1 if row else 0, label)
     return row
 
-def execute(query, params=()):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(query, params)
-    conn.commit()
-    last_id = cur.lastrowid
-    cur.close(); conn.close()
+def execute(query, params=(), label=None):
+    _count()
+    started = time.perf_counter()
+    with connection() as conn:
+        acquired = time.perf_counter()
+        cur = conn.cursor()
+        cur.execute(query, params)
+        conn.commit()
+        last_id = cur.lastrowid
+        affected = cur.rowcount
+        cur.close()
+    _wrote()
+    _record('execute', query, params, started, acquired, max(affected, 0), label)
+    _cache.invalidate(query_cache.written_tables(query_cache.tables_in(query)))
     return last_id
 
-def call_proc(proc_name, params=()):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.callproc(proc_name, params)
-    results = []
-    try:
-        for res in cur.stored_results():
-            results.append(res.fetchall())
-    except Exception:
-        pass
-    conn.commit()
-    cur.close(); conn.close()
+def call_proc(proc_name, params=(), label=None):
+    _count()
+    started = time.perf_counter()
+    with connection() as conn:
+        acquired = time.perf_counter()
+        cur = conn.cursor()
+        cur.callproc(proc_name, params)
+        results = []
+        try:
+            for res in cur.stored_results():
+                results.append(res.fetchall())
+        except Exception:
+            pass
+        conn.commit()
+        cur.close()
+    _wrote()
+    _record('proc', f"CALL {proc_name}", params, started, acquired,
+            sum(len(r) for r in results), label)
+    _cache.invalidate(query_cache.PROC_WRITES.get(proc_name, query_cache.TABLE_TTLS))
     return results
 
+def executemany(query, seq_params, label=None):
+    """Run one statement for many parameter rows with a single commit."""
+    seq_params = list(seq_params)
+    if not seq_params:
+        return 0
+    _count()
+    started = time.perf_counter()
+    with connection() as conn:
+        acquired = time.perf_counter()
+        cur = conn.cursor()
+        cur.executemany(query, seq_params)
+        conn.commit()
+        affected = cur.rowcount
+        cur.close()
+    _wrote()
+    _record('executemany', query, seq_params[0], started, acquired, max(affected, 0), label)
+    _cache.invalidate(query_cache.written_tables(query_cache.tables_in(query)))
+    return affected
+
+# ---------- parallel reads ----------
+# One bounded pool per process, shared by every session: at most
+# parallel_workers reads run at once, so batches can't exhaust the connection pool.
+_parallel_pool = None
+_parallel_lock = threading.Lock()
+
+def _parallel_executor():
+    global _parallel_pool
+    if _parallel_pool is None:
+        with _parallel_lock:
+            if _parallel_pool is None:
+                _parallel_pool = ThreadPoolExecutor(max_workers=int(DB.get("parallel_workers", 4)),
+                                                    thread_name_prefix="db-read")
+    return _parallel_pool
+
+def _run_read(fn, session):
+    # worker threads get a copy of the caller's read-your-writes state and a run of their own
+    _local.session = session
+    _local.queries = 0
+    _local.run = _new_run()
+    _local.in_parallel = True
+    started = time.perf_counter()
+    try:
+        return fn(), None, (time.perf_counter() - started) * 1000, _local.run
+    except Exception as e:
+        return None, e, (time.perf_counter() - started) * 1000, _local.run
+    finally:
+        _local.session = None
+        _local.in_parallel = False
+
+def fetch_parallel(reads, label=None):
+    """
+    Run independent reads concurrently and return {name: result} once all are
+    done. reads is {name: fn}, each fn() a read such as
+    `lambda: fetch_one(sql, params, cached=True)`; they must not depend on each
+    other or write. The batch takes as long as its slowest read. Per-read times
+    go to run_stats()['parallel']; the first failure is re-raised after all finish.
+    """
+    started = time.perf_counter()
+    # a plain snapshot: st.session_state can't be read off the script thread
+    last_write = _session().get('_db_last_write')
+    session = {} if last_write is None else {'_db_last_write': last_write}
+    if len(reads) < 2 or getattr(_local, 'in_parallel', False):
+        # nothing to overlap, or already on a worker (nesting could starve the pool)
+        outcomes = {}
+        for name, fn in reads.items():
+            read_started = time.perf_counter()
+            outcomes[name] = (fn(), None, (time.perf_counter() - read_started) * 1000, None)
+    else:
+        pool = _parallel_executor()
+        futures = {name: pool.submit(_run_read, fn, session) for name, fn in reads.items()}
+        outcomes = {name: f.result() for name, f in futures.items()}
+
+    run = getattr(_local, 'run', None)
+    if run is None:
+        run = _local.run = _new_run()
+    for _, _, _, worker_run in outcomes.values():
+        if worker_run is None:
+            continue
+        _local.queries = query_count() + worker_run['queries']
+        for key in ('queries', 'db_ms', 'acquire_ms', 'rows'):
+            run[key] += worker_run[key]
+        for call_site, n in worker_run['by_label'].items():
+            run['by_label'][call_site] = run['by_label'].get(call_site, 0) + n
+        run['parallel'] += worker_run['parallel']
+    reads_ms = {name: round(o[2], 2) for name, o in outcomes.items()}
+    run['parallel'].append({
+        'batch': label or query_log.caller_label(),
+        'reads': reads_ms,
+        'wall_ms': round((time.perf_counter() - started) * 1000, 2),
+        'sum_ms': round(sum(reads_ms.values()), 2),
+    })
+    for _, error, _, _ in outcomes.values():
+        if error is not None:
+            raise error
+    return {name: o[0] for name, o in outcomes.items()}
+
+# ---------- multi-statement transactions ----------
+# ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT: the whole transaction was rolled back, safe to rerun
+RETRYABLE_ERRNOS = {1213, 1205}
+MAX_RETRIES = 3
+
+class Tx:
+    """Statements run inside transaction(); nothing is committed until it exits."""
+
+    def __init__(self, conn, label=None):
+        self.conn = conn
+        self.label = label
+        self.written = set()
+        # rows changed (or fetched) by the last statement
+        self.rowcount = 0
+        self._savepoints = 0
+
+    def _run(self, kind, query, params, fn):
+        _count()
+        started = time.perf_counter()
+        cur = self.conn.cursor(dictionary=kind in ('all', 'one'))
+        try:
+            result, rows = fn(cur)
+        finally:
+            cur.close()
+        self.rowcount = rows
+        _record(kind, query, params, started, started, rows, self.label)
+        return result
+
+    def execute(self, query, params=()):
+        def run(cur):
+            cur.execute(query, params)
+            return cur.lastrowid, max(cur.rowcount, 0)
+        last_id = self._run('execute', query, params, run)
+        self.written |= query_cache.written_tables(query_cache.tables_in(query))
+        return last_id
+
+    def executemany(self, query, seq_params):
+        seq_params = list(seq_params)
+        if not seq_params:
+            return 0
+        def run(cur):
+            cur.executemany(query, seq_params)
+            return cur.rowcount, max(cur.rowcount, 0)
+        affected = self._run('executemany', query, seq_params[0], run)
+        self.written |= query_cache.written_tables(query_cache.tables_in(query))
+        return affected
+
+    def fetch_all(self, query, params=()):
+        def run(cur):
+            cur.execute(query, params)
+            rows = cur.fetchall()
+            return rows, len(rows)
+        return self._run('all', query, params, run)
+
+    def fetch_one(self, query, params=()):
+        def run(cur):
+            cur.execute(query, params)
+            row = cur.fetchone()
+            if cur.with_rows:
+                cur.fetchall()
+            return row, 1 if row else 0
+        return self._run('one', query, params, run)
+
+    def call_proc(self, proc_name, params=()):
+        # the procedure must not START TRANSACTION/COMMIT itself
+        def run(cur):
+            cur.callproc(proc_name, params)
+            results = [res.fetchall() for res in cur.stored_results()]
+            return results, sum(len(r) for r in results)
+        results = self._run('proc', f"CALL {proc_name}", params, run)
+        self.written |= set(query_cache.PROC_WRITES.get(proc_name, query_cache.TABLE_TTLS))
+        return results
+
+    @contextmanager
+    def savepoint(self):
+        """Nested unit: on error only its statements are rolled back, then the error propagates."""
+        self._savepoints += 1
+        name = f"sp_{self._savepoints}"
+        cur = self.conn.cursor()
+        cur.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except BaseException:
+            try:
+                cur.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            except Exception:
+                pass  # connection lost: the transaction is gone anyway; report the original error
+            raise
+        else:
+            cur.execute(f"RELEASE SAVEPOINT {name}")
+        finally:
+            cur.close()
+
+@contextmanager
+def transaction(label=None):
+    """
+    with transaction() as tx:
+        user_id = tx.execute(...)
+        tx.execute(...)
+    Commits once on exit, rolls back if the block raises.
+    """
+    with connection() as conn:
+        conn.start_transaction()
+        tx = Tx(conn, label)
+        try:
+            yield tx
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    if tx.written:
+        _wrote()
+    _cache.invalidate(tx.written)
+
+def is_retryable(e):
+    return isinstance(e, Error) and e.errno in RETRYABLE_ERRNOS
+
+def with_retries(fn, retries=MAX_RETRIES):
+    """Call fn(), re-running it after a deadlock or lock wait timeout (jittered backoff)."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Error as e:
+            if not is_retryable(e) or attempt >= retries:
+                raise
+            attempt += 1
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+
+def run_in_transaction(fn, retries=MAX_RETRIES, label=None):
+    """Run fn(tx) in a transaction, retrying the whole unit on deadlock/lock wait timeout."""
+    def attempt():
+        with transaction(label) as tx:
+            return fn(tx)
+    return with_retries(attempt, retries)
@@ -0,0 +1,196 @@
+# datagen.py
+"""
+Deterministic synthetic data for benchmarking.
+
+    python datagen.py --out data/ --hotels 50 --customers 20000 --bookings 200000
+    python datagen.py --load --hotels 50 --customers 20000 --bookings 200000
+
+The same --seed and --today always produce the same rows. Files are CSVs in
+the layout bulk_import.py reads; --load writes them to a temporary directory
+and imports them into the configured database, numbering ids after the
+existing ones.
+
+Every generated customer can log in with GUEST_PASSWORD.
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+
+import bulk_import
+from auth import hash_pass
+from database import fetch_one
+
+GUEST_PASSWORD = "guestpass"
+
+CLASS_TEMPLATES = [
+    ('Standard Room', 2500.00),
+    ('Deluxe Room', 3500.00),
+    ('Executive Suite', 5000.00),
+    ('Presidential Suite', 10000.00),
+]
+HOTEL_TYPES = ['3-Star', '4-Star Business', '5-Star Luxury', 'Boutique', 'Resort']
+CITIES = ['Bangalore', 'Mumbai', 'Delhi', 'Chennai', 'Goa', 'Jaipur', 'Kochi', 'Pune']
+
+# nights per stay and how often each occurs
+STAY_NIGHTS = [1, 2, 3, 4, 5, 7, 10, 14]
+STAY_WEIGHTS = [30, 28, 18, 9, 6, 5, 2, 2]
+PAY_METHODS = ['Card', 'UPI', 'Cash', 'Online']
+PAY_WEIGHTS = [45, 35, 10, 10]
+BOOK_TYPES = ['single', 'double', 'family']
+
+COLUMNS = {
+    'User': ['user_id', 'user_name', 'user_email', 'user_mobile', 'user_address'],
+    'Hotel': ['hotel_id', 'hotel_name', 'hotel_type', 'hotel_desc', 'user_id'],
+    'Hotel_Class': ['class_id', 'hotel_id', 'class_name', 'class_rent', 'room_count'],
+    'Rooms': ['room_id', 'hotel_id', 'class_id', 'room_number', 'room_status'],
+    'Customer': ['cust_id', 'user_id', 'cust_name', 'cust_email', 'cust_mobile', 'cust_pass'],
+    'Booking': ['book_id', 'user_id', 'cust_id', 'hotel_id', 'room_id', 'book_date',
+                'check_in', 'check_out', 'book_type', 'book_desc', 'booking_status', 'stay_status'],
+    'Payment': ['pay_id', 'user_id', 'book_id', 'pay_date', 'pay_amt', 'pay_method', 'pay_desc'],
+}
+FILE_NAMES = {
+    'User': 'users.csv', 'Hotel': 'hotels.csv', 'Hotel_Class': 'classes.csv', 'Rooms': 'rooms.csv',
+    'Customer': 'customers.csv', 'Booking': 'bookings.csv', 'Payment': 'payments.csv',
+}
+
+
+def generate(out_dir, hotels=50, classes_per_hotel=4, rooms_per_class=25, customers=20000,
+             bookings=200000, history_days=365, future_days=180, seed=42, base=None,
+             today=None):
+    """
+    Write one CSV per table into out_dir and return {table: path}.
+    base: {table: last existing id}; generated ids start after it.
+    """
+    rnd = random.Random(seed)
+    today = today or date.today()
+    base = base or {}
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {t: os.path.join(out_dir, name) for t, name in FILE_NAMES.items()}
+    files = {t: open(p, 'w', newline='', encoding='utf-8') for t, p in paths.items()}
+    writers = {t: csv.writer(f) for t, f in files.items()}
+    for t, w in writers.items():
+        w.writerow(COLUMNS[t])
+
+    try:
+        # customers, each with a linked User row
+        user_id0 = base.get('User', 0)
+        cust_id0 = base.get('Customer', 0)
+        guest_pass = hash_pass(GUEST_PASSWORD)
+        cust_users = []
+        for i in range(1, customers + 1):
+            uid, cid = user_id0 + i, cust_id0 + i
+            name = f"Guest {cid}"
+            email = f"guest{cid}@example.test"
+            mobile = f"9{rnd.randrange(10 ** 9):09d}"
+            writers['User'].writerow([uid, name, email, mobile, rnd.choice(CITIES)])
+            writers['Customer'].writerow([cid, uid, name, email, mobile, guest_pass])
+            cust_users.append((cid, uid))
+
+        # hotels -> classes -> rooms
+        rooms = []  # (room_id, hotel_id, rent)
+        class_id = base.get('Hotel_Class', 0)
+        room_id = base.get('Rooms', 0)
+        for h in range(1, hotels + 1):
+            hid = base.get('Hotel', 0) + h
+            city = CITIES[h % len(CITIES)]
+            writers['Hotel'].writerow([hid, f"{city} Grand {hid}", rnd.choice(HOTEL_TYPES),
+                                       f"Synthetic hotel #{hid} in {city}", None])
+            for c in range(classes_per_hotel):
+                class_id += 1
+                cname, rent = CLASS_TEMPLATES[c % len(CLASS_TEMPLATES)]
+                rent = round(rent * rnd.uniform(0.8, 1.3), -1)
+                n_rooms = max(1, int(rooms_per_class / (c + 1)))
+                writers['Hotel_Class'].writerow([class_id, hid, cname, f"{rent:.2f}", n_rooms])
+                for n in range(1, n_rooms + 1):
+                    room_id += 1
+                    status = 'Maintenance' if rnd.random() < 0.02 else 'Available'
+                    writers['Rooms'].writerow([room_id, hid, class_id, f"{c + 1}{n:03d}", status])
+                    rooms.append((room_id, hid, rent))
+
+        # bookings: non-overlapping stays per room, spread across the window
+        book_id = base.get('Booking', 0)
+        pay_id = base.get('Payment', 0)
+        window_start = today - timedelta(days=history_days)
+        span = history_days + future_days
+        per_room, extra = divmod(bookings, len(rooms)) if rooms else (0, 0)
+        avg_nights = sum(n * w for n, w in zip(STAY_NIGHTS, STAY_WEIGHTS)) / sum(STAY_WEIGHTS)
+        for idx, (rid, hid, rent) in enumerate(rooms):
+            quota = per_room + (1 if idx < extra else 0)
+            if not quota:
+                continue
+            mean_gap = max(0.5, span / quota - avg_nights)
+            day = window_start + timedelta(days=int(rnd.expovariate(1 / mean_gap)))
+            for _ in range(quota):
+                nights = rnd.choices(STAY_NIGHTS, STAY_WEIGHTS)[0]
+                check_in = day
+                check_out = check_in + timedelta(days=nights)
+                lead = min(365, int(rnd.expovariate(1 / 21)))
+                book_date = min(today, check_in - timedelta(days=lead))
+                # repeat guests: skew towards low customer numbers
+                cid, uid = cust_users[int(len(cust_users) * rnd.random() ** 2)]
+                r = rnd.random()
+                if r < 0.05:
+                    status = 'Cancelled'
+                elif check_in > today and r < 0.08:
+                    status = 'Pending'
+                else:
+                    status = 'Confirmed'
+                book_id += 1
+                writers['Booking'].writerow([book_id, uid, cid, hid, rid, book_date, check_in,
+                                             check_out, rnd.choice(BOOK_TYPES), None, status,
+                                             bulk_import.stay_status_for(check_in, check_out, today)])
+                if status != 'Pending':
+                    pay_id += 1
+                    writers['Payment'].writerow([
+                        pay_id, uid, book_id, book_date, f"{rent * nights:.2f}",
+                        rnd.choices(PAY_METHODS, PAY_WEIGHTS)[0],
+                        f"Payment for booking #{book_id}"])
+                day = check_out + timedelta(days=int(rnd.expovariate(1 / mean_gap)))
+    finally:
+        for f in files.values():
+            f.close()
+    return paths
+
+
+def existing_max_ids():
+    out = {}
+    for table, pk in bulk_import.PKS.items():
+        row = fetch_one(f"SELECT COALESCE(MAX({pk}), 0) AS m FROM `{table}`")
+        out[table] = int(row['m']) if row else 0
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic hotel booking data")
+    parser.add_argument("--out", help="directory for CSV files")
+    parser.add_argument("--load", action="store_true", help="import into the configured database")
+    parser.add_argument("--hotels", type=int, default=50)
+    parser.add_argument("--classes-per-hotel", type=int, default=4)
+    parser.add_argument("--rooms-per-class", type=int, default=25)
+    parser.add_argument("--customers", type=int, default=20000)
+    parser.add_argument("--bookings", type=int, default=200000)
+    parser.add_argument("--history-days", type=int, default=365)
+    parser.add_argument("--future-days", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", type=date.fromisoformat, help="anchor date (default: today)")
+    args = parser.parse_args()
+    if not args.out and not args.load:
+        parser.error("give --out DIR and/or --load")
+
+    base = existing_max_ids() if args.load else {}
+    out_dir = args.out or tempfile.mkdtemp(prefix="hotel_datagen_")
+    paths = generate(out_dir, hotels=args.hotels, classes_per_hotel=args.classes_per_hotel,
+                     rooms_per_class=args.rooms_per_class, customers=args.customers,
+                     bookings=args.bookings, history_days=args.history_days,
+                     future_days=args.future_days, seed=args.seed, base=base,
+                     today=args.today)
+    print(f"Wrote synthetic data to {out_dir}")
+    if args.load:
+        bulk_import.run(paths, restart=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,5 +8,24 @@ DB = {
     "user": os.getenv("DB_USER", "root"),
     "password": os.getenv("DB_PASSWORD", "MySQL@123"),
     "database": os.getenv("DB_NAME", "hotel_booking"),
-    "port": int(os.getenv("DB_PORT", 3306))
+    "port": int(os.getenv("DB_PORT", 3306)),
+    # connection pool (see db_pool.py)
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+    "pool_max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", 10)),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+    "pool_idle_timeout": int(os.getenv("DB_POOL_IDLE_TIMEOUT", 300)),
+    "pool_ping_interval": int(os.getenv("DB_POOL_PING_INTERVAL", 30)),
+    # slow query log (see query_log.py)
+    "slow_query_ms": float(os.getenv("DB_SLOW_QUERY_MS", 200)),
+    "slow_query_explain": os.getenv("DB_SLOW_QUERY_EXPLAIN", "0") == "1",
+    "slow_query_log_size": int(os.getenv("DB_SLOW_QUERY_LOG_SIZE", 200)),
+    # read replicas, "host[:port],host[:port]" (see db_replicas.py)
+    "replica_hosts": [h.strip() for h in os.getenv("DB_REPLICA_HOSTS", "").split(",") if h.strip()],
+    "replica_max_lag": float(os.getenv("DB_REPLICA_MAX_LAG", 5)),
+    "replica_check_interval": float(os.getenv("DB_REPLICA_CHECK_INTERVAL", 10)),
+    "read_your_writes_seconds": float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 5)),
+    # threads running database.fetch_parallel batches, per process
+    "parallel_workers": int(os.getenv("DB_PARALLEL_WORKERS", 4)),
+    # aiomysql pool of the async API, per worker process (see api.py)
+    "api_pool_size": int(os.getenv("DB_API_POOL_SIZE", 20))
 }
@@ -0,0 +1,173 @@
+# db_pool.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Small thread-safe pool of MySQL connections.
+    - keeps up to `size` idle connections open between Streamlit reruns
+    - hands out up to `max_overflow` extra connections under load, closed on return
+    - waits up to `timeout` seconds when exhausted (0 = fail immediately)
+    - pings connections idle longer than `ping_interval` before reuse
+    - closes connections idle longer than `idle_timeout`
+    """
+
+    def __init__(self, factory, size=5, max_overflow=10, timeout=10.0,
+                 idle_timeout=300, ping_interval=30):
+        self.factory = factory
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self._idle = deque()  # (conn, returned_at)
+        self._open = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "handshakes": 0,
+            "pings": 0,
+            "discarded": 0,
+            "reaped": 0,
+        }
+
+    # ---------- checkout / return ----------
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self._cond:
+            while True:
+                self._reap_locked()
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No database connection available after {self.timeout}s "
+                        f"({self._open} open)")
+                if not waited:
+                    waited = True
+                    self._stats["waits"] += 1
+                started = time.monotonic()
+                self._cond.wait(remaining)
+                self._stats["wait_time"] += time.monotonic() - started
+            self._stats["checkouts"] += 1
+
+        if conn is not None and not self._healthy(conn, returned_at):
+            self._close(conn)
+            self._stats["discarded"] += 1
+            conn = None
+        if conn is None:
+            try:
+                conn = self.factory()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            self._stats["handshakes"] += 1
+        return conn
+
+    def release(self, conn, discard=False):
+        if not discard:
+            try:
+                # end the read snapshot / abandon unfinished work before reuse
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            if discard or len(self._idle) >= self.size:
+                self._open -= 1
+                if discard:
+                    self._stats["discarded"] += 1
+                conn_to_close = conn
+            else:
+                self._idle.append((conn, time.monotonic()))
+                conn_to_close = None
+            self._cond.notify()
+        if conn_to_close is not None:
+            self._close(conn_to_close)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=not _is_usable(conn))
+            raise
+        self.release(conn)
+
+    # ---------- housekeeping ----------
+    def _healthy(self, conn, returned_at):
+        if time.monotonic() - returned_at < self.ping_interval:
+            return True
+        self._stats["pings"] += 1
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _reap_locked(self):
+        if not self.idle_timeout:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        # idle deque is ordered oldest-first; connections are reused from the right
+        while self._idle and self._idle[0][1] < cutoff:
+            conn, _ = self._idle.popleft()
+            self._open -= 1
+            self._stats["reaped"] += 1
+            self._close(conn)
+
+    def reap(self):
+        with self._cond:
+            self._reap_locked()
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._open -= 1
+                self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self._cond:
+            out = dict(self._stats)
+            out["open"] = self._open
+            out["idle"] = len(self._idle)
+            out["in_use"] = self._open - len(self._idle)
+            out["size"] = self.size
+            out["max_overflow"] = self.max_overflow
+        return out
+
+
+def _is_usable(conn):
+    try:
+        return conn.is_connected() and not conn.unread_result
+    except Exception:
+        return False
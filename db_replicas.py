@@ -0,0 +1,135 @@
+import random
+import threading
+import time
+
+from mysql.connector import Error
+
+# SHOW REPLICA STATUS needs MySQL 8.0.22+; older servers only know the SLAVE spelling
+_STATUS_QUERIES = (
+    ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+    ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+)
+
+
+class Replica:
+    """One read replica: its pool plus the result of the last health check."""
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = True
+        self.lag = None
+        self.checked_at = 0.0
+        self.last_error = None
+        self.reads = 0
+        self.failures = 0
+
+    def stats(self):
+        return {
+            "replica": self.name,
+            "healthy": self.healthy,
+            "lag_s": self.lag,
+            "checked_s_ago": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+            "reads": self.reads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "pool": self.pool.stats(),
+        }
+
+
+class ReplicaSet:
+    """
+    Read replicas behind the primary.
+    - pick() returns a random healthy replica, or None (= read from the primary)
+    - a replica is healthy if it answers and lags at most `max_lag` seconds;
+      with replication stopped (lag NULL) it is taken out of rotation
+    - health is re-checked lazily by the reading thread every `check_interval`
+      seconds, and immediately taken down when a read fails to connect
+    """
+
+    def __init__(self, replicas, max_lag=5, check_interval=10):
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def pick(self):
+        self._check_due()
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            return None
+        replica = random.choice(healthy)
+        replica.reads += 1
+        return replica
+
+    def mark_down(self, replica, error):
+        with self._lock:
+            replica.healthy = False
+            replica.failures += 1
+            replica.last_error = str(error)[:200]
+            replica.checked_at = time.monotonic()
+
+    def _check_due(self):
+        now = time.monotonic()
+        due = [r for r in self.replicas if now - r.checked_at >= self.check_interval]
+        # one thread checks; the others keep using the previous verdict
+        if not due or not self._lock.acquire(blocking=False):
+            return
+        try:
+            for replica in due:
+                self._check(replica)
+        finally:
+            self._lock.release()
+
+    def check_all(self):
+        with self._lock:
+            for replica in self.replicas:
+                self._check(replica)
+        return self.stats()
+
+    def _check(self, replica):
+        replica.checked_at = time.monotonic()
+        try:
+            replica.lag = self._lag(replica)
+        except Exception as e:
+            replica.healthy = False
+            replica.failures += 1
+            replica.last_error = str(e)[:200]
+            return
+        if replica.lag is not None and replica.lag > self.max_lag:
+            replica.healthy = False
+            replica.last_error = f"lagging {replica.lag}s (max {self.max_lag}s)"
+        else:
+            replica.healthy = True
+            replica.last_error = None
+
+    @staticmethod
+    def _lag(replica):
+        """Seconds behind the primary; None for a server that is not replicating from anything."""
+        with replica.pool.connection() as conn:
+            cur = conn.cursor(dictionary=True)
+            try:
+                for query, column in _STATUS_QUERIES:
+                    try:
+                        cur.execute(query)
+                    except Error as e:
+                        if e.errno == 1064:  # syntax error: older server, try the next spelling
+                            continue
+                        raise
+                    rows = cur.fetchall()
+                    if not rows:
+                        # a standalone server listed as a replica (e.g. a local test instance)
+                        return None
+                    lag = rows[0].get(column)
+                    if lag is None:
+                        raise RuntimeError("replication is not running")
+                    return int(lag)
+                return None
+            finally:
+                cur.close()
+
+    def stats(self):
+        return [r.stats() for r in self.replicas]
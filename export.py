@@ -0,0 +1,220 @@
+# export.py
+"""
+Streaming export of bookings and payments for finance.
+
+    python export.py bookings --from 2025-01-01 --to 2025-03-31 -o q1.csv
+    python export.py payments --hotel 3 --format jsonl -o -
+    python export.py bookings --format parquet -o bookings.parquet   # needs pyarrow
+
+Rows are read with an unbuffered cursor and written chunk by chunk, so
+memory stays flat however many rows match. Formats: csv, jsonl, parquet
+(parquet only if pyarrow is installed). Exports read from a replica when one
+is configured (DB_REPLICA_HOSTS), and cover archived bookings only with
+--include-archive.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from datetime import date
+
+from archive import tables
+from database import read_connection
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+CHUNK_SIZE = 5000
+
+# (column, type) per dataset; the type is only used for the Parquet schema
+DATASETS = {
+    'bookings': {
+        'columns': [
+            ('book_id', 'int'), ('book_date', 'date'), ('check_in', 'date'), ('check_out', 'date'),
+            ('booking_status', 'str'), ('book_type', 'str'),
+            ('hotel_id', 'int'), ('hotel_name', 'str'),
+            ('room_number', 'str'), ('room_class', 'str'),
+            ('cust_id', 'int'), ('cust_name', 'str'), ('cust_email', 'str'),
+            ('pay_id', 'int'), ('pay_date', 'date'), ('pay_amt', 'decimal'), ('pay_method', 'str'),
+        ],
+        'sql': """
+            SELECT b.book_id, b.book_date, b.check_in, b.check_out, b.booking_status, b.book_type,
+                   h.hotel_id, h.hotel_name, r.room_number, hc.class_name AS room_class,
+                   c.cust_id, c.cust_name, c.cust_email,
+                   p.pay_id, p.pay_date, p.pay_amt, p.pay_method
+            FROM {booking} b
+            JOIN Hotel h ON h.hotel_id = b.hotel_id
+            JOIN Customer c ON c.cust_id = b.cust_id
+            LEFT JOIN Rooms r ON r.room_id = b.room_id
+            LEFT JOIN Hotel_Class hc ON hc.class_id = r.class_id
+            LEFT JOIN {payment} p ON p.book_id = b.book_id
+            {where}
+            ORDER BY b.book_id
+        """,
+        'date_column': 'b.book_date',
+        'hotel_column': 'b.hotel_id',
+    },
+    'payments': {
+        'columns': [
+            ('pay_id', 'int'), ('pay_date', 'date'), ('pay_amt', 'decimal'), ('pay_method', 'str'),
+            ('pay_desc', 'str'), ('book_id', 'int'), ('hotel_id', 'int'), ('hotel_name', 'str'),
+            ('user_id', 'int'),
+        ],
+        'sql': """
+            SELECT p.pay_id, p.pay_date, p.pay_amt, p.pay_method, p.pay_desc,
+                   p.book_id, b.hotel_id, h.hotel_name, p.user_id
+            FROM {payment} p
+            JOIN {booking} b ON b.book_id = p.book_id
+            JOIN Hotel h ON h.hotel_id = b.hotel_id
+            {where}
+            ORDER BY p.pay_id
+        """,
+        'date_column': 'p.pay_date',
+        'hotel_column': 'b.hotel_id',
+    },
+}
+
+
+class ExportError(Exception):
+    pass
+
+
+def build_query(dataset, filters=None):
+    """filters: date_from, date_to (inclusive), hotel_id, include_archive."""
+    spec = DATASETS[dataset]
+    filters = filters or {}
+    clauses, params = [], []
+    if filters.get('date_from'):
+        clauses.append(f"{spec['date_column']} >= %s")
+        params.append(filters['date_from'])
+    if filters.get('date_to'):
+        clauses.append(f"{spec['date_column']} <= %s")
+        params.append(filters['date_to'])
+    if filters.get('hotel_id'):
+        clauses.append(f"{spec['hotel_column']} = %s")
+        params.append(filters['hotel_id'])
+    where = "WHERE " + " AND ".join(clauses) if clauses else ""
+    return spec['sql'].format(where=where, **tables(filters.get('include_archive'))), tuple(params)
+
+
+def stream_rows(dataset, filters=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield lists of row tuples, at most chunk_size at a time. Closing the
+    generator early drops the connection (it still has unread rows).
+    """
+    query, params = build_query(dataset, filters)
+    with read_connection() as conn:
+        cur = conn.cursor(buffered=False)
+        # a slow consumer must not make the server give up on the result set
+        cur.execute("SET SESSION net_write_timeout = 3600")
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+        cur.execute("SET SESSION net_write_timeout = DEFAULT")
+        cur.close()
+
+
+# ---------- writers: take an open binary file ----------
+def _write_csv(out, names, chunks):
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(names)
+        count = 0
+        for rows in chunks:
+            writer.writerows(rows)
+            count += len(rows)
+    finally:
+        # leave `out` open for the caller
+        text.detach()
+    return count
+
+
+def _write_jsonl(out, names, chunks):
+    count = 0
+    for rows in chunks:
+        out.write("".join(json.dumps(dict(zip(names, r)), default=str) + "\n"
+                          for r in rows).encode('utf-8'))
+        count += len(rows)
+    return count
+
+
+def _write_parquet(out, columns, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+    types = {'int': pa.int64(), 'str': pa.string(), 'date': pa.date32(),
+             'decimal': pa.decimal128(14, 2)}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    count = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for rows in chunks:
+            cols = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(cols, schema)],
+                schema=schema))
+            count += len(rows)
+    return count
+
+
+def export(dataset, fmt, out, filters=None, chunk_size=CHUNK_SIZE):
+    """Write the dataset to a binary file object. Returns {'rows', 'seconds'}."""
+    if dataset not in DATASETS:
+        raise ExportError(f"unknown dataset {dataset!r}")
+    if fmt not in FORMATS:
+        raise ExportError(f"unknown format {fmt!r}")
+    columns = DATASETS[dataset]['columns']
+    names = [name for name, _ in columns]
+    started = time.perf_counter()
+    chunks = stream_rows(dataset, filters, chunk_size)
+    try:
+        if fmt == 'csv':
+            count = _write_csv(out, names, chunks)
+        elif fmt == 'jsonl':
+            count = _write_jsonl(out, names, chunks)
+        else:
+            count = _write_parquet(out, columns, chunks)
+    finally:
+        chunks.close()
+    return {'rows': count, 'seconds': time.perf_counter() - started}
+
+
+def export_to_path(dataset, fmt, path, filters=None, chunk_size=CHUNK_SIZE):
+    with open(path, 'wb') as out:
+        return export(dataset, fmt, out, filters, chunk_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream bookings or payments to a file")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat,
+                        help="first book_date (bookings) or pay_date (payments)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="last date, inclusive")
+    parser.add_argument("--hotel", type=int, help="hotel_id")
+    parser.add_argument("--include-archive", action="store_true",
+                        help="also export bookings moved to the archive tables")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("-o", "--out", default="-", help="output file ('-' = stdout)")
+    args = parser.parse_args()
+
+    filters = {'date_from': args.date_from, 'date_to': args.date_to, 'hotel_id': args.hotel,
+               'include_archive': args.include_archive}
+    try:
+        if args.out == '-':
+            stats = export(args.dataset, args.format, sys.stdout.buffer, filters, args.chunk_size)
+        else:
+            stats = export_to_path(args.dataset, args.format, args.out, filters, args.chunk_size)
+    except ExportError as e:
+        sys.exit(str(e))
+    print(f"Exported {stats['rows']:,} {args.dataset} rows in {stats['seconds']:.1f}s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
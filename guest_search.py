@@ -0,0 +1,122 @@
+# guest_search.py
+"""
+Staff guest search by name, email, mobile or booking id. Every lookup is an
+index probe with a LIMIT:
+
+- digits ("1042", "#1042", "98450"): booking id (primary key) and mobile
+  prefix (idx_customer_mobile)
+- anything with '@': email prefix (idx_customer_email)
+- otherwise a name: FULLTEXT ngram index on cust_name (ftx_customer_name),
+  plus the email local-part prefix. Ngram matching finds names with typos;
+  the candidates are re-ranked by string similarity to the search term.
+"""
+from difflib import SequenceMatcher
+
+from database import fetch_all, fetch_one
+
+MIN_TERM = 2
+CANDIDATES = 100
+
+GUEST_COLUMNS = "c.cust_id, c.cust_name, c.cust_email, c.cust_mobile"
+
+BOOKING_SQL = f"""
+    SELECT {GUEST_COLUMNS}
+    FROM Booking b JOIN Customer c ON c.cust_id = b.cust_id
+    WHERE b.book_id = %s
+"""
+
+MOBILE_SQL = f"""
+    SELECT {GUEST_COLUMNS} FROM Customer c
+    WHERE c.cust_mobile LIKE %s
+    ORDER BY c.cust_mobile
+    LIMIT %s
+"""
+
+EMAIL_SQL = f"""
+    SELECT {GUEST_COLUMNS} FROM Customer c
+    WHERE c.cust_email LIKE %s
+    ORDER BY c.cust_email
+    LIMIT %s
+"""
+
+NAME_SQL = f"""
+    SELECT {GUEST_COLUMNS}, MATCH(c.cust_name) AGAINST (%s IN NATURAL LANGUAGE MODE) AS relevance
+    FROM Customer c
+    WHERE MATCH(c.cust_name) AGAINST (%s IN NATURAL LANGUAGE MODE)
+    ORDER BY relevance DESC
+    LIMIT %s
+"""
+
+BOOKINGS_SQL = """
+    SELECT b.book_id, b.check_in, b.check_out, b.booking_status,
+           c.cust_name, c.cust_email, h.hotel_name,
+           r.room_number, hc.class_name
+    FROM Booking b
+    JOIN Customer c ON c.cust_id = b.cust_id
+    JOIN Hotel h ON h.hotel_id = b.hotel_id
+    LEFT JOIN Rooms r ON r.room_id = b.room_id
+    LEFT JOIN Hotel_Class hc ON r.class_id = hc.class_id
+    WHERE b.cust_id IN ({ids})
+    ORDER BY b.book_date DESC
+    LIMIT %s
+"""
+
+
+def _prefix(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _similarity(term, value):
+    if not value:
+        return 0.0
+    value = value.lower()
+    # whole value or its best-matching word ("priay" vs "Priya Nair")
+    score = max(SequenceMatcher(None, term, part).ratio() for part in [value] + value.split())
+    # a search for "anand" should rank "Anand Rao" above "Ananya Das"
+    if value.startswith(term) or any(w.startswith(term) for w in value.split()):
+        score += 0.5
+    return score
+
+
+def search_guests(term, limit=20):
+    """Return up to `limit` guests, best match first, each with 'match' and 'score'."""
+    term = (term or '').strip()
+    if len(term) < MIN_TERM:
+        return []
+    found = {}
+
+    def add(rows, match, score_of):
+        for r in rows:
+            score = score_of(r)
+            best = found.get(r['cust_id'])
+            if best is None or score > best['score']:
+                r.pop('relevance', None)
+                found[r['cust_id']] = dict(r, match=match, score=round(score, 3))
+
+    digits = term.lstrip('#').replace(' ', '')
+    if digits.isdigit():
+        row = fetch_one(BOOKING_SQL, (int(digits),))
+        if row:
+            add([row], f"booking #{digits}", lambda r: 2.0)
+        if len(digits) >= 3:
+            add(fetch_all(MOBILE_SQL, (_prefix(digits), limit)), 'mobile',
+                lambda r: 1.0 + len(digits) / max(len(r['cust_mobile'] or ''), 1))
+    elif '@' in term:
+        needle = term.lower()
+        add(fetch_all(EMAIL_SQL, (_prefix(term), limit)), 'email',
+            lambda r: _similarity(needle, r['cust_email']))
+    else:
+        needle = term.lower()
+        add(fetch_all(NAME_SQL, (term, term, CANDIDATES)), 'name',
+            lambda r: _similarity(needle, r['cust_name']))
+        add(fetch_all(EMAIL_SQL, (_prefix(term), limit)), 'email',
+            lambda r: _similarity(needle, (r['cust_email'] or '').split('@')[0]))
+
+    return sorted(found.values(), key=lambda g: -g['score'])[:limit]
+
+
+def guest_bookings(cust_ids, limit=50):
+    if not cust_ids:
+        return []
+    ids = ",".join(str(int(i)) for i in cust_ids)
+    return fetch_all(BOOKINGS_SQL.format(ids=ids), (limit,))
@@ -0,0 +1,77 @@
+# inventory.py
+"""
+Admin Hotels tab data: one page of hotels (optionally filtered by name or
+type), with every class and its room status counts for the whole page in
+one batched query. Individual room lists are loaded only when asked for.
+"""
+from database import fetch_all, fetch_one
+
+HOTELS_SQL = """
+    SELECT hotel_id, hotel_name, hotel_type, hotel_desc
+    FROM Hotel
+    {where}
+    ORDER BY hotel_name, hotel_id
+    LIMIT %s OFFSET %s
+"""
+
+COUNT_SQL = "SELECT COUNT(*) AS cnt FROM Hotel {where}"
+
+# Classes plus room status counts for all hotels on the page.
+CLASSES_SQL = """
+    SELECT hc.hotel_id, hc.class_id, hc.class_name, hc.class_rent, hc.room_count,
+           COUNT(r.room_id) AS rooms_total,
+           SUM(CASE WHEN r.room_status = 'Available' THEN 1 ELSE 0 END) AS rooms_available,
+           SUM(CASE WHEN r.room_status = 'Occupied' THEN 1 ELSE 0 END) AS rooms_occupied,
+           SUM(CASE WHEN r.room_status = 'Reserved' THEN 1 ELSE 0 END) AS rooms_reserved,
+           SUM(CASE WHEN r.room_status = 'Maintenance' THEN 1 ELSE 0 END) AS rooms_maintenance
+    FROM Hotel_Class hc
+    LEFT JOIN Rooms r ON r.class_id = hc.class_id
+    WHERE hc.hotel_id IN ({ids})
+    GROUP BY hc.hotel_id, hc.class_id, hc.class_name, hc.class_rent, hc.room_count
+    ORDER BY hc.hotel_id, hc.class_rent
+"""
+
+ROOMS_SQL = """
+    SELECT r.room_id, r.room_number, r.room_status, hc.class_name
+    FROM Rooms r
+    JOIN Hotel_Class hc ON r.class_id = hc.class_id
+    WHERE r.hotel_id = %s
+    ORDER BY r.room_number
+"""
+
+
+def _search_sql(search):
+    if not search:
+        return "", ()
+    like = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return "WHERE hotel_name LIKE %s OR hotel_type LIKE %s", (like, like)
+
+
+def load_inventory(page=1, page_size=20, search=None):
+    """
+    Returns {'hotels', 'total', 'page', 'pages'}; each hotel carries its
+    'classes' with room status counts. Three queries whatever the page size.
+    """
+    where, params = _search_sql((search or "").strip())
+    total_row = fetch_one(COUNT_SQL.format(where=where), params, cached=True)
+    total = total_row['cnt'] if total_row else 0
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, int(page)), pages)
+    hotels = fetch_all(HOTELS_SQL.format(where=where),
+                       params + (page_size, (page - 1) * page_size), cached=True)
+
+    by_id = {}
+    for h in hotels:
+        h['classes'] = []
+        by_id[h['hotel_id']] = h
+    if by_id:
+        ids = ",".join(str(int(i)) for i in by_id)
+        for c in fetch_all(CLASSES_SQL.format(ids=ids), cached=True):
+            for k in ('rooms_total', 'rooms_available', 'rooms_occupied', 'rooms_reserved', 'rooms_maintenance'):
+                c[k] = int(c[k] or 0)
+            by_id[c['hotel_id']]['classes'].append(c)
+    return {'hotels': hotels, 'total': total, 'page': page, 'pages': pages}
+
+
+def hotel_rooms(hotel_id):
+    return fetch_all(ROOMS_SQL, (hotel_id,), cached=True)
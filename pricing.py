@@ -0,0 +1,229 @@
+# pricing.py
+"""
+Stay pricing from the rate calendar (see schema.sql, PRICING).
+
+A RateTable loads the nightly rates of a set of classes over a date window
+into a (classes x nights) matrix: class_rent, overridden by Rate_Calendar,
+times the weekend uplift. Its running sum prices any stay in O(1), so many
+stays for many classes are priced with a few array operations:
+
+    total = cum[:, check_out] - cum[:, check_in], then length-of-stay discount
+
+Usage:
+    python pricing.py bench [classes] [days] [stays]
+"""
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from database import fetch_all
+
+CLASSES_SQL = """
+    SELECT class_id, hotel_id, class_name, class_rent
+    FROM Hotel_Class
+    WHERE {where}
+    ORDER BY hotel_id, class_rent
+"""
+
+CALENDAR_SQL = """
+    SELECT class_id, rate_date, rate
+    FROM Rate_Calendar
+    WHERE class_id IN ({ids}) AND rate_date >= %s AND rate_date < %s
+"""
+
+RULES_SQL = """
+    SELECT rule_id, rule_type, hotel_id, class_id, weekdays, min_nights, adjust_pct
+    FROM Rate_Rule
+"""
+
+EPOCH = date(1970, 1, 1)  # a Thursday
+
+
+def _weekdays(start, n):
+    """Weekday (0=Mon .. 6=Sun) of n consecutive dates from start."""
+    first = ((start - EPOCH).days + 3) % 7
+    return (first + np.arange(n)) % 7
+
+
+def _specificity(rule):
+    return 2 if rule['class_id'] else 1 if rule['hotel_id'] else 0
+
+
+def class_where(hotel_ids=None, class_ids=None):
+    """WHERE condition for CLASSES_SQL: the given classes, else the given hotels' classes, else all."""
+    if class_ids:
+        return f"class_id IN ({','.join(str(int(i)) for i in class_ids)})"
+    if hotel_ids:
+        return f"hotel_id IN ({','.join(str(int(i)) for i in hotel_ids)})"
+    return "1 = 1"
+
+
+def class_ids_sql(classes):
+    return ",".join(str(int(c['class_id'])) for c in classes)
+
+
+class RateTable:
+    """
+    Nightly rates for `classes` ([{'class_id', 'hotel_id', 'class_rent', ...}])
+    for the nights start .. end-1.
+    """
+
+    def __init__(self, classes, start, end, calendar=(), rules=()):
+        self.classes = list(classes)
+        self.start, self.end = start, end
+        n_days = (end - start).days
+        if n_days <= 0:
+            raise ValueError("end must be after start")
+        self.row = {c['class_id']: i for i, c in enumerate(self.classes)}
+        class_ids = np.array([c['class_id'] for c in self.classes])
+        hotel_ids = np.array([c['hotel_id'] for c in self.classes])
+
+        rates = np.repeat(np.array([float(c['class_rent']) for c in self.classes])[:, None],
+                          n_days, axis=1)
+        # calendar overrides, scattered in one assignment
+        cal = [(self.row[r['class_id']], (r['rate_date'] - start).days, float(r['rate']))
+               for r in calendar if r['class_id'] in self.row and start <= r['rate_date'] < end]
+        if cal:
+            rows, cols, vals = zip(*cal)
+            rates[list(rows), list(cols)] = vals
+
+        # rules: apply least specific first so more specific ones overwrite
+        def scope(rule):
+            if rule['class_id']:
+                return class_ids == rule['class_id']
+            if rule['hotel_id']:
+                return hotel_ids == rule['hotel_id']
+            return np.ones(len(self.classes), dtype=bool)
+
+        rules = sorted(rules, key=lambda r: (_specificity(r), r.get('min_nights') or 0))
+        weekday = _weekdays(start, n_days)
+        uplift = np.zeros((len(self.classes), 7))
+        self._los = []  # (class mask, min_nights, pct), applied in order
+        for rule in rules:
+            mask = scope(rule)
+            if rule['rule_type'] == 'weekend':
+                days = [int(d) for d in (rule['weekdays'] or '').split(',') if d.strip()]
+                for d in range(7):
+                    # a more specific weekend rule replaces the whole weekly pattern
+                    uplift[mask, d] = float(rule['adjust_pct']) if d in days else 0.0
+            elif rule['rule_type'] == 'length_of_stay' and rule['min_nights']:
+                self._los.append((mask, int(rule['min_nights']), float(rule['adjust_pct'])))
+        rates *= 1 + uplift[:, weekday] / 100
+
+        self.rates = rates
+        self.cum = np.concatenate([np.zeros((len(self.classes), 1)), np.cumsum(rates, axis=1)], axis=1)
+
+    @classmethod
+    def load(cls, start, end, hotel_ids=None, class_ids=None):
+        """Rates for the given hotels' classes (or the given classes, or all)."""
+        classes = fetch_all(CLASSES_SQL.format(where=class_where(hotel_ids, class_ids)), cached=True)
+        calendar = []
+        if classes:
+            calendar = fetch_all(CALENDAR_SQL.format(ids=class_ids_sql(classes)), (start, end), cached=True)
+        rules = fetch_all(RULES_SQL, cached=True)
+        return cls(classes, start, end, calendar, rules)
+
+    def quote_many(self, check_ins, check_outs):
+        """
+        Price stays for every class at once. check_ins/check_outs are equal-
+        length sequences of dates inside the window. Returns (subtotal,
+        total) arrays of shape (classes, stays).
+        """
+        i = np.array([(d - self.start).days for d in check_ins])
+        j = np.array([(d - self.start).days for d in check_outs])
+        if len(i) and (i.min() < 0 or j.max() > self.rates.shape[1] or (j <= i).any()):
+            raise ValueError("stays must fall inside the rate window and last at least one night")
+        subtotal = self.cum[:, j] - self.cum[:, i]
+        nights = j - i
+        pct = np.zeros(subtotal.shape)
+        for mask, min_nights, adjust in self._los:
+            pct[np.ix_(mask, nights >= min_nights)] = adjust
+        total = np.round(subtotal * (1 + pct / 100), 2)
+        return np.round(subtotal, 2), total
+
+    def quote(self, class_id, check_in, check_out):
+        """{'nights', 'nightly', 'subtotal', 'adjustment', 'total'} for one stay of one class."""
+        subtotal, total = self.quote_many([check_in], [check_out])
+        row = self.row[class_id]
+        i, j = (check_in - self.start).days, (check_out - self.start).days
+        return {
+            'nights': j - i,
+            'nightly': [round(float(v), 2) for v in self.rates[row, i:j]],
+            'subtotal': float(subtotal[row, 0]),
+            'adjustment': round(float(total[row, 0] - subtotal[row, 0]), 2),
+            'total': float(total[row, 0]),
+        }
+
+
+def quote_stay(class_id, check_in, check_out):
+    return RateTable.load(check_in, check_out, class_ids=[class_id]).quote(class_id, check_in, check_out)
+
+
+def compare_classes(hotel_ids, check_in, check_out):
+    """Every class of these hotels priced for one stay, cheapest first."""
+    table = RateTable.load(check_in, check_out, hotel_ids=hotel_ids)
+    if not table.classes:
+        return []
+    _, total = table.quote_many([check_in], [check_out])
+    nights = (check_out - check_in).days
+    out = [dict(c, total=float(total[k, 0]), avg_nightly=round(float(total[k, 0]) / nights, 2))
+           for k, c in enumerate(table.classes)]
+    return sorted(out, key=lambda r: r['total'])
+
+
+# ---------- benchmark: vectorized vs per-night loop ----------
+def bench(n_classes=2000, n_days=365, n_stays=200):
+    import random
+    rnd = random.Random(1)
+    start = date(2025, 1, 1)
+    end = start + timedelta(days=n_days)
+    classes = [{'class_id': k, 'hotel_id': k // 4, 'class_rent': rnd.choice([2500, 3500, 5000])}
+               for k in range(n_classes)]
+    calendar = [{'class_id': rnd.randrange(n_classes), 'rate_date': start + timedelta(days=rnd.randrange(n_days)),
+                 'rate': rnd.randint(2000, 9000)} for _ in range(n_classes * 20)]
+    rules = [
+        {'rule_type': 'weekend', 'hotel_id': None, 'class_id': None, 'weekdays': '4,5',
+         'min_nights': None, 'adjust_pct': 15},
+        {'rule_type': 'length_of_stay', 'hotel_id': None, 'class_id': None, 'weekdays': None,
+         'min_nights': 7, 'adjust_pct': -10},
+    ]
+    stays = []
+    for _ in range(n_stays):
+        ci = start + timedelta(days=rnd.randrange(n_days - 15))
+        stays.append((ci, ci + timedelta(days=rnd.randint(1, 14))))
+
+    t0 = time.perf_counter()
+    table = RateTable(classes, start, end, calendar, rules)
+    t1 = time.perf_counter()
+    _, vec = table.quote_many([s[0] for s in stays], [s[1] for s in stays])
+    t2 = time.perf_counter()
+
+    # reference: one lookup per class per night
+    overrides = {(r['class_id'], r['rate_date']): r['rate'] for r in calendar}
+    loop = np.zeros_like(vec)
+    for k, c in enumerate(classes):
+        for s, (ci, co) in enumerate(stays):
+            total, d = 0.0, ci
+            while d < co:
+                rate = float(overrides.get((c['class_id'], d), c['class_rent']))
+                if d.weekday() in (4, 5):
+                    rate *= 1.15
+                total += rate
+                d += timedelta(days=1)
+            loop[k, s] = round(total * (0.9 if (co - ci).days >= 7 else 1), 2)
+    t3 = time.perf_counter()
+
+    print(f"{n_classes} classes x {n_stays} stays over {n_days} days")
+    print(f"build rate table  {(t1 - t0) * 1000:8.1f} ms")
+    print(f"vectorized quote  {(t2 - t1) * 1000:8.1f} ms")
+    print(f"per-night loop    {(t3 - t2) * 1000:8.1f} ms")
+    print(f"max difference    {np.abs(vec - loop).max():.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(*[int(a) for a in sys.argv[2:5]])
+    else:
+        print(__doc__)
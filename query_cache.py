@@ -0,0 +1,164 @@
+# query_cache.py
+"""
+In-process cache for read queries, keyed by SQL text + params.
+
+A query is cacheable only if every table it reads has a TTL in TABLE_TTLS;
+the shortest of those TTLs applies. Writes made through database.execute /
+call_proc drop every cached entry that reads a table the write touches, so
+TTLs only bound staleness from *other* processes.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+# Seconds a cached result may be served, per table (lower-case names)
+TABLE_TTLS = {
+    'hotel': 300,
+    'hotel_class': 300,
+    'roles': 3600,
+    'user_roles': 60,
+    'user': 60,
+    'rooms': 30,
+    'booking': 15,
+    'payment': 15,
+    'hotel_revenue_daily': 60,
+    'room_status_counts': 5,
+    'rate_calendar': 300,
+    'rate_rule': 300,
+}
+
+# Tables changed by stored procedures, whose CALL text names no tables
+PROC_WRITES = {
+    'sp_make_booking': ('booking', 'rooms', 'room_status_counts', 'payment', 'payment_audit',
+                        'hotel_revenue_daily'),
+    'sp_checkout': ('user', 'customer', 'user_roles', 'booking', 'rooms', 'room_status_counts',
+                    'payment', 'payment_audit', 'hotel_revenue_daily'),
+    'sp_group_booking': ('booking_group', 'booking', 'rooms', 'room_status_counts', 'payment',
+                         'payment_audit', 'hotel_revenue_daily'),
+    'sp_rebuild_revenue_rollup': ('hotel_revenue_daily',),
+    'sp_rebuild_room_status_counts': ('room_status_counts',),
+}
+
+# Tables changed as a side effect of writing another table (triggers)
+TRIGGER_WRITES = {
+    'booking': ('hotel_revenue_daily',),
+    'payment': ('payment_audit', 'hotel_revenue_daily'),
+    'rooms': ('room_status_counts',),
+}
+
+MAX_ENTRIES = 512
+
+_TABLE_RE = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+`?(\w+)`?', re.I)
+
+
+def tables_in(query):
+    return {t.lower() for t in _TABLE_RE.findall(query)}
+
+
+def written_tables(tables):
+    out = set(tables)
+    for t in tables:
+        out.update(TRIGGER_WRITES.get(t, ()))
+    return out
+
+
+def cache_key(kind, query, params):
+    # tuple() of a dict keeps only its keys: named placeholders need the values too
+    if isinstance(params, Mapping):
+        return kind, query, tuple(sorted(params.items()))
+    return kind, query, tuple(params)
+
+
+def ttl_for(tables):
+    if not tables or any(t not in TABLE_TTLS for t in tables):
+        return None
+    return min(TABLE_TTLS[t] for t in tables)
+
+
+class QueryCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, tables, value)
+        self._by_table = {}            # table -> {key, ...}
+        # bumped by every invalidate()/clear(), so a fill that raced a write can tell
+        self._generations = {}         # table -> int
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0,
+                       "evictions": 0, "invalidations": 0, "stale_fills": 0}
+
+    def get(self, key):
+        """Returns (True, value) on a fresh hit, else (False, None)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return False, None
+            if entry[0] <= now:
+                self._drop(key)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return True, entry[2]
+
+    def _generation(self, tables):
+        return self._epoch, tuple(self._generations.get(t, 0) for t in sorted(tables))
+
+    def generation(self, tables):
+        """Take before loading a value; pass to put() so a load that a write overtook isn't stored."""
+        with self._lock:
+            return self._generation(tables)
+
+    def put(self, key, value, ttl, tables, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation(tables):
+                self._stats["stale_fills"] += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, tables, value)
+            for t in tables:
+                self._by_table.setdefault(t, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, tables):
+        with self._lock:
+            keys = set()
+            for t in tables:
+                self._generations[t] = self._generations.get(t, 0) + 1
+                keys.update(self._by_table.get(t, ()))
+            for key in keys:
+                self._drop(key)
+            self._stats["invalidations"] += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._epoch += 1
+
+    def _drop(self, key):
+        _, tables, _ = self._entries.pop(key)
+        for t in tables:
+            keys = self._by_table.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[t]
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = len(self._entries)
+            out["max_entries"] = self.max_entries
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = out["hits"] / lookups if lookups else 0.0
+        return out
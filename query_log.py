@@ -0,0 +1,88 @@
+# query_log.py
+"""
+Statement statistics for database.py: per-caller aggregates and a bounded
+log of slow statements (optionally with their EXPLAIN plan).
+
+A caller label is "module.function:line" of the first frame outside the
+database layer, so the same inline SQL in app.py is reported per call site.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# frames in these files are skipped when labelling the caller
+_INTERNAL = {'database.py', 'query_log.py', 'query_cache.py', 'db_pool.py', 'db_replicas.py'}
+MAX_LABELS = 500
+
+
+def caller_label():
+    frame = sys._getframe(1)
+    while frame is not None:
+        if os.path.basename(frame.f_code.co_filename) not in _INTERNAL:
+            module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "?"
+
+
+def short_sql(query, limit=200):
+    text = " ".join(query.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class QueryLog:
+    def __init__(self, slow_ms=200, max_entries=200):
+        self.slow_ms = slow_ms
+        self._slow = deque(maxlen=max_entries)
+        self._by_label = {}
+        self._lock = threading.Lock()
+
+    def record(self, label, kind, query, params, ms, acquire_ms, rows):
+        """Fold one statement into the aggregates. Returns the slow-log entry or None."""
+        with self._lock:
+            agg = self._by_label.get(label)
+            if agg is None:
+                if len(self._by_label) >= MAX_LABELS:
+                    label = '(other)'
+                    agg = self._by_label.get(label)
+                if agg is None:
+                    agg = self._by_label[label] = {
+                        'label': label, 'kind': kind, 'sql': short_sql(query),
+                        'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                        'acquire_ms': 0.0, 'rows': 0,
+                    }
+            agg['count'] += 1
+            agg['total_ms'] += ms
+            agg['max_ms'] = max(agg['max_ms'], ms)
+            agg['acquire_ms'] += acquire_ms
+            agg['rows'] += rows
+            if ms < self.slow_ms:
+                return None
+            entry = {
+                'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'label': label, 'kind': kind, 'ms': round(ms, 2),
+                'acquire_ms': round(acquire_ms, 2), 'rows': rows,
+                'sql': short_sql(query, 1000), 'params': repr(tuple(params))[:200],
+                'plan': None,
+            }
+            self._slow.append(entry)
+            return entry
+
+    def slow(self):
+        with self._lock:
+            return [dict(e) for e in reversed(self._slow)]
+
+    def top(self, n=20, key='total_ms'):
+        with self._lock:
+            rows = [dict(a) for a in self._by_label.values()]
+        for r in rows:
+            r['avg_ms'] = r['total_ms'] / r['count']
+        rows.sort(key=lambda r: r[key], reverse=True)
+        return rows[:n]
+
+    def clear(self):
+        with self._lock:
+            self._slow.clear()
+            self._by_label.clear()
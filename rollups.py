@@ -0,0 +1,62 @@
+# rollups.py
+"""
+Revenue reporting from the Hotel_Revenue_Daily rollup (see schema.sql).
+
+Usage:
+    python rollups.py rebuild                      # whole history
+    python rollups.py rebuild --from 2025-01-01 --to 2025-03-31
+"""
+import argparse
+import time
+from datetime import date
+
+from database import fetch_all, fetch_one, call_proc
+
+HOTEL_REVENUE_SQL = """
+    SELECT h.hotel_id, h.hotel_name,
+           COALESCE(SUM(d.revenue), 0) AS total_revenue,
+           COALESCE(SUM(d.booking_count), 0) AS booking_count,
+           SUM(d.revenue) / NULLIF(SUM(d.payment_count), 0) AS avg_payment
+    FROM Hotel h
+    LEFT JOIN Hotel_Revenue_Daily d
+           ON d.hotel_id = h.hotel_id
+          AND (%s IS NULL OR d.rev_date >= %s)
+          AND (%s IS NULL OR d.rev_date <= %s)
+    GROUP BY h.hotel_id, h.hotel_name
+    ORDER BY total_revenue DESC
+"""
+
+TOTAL_REVENUE_SQL = "SELECT COALESCE(SUM(revenue), 0) AS revenue FROM Hotel_Revenue_Daily"
+
+
+def hotel_revenue(date_from=None, date_to=None):
+    """Revenue, bookings and average payment per hotel for [date_from, date_to]."""
+    return fetch_all(HOTEL_REVENUE_SQL, (date_from, date_from, date_to, date_to), cached=True)
+
+
+def total_revenue():
+    row = fetch_one(TOTAL_REVENUE_SQL, cached=True)
+    return row['revenue'] if row else 0
+
+
+def rebuild(date_from=None, date_to=None):
+    call_proc('sp_rebuild_revenue_rollup', (date_from, date_to))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the revenue rollup tables")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rb = sub.add_parser("rebuild", help="recompute Hotel_Revenue_Daily from Booking/Payment")
+    rb.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    rb.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        started = time.perf_counter()
+        rebuild(args.date_from, args.date_to)
+        span = f"{args.date_from or 'start'} .. {args.date_to or 'end'}"
+        print(f"Rebuilt revenue rollup for {span} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# rooms.py
+"""
+Room status queries and transitions used by the staff dashboard.
+
+Status counts come from Room_Status_Counts, which triggers on Rooms keep
+current (see schema.sql), so the dashboard never scans Rooms.
+
+The nightly job walks Booking.stay_status forward (arrivals due today are
+flagged, unchecked-in stays become no-shows and release their room, in-house
+guests past their check-out depart) and then recomputes every room's status
+from the booking calendar. Each step is one set-based UPDATE that only
+touches rows whose state is out of date, so re-running it changes nothing.
+
+Usage:
+    python rooms.py rebuild-counts     # recount Room_Status_Counts from Rooms
+    python rooms.py nightly [--date 2025-06-01]
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from database import fetch_all, call_proc, run_in_transaction
+
+# Seconds between automatic refreshes of the staff dashboard counters
+REFRESH_SECONDS = 10
+
+STATUS_KEYS = {
+    'Available': 'available',
+    'Occupied': 'occupied',
+    'Reserved': 'reserved',
+    'Maintenance': 'maintenance',
+}
+
+STATUS_COUNTS_SQL = """
+    SELECT room_status, SUM(room_count) AS cnt
+    FROM Room_Status_Counts
+    {where}
+    GROUP BY room_status
+"""
+
+
+# A missed run still catches no-shows whose check-in was this many days ago
+NO_SHOW_LOOKBACK_DAYS = 3
+
+CHECK_IN_SQL = """
+    UPDATE Booking b
+    LEFT JOIN Rooms r ON r.room_id = b.room_id
+    SET b.stay_status = 'CheckedIn', b.booking_status = 'Confirmed', r.room_status = 'Occupied'
+    WHERE b.book_id = %s
+      AND b.booking_status <> 'Cancelled'
+      AND b.stay_status IN ('Expected', 'Arriving')
+      AND b.check_in <= CURDATE() AND b.check_out > CURDATE()
+      AND (r.room_id IS NULL OR r.room_status <> 'Maintenance')
+"""
+
+DEPARTURES_SQL = """
+    UPDATE Booking
+    SET stay_status = 'CheckedOut'
+    WHERE stay_status = 'CheckedIn' AND check_out <= %s
+"""
+
+# booking_status is left alone: NoShow alone releases the room (overlap checks
+# skip it), so a wrongly flagged stay is fixed by resetting stay_status.
+NO_SHOWS_SQL = """
+    UPDATE Booking
+    SET stay_status = 'NoShow'
+    WHERE stay_status IN ('Expected', 'Arriving')
+      AND check_in >= %s AND check_in < %s
+      AND booking_status <> 'Cancelled'
+"""
+
+ARRIVALS_SQL = """
+    UPDATE Booking
+    SET stay_status = 'Arriving'
+    WHERE stay_status = 'Expected' AND check_in = %s
+      AND booking_status <> 'Cancelled'
+"""
+
+# Occupied if a guest is in house tonight, Reserved if a stay covering tonight
+# has not checked in yet, otherwise Available. Maintenance is left alone.
+ROOM_STATUS_SQL = """
+    UPDATE Rooms r
+    JOIN (
+        SELECT r2.room_id,
+               CASE WHEN MAX(b.stay_status = 'CheckedIn') = 1 THEN 'Occupied'
+                    WHEN COUNT(b.book_id) > 0 THEN 'Reserved'
+                    ELSE 'Available' END AS target
+        FROM Rooms r2
+        LEFT JOIN Booking b
+               ON b.room_id = r2.room_id
+              AND b.check_in <= %s AND b.check_out > %s
+              AND b.booking_status <> 'Cancelled'
+              AND b.stay_status IN ('Expected', 'Arriving', 'CheckedIn')
+        WHERE r2.room_status <> 'Maintenance'
+        GROUP BY r2.room_id
+    ) t ON t.room_id = r.room_id
+    SET r.room_status = t.target
+    WHERE r.room_status <> t.target
+"""
+
+
+def room_status_counts(hotel_id=None):
+    """{'total_rooms', 'available', 'occupied', 'reserved', 'maintenance'}, optionally for one hotel."""
+    if hotel_id:
+        rows = fetch_all(STATUS_COUNTS_SQL.format(where="WHERE hotel_id = %s"), (hotel_id,), cached=True)
+    else:
+        rows = fetch_all(STATUS_COUNTS_SQL.format(where=""), cached=True)
+    counts = {key: 0 for key in STATUS_KEYS.values()}
+    for r in rows:
+        key = STATUS_KEYS.get(r['room_status'])
+        if key:
+            counts[key] = int(r['cnt'] or 0)
+    counts['total_rooms'] = sum(counts.values())
+    return counts
+
+
+def rebuild_counts():
+    call_proc('sp_rebuild_room_status_counts')
+
+
+def check_in(book_id):
+    """Check a guest in: booking and room in one UPDATE. False if the booking isn't due or its room is in Maintenance."""
+    def work(tx):
+        tx.execute(CHECK_IN_SQL, (book_id,))
+        return tx.rowcount > 0
+    return run_in_transaction(work, label="rooms.check_in")
+
+
+def run_nightly(today=None):
+    """
+    Move the estate to `today`'s state. Returns {'date', 'steps': [{'step',
+    'rows', 'ms'}], 'total_ms'}; each step commits on its own.
+    """
+    today = today or date.today()
+    steps = [
+        ('departures', DEPARTURES_SQL, (today,)),
+        ('no_shows', NO_SHOWS_SQL, (today - timedelta(days=NO_SHOW_LOOKBACK_DAYS), today)),
+        ('arrivals', ARRIVALS_SQL, (today,)),
+        ('room_status', ROOM_STATUS_SQL, (today, today)),
+    ]
+    report = {'date': today, 'steps': []}
+    started = time.perf_counter()
+    for name, sql, params in steps:
+        step_started = time.perf_counter()
+
+        def work(tx):
+            tx.execute(sql, params)
+            return tx.rowcount
+        rows = run_in_transaction(work, label=f"rooms.nightly:{name}")
+        report['steps'].append({'step': name, 'rows': rows,
+                                'ms': round((time.perf_counter() - step_started) * 1000, 1)})
+    report['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain room status counters")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild-counts", help="recompute Room_Status_Counts from Rooms")
+    nightly = sub.add_parser("nightly", help="arrivals, no-shows, departures and room status")
+    nightly.add_argument("--date", type=date.fromisoformat, help="run as of this date (default today)")
+    args = parser.parse_args()
+
+    if args.command == "rebuild-counts":
+        started = time.perf_counter()
+        rebuild_counts()
+        print(f"Rebuilt room status counters in {time.perf_counter() - started:.2f}s")
+    elif args.command == "nightly":
+        report = run_nightly(args.date)
+        for step in report['steps']:
+            print(f"{step['step']:<12} {step['rows']:>8,} rows  {step['ms']:>9.1f} ms")
+        print(f"Nightly room status for {report['date']} done in {report['total_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
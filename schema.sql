@@ -95,6 +95,25 @@ CREATE TABLE Customer (
     FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE SET NULL
 );
 
+-- One row per multi-room booking made with sp_group_booking; its Booking
+-- rows carry group_id and the combined payment hangs off lead_book_id.
+CREATE TABLE Booking_Group (
+    group_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    cust_id INT NOT NULL,
+    hotel_id INT NOT NULL,
+    check_in DATE NOT NULL,
+    check_out DATE NOT NULL,
+    rooms_requested INT NOT NULL,
+    rooms_booked INT NOT NULL DEFAULT 0,
+    total_amt DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    lead_book_id INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (cust_id) REFERENCES Customer(cust_id) ON DELETE CASCADE,
+    FOREIGN KEY (hotel_id) REFERENCES Hotel(hotel_id) ON DELETE CASCADE
+);
+
 CREATE TABLE Booking (
     book_id INT AUTO_INCREMENT PRIMARY KEY,
     user_id INT NOT NULL,
@@ -106,11 +125,16 @@ CREATE TABLE Booking (
     check_out DATE,
     book_type VARCHAR(50),
     book_desc TEXT,
+    quoted_amt DECIMAL(10,2),
+    group_id INT,
     booking_status ENUM('Pending','Confirmed','Cancelled') DEFAULT 'Confirmed',
+    -- front desk state, moved along by check-in and the nightly job (rooms.py)
+    stay_status ENUM('Expected','Arriving','CheckedIn','CheckedOut','NoShow') NOT NULL DEFAULT 'Expected',
     FOREIGN KEY (user_id) REFERENCES User(user_id) ON DELETE CASCADE,
     FOREIGN KEY (cust_id) REFERENCES Customer(cust_id) ON DELETE CASCADE,
     FOREIGN KEY (hotel_id) REFERENCES Hotel(hotel_id) ON DELETE CASCADE,
-    FOREIGN KEY (room_id) REFERENCES Rooms(room_id) ON DELETE SET NULL
+    FOREIGN KEY (room_id) REFERENCES Rooms(room_id) ON DELETE SET NULL,
+    FOREIGN KEY (group_id) REFERENCES Booking_Group(group_id) ON DELETE SET NULL
 );
 
 -- ==========================
@@ -140,6 +164,77 @@ CREATE TABLE IF NOT EXISTS Payment_Audit (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- ==========================
+-- 6️⃣ REPORTING ROLLUPS
+-- ==========================
+-- Per hotel per day: bookings made (by book_date) and payments received
+-- (by pay_date). Maintained by trg_after_booking / trg_after_payment;
+-- rebuild with CALL sp_rebuild_revenue_rollup(NULL, NULL) or `python rollups.py rebuild`.
+CREATE TABLE IF NOT EXISTS Hotel_Revenue_Daily (
+    hotel_id INT NOT NULL,
+    rev_date DATE NOT NULL,
+    booking_count INT NOT NULL DEFAULT 0,
+    payment_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+    PRIMARY KEY (hotel_id, rev_date),
+    KEY idx_revenue_date (rev_date),
+    FOREIGN KEY (hotel_id) REFERENCES Hotel(hotel_id) ON DELETE CASCADE
+);
+
+-- Rooms per hotel per status for the staff dashboard. Maintained by the
+-- trg_rooms_* triggers on every room insert / status change / delete;
+-- rebuild with CALL sp_rebuild_room_status_counts() or `python rooms.py rebuild-counts`.
+CREATE TABLE IF NOT EXISTS Room_Status_Counts (
+    hotel_id INT NOT NULL,
+    room_status ENUM('Available','Occupied','Maintenance','Reserved') NOT NULL,
+    room_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (hotel_id, room_status),
+    FOREIGN KEY (hotel_id) REFERENCES Hotel(hotel_id) ON DELETE CASCADE
+);
+
+-- ==========================
+-- PRICING (see pricing.py)
+-- ==========================
+-- Nightly rate per class per date (seasons, events). Dates without a row
+-- are charged Hotel_Class.class_rent.
+CREATE TABLE IF NOT EXISTS Rate_Calendar (
+    class_id INT NOT NULL,
+    rate_date DATE NOT NULL,
+    rate DECIMAL(10,2) NOT NULL,
+    PRIMARY KEY (class_id, rate_date),
+    FOREIGN KEY (class_id) REFERENCES Hotel_Class(class_id) ON DELETE CASCADE
+);
+
+-- Adjustments on top of the nightly rate, in percent (+ uplift, - discount).
+-- Scope: class_id set = that class, else hotel_id set = that hotel, else all;
+-- the most specific matching rule wins.
+--   weekend:        applied to nights whose weekday is in `weekdays` (0=Mon .. 6=Sun)
+--   length_of_stay: applied to the whole stay when nights >= min_nights
+--                   (the rule with the highest qualifying min_nights wins)
+CREATE TABLE IF NOT EXISTS Rate_Rule (
+    rule_id INT AUTO_INCREMENT PRIMARY KEY,
+    rule_type ENUM('weekend','length_of_stay') NOT NULL,
+    hotel_id INT,
+    class_id INT,
+    weekdays VARCHAR(20) DEFAULT '4,5',
+    min_nights INT,
+    adjust_pct DECIMAL(5,2) NOT NULL,
+    FOREIGN KEY (hotel_id) REFERENCES Hotel(hotel_id) ON DELETE CASCADE,
+    FOREIGN KEY (class_id) REFERENCES Hotel_Class(class_id) ON DELETE CASCADE
+);
+
+-- ==========================
+-- 6️⃣ BULK IMPORT PROGRESS
+-- ==========================
+-- One row per imported file; rows_done is committed in the same
+-- transaction as each chunk so `bulk_import.py` resumes exactly.
+CREATE TABLE IF NOT EXISTS Import_Progress (
+    source VARCHAR(255) PRIMARY KEY,
+    table_name VARCHAR(64) NOT NULL,
+    rows_done BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
 -- ==========================
 -- 6️⃣ INDEXES FOR PERFORMANCE
 -- ==========================
@@ -149,33 +244,96 @@ CREATE INDEX idx_customer_email ON Customer(cust_email);
 CREATE INDEX idx_payment_user ON Payment(user_id);
 CREATE INDEX idx_rooms_hotel ON Rooms(hotel_id);
 CREATE INDEX idx_rooms_status ON Rooms(room_status);
+-- Date-range overlap checks per room (availability engine, sp_make_booking)
+CREATE INDEX idx_booking_room_dates ON Booking(room_id, check_in, check_out);
+-- Keyset pagination of the admin bookings grid, optionally per hotel / status
+CREATE INDEX idx_booking_hotel_date ON Booking(hotel_id, book_date, book_id);
+CREATE INDEX idx_booking_status_date ON Booking(booking_status, book_date, book_id);
+-- Staff guest search (guest_search.py): mobile prefix, typo-tolerant name
+-- matching (ngram tokens, default ngram_token_size=2), a guest's bookings
+CREATE INDEX idx_customer_mobile ON Customer(cust_mobile);
+CREATE INDEX idx_booking_cust_date ON Booking(cust_id, book_date);
+
+-- The ngram parser is MySQL-only; MariaDB gets a word-based index instead
+-- (whole-word name matches, no typo tolerance)
+DELIMITER $$
+CREATE PROCEDURE sp_tmp_customer_name_index()
+BEGIN
+    DECLARE CONTINUE HANDLER FOR SQLEXCEPTION
+        CREATE FULLTEXT INDEX ftx_customer_name ON Customer(cust_name);
+    CREATE FULLTEXT INDEX ftx_customer_name ON Customer(cust_name) WITH PARSER ngram;
+END$$
+DELIMITER ;
+CALL sp_tmp_customer_name_index();
+DROP PROCEDURE sp_tmp_customer_name_index;
+
+-- Stays overlapping a reporting window (analytics.py): check_out > window start
+CREATE INDEX idx_booking_stay ON Booking(check_out, check_in);
+-- Nightly room status job (rooms.py): arrivals, no-shows, departures
+CREATE INDEX idx_booking_stay_status ON Booking(stay_status, check_in);
+-- Archival (archive.py) moves a booking's payments and audit rows with it
+CREATE INDEX idx_payment_audit_book ON Payment_Audit(book_id);
+
+-- ==========================
+-- 6️⃣ ARCHIVE (cold history)
+-- ==========================
+-- Closed bookings older than the archive horizon, with their payments and
+-- audit rows, are moved here in batches by `python archive.py run`. Same
+-- columns and indexes as the live tables (no foreign keys) plus archived_at.
+-- Live tables only hold the working set; vw_*_all reads both.
+CREATE TABLE IF NOT EXISTS Booking_Archive LIKE Booking;
+ALTER TABLE Booking_Archive ADD COLUMN archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+CREATE TABLE IF NOT EXISTS Payment_Archive LIKE Payment;
+ALTER TABLE Payment_Archive ADD COLUMN archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+CREATE TABLE IF NOT EXISTS Payment_Audit_Archive LIKE Payment_Audit;
+ALTER TABLE Payment_Audit_Archive ADD COLUMN archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
 
 -- ==========================
 -- 7️⃣ VIEWS
 -- ==========================
 
--- View: Hotel Revenue Summary
+-- View: Hotel Revenue Summary (reads the daily rollup, not raw payments)
 CREATE OR REPLACE VIEW vw_hotel_revenue AS
 SELECT 
     h.hotel_id,
     h.hotel_name,
     h.hotel_type,
-    COUNT(DISTINCT b.book_id) as total_bookings,
-    COALESCE(SUM(p.pay_amt), 0) as total_revenue,
-    AVG(p.pay_amt) as avg_payment
+    COALESCE(SUM(d.booking_count), 0) as total_bookings,
+    COALESCE(SUM(d.revenue), 0) as total_revenue,
+    SUM(d.revenue) / NULLIF(SUM(d.payment_count), 0) as avg_payment
 FROM Hotel h
-LEFT JOIN Booking b ON h.hotel_id = b.hotel_id
-LEFT JOIN Payment p ON b.book_id = p.book_id
+LEFT JOIN Hotel_Revenue_Daily d ON d.hotel_id = h.hotel_id
 GROUP BY h.hotel_id, h.hotel_name, h.hotel_type;
 
+-- Views: live + archived rows, for historical reports that opt in
+CREATE OR REPLACE VIEW vw_booking_all AS
+SELECT book_id, user_id, cust_id, hotel_id, room_id, book_date, check_in, check_out,
+       book_type, book_desc, quoted_amt, group_id, booking_status, stay_status
+FROM Booking
+UNION ALL
+SELECT book_id, user_id, cust_id, hotel_id, room_id, book_date, check_in, check_out,
+       book_type, book_desc, quoted_amt, group_id, booking_status, stay_status
+FROM Booking_Archive;
+
+CREATE OR REPLACE VIEW vw_payment_all AS
+SELECT pay_id, user_id, book_id, pay_date, pay_amt, pay_method, pay_desc FROM Payment
+UNION ALL
+SELECT pay_id, user_id, book_id, pay_date, pay_amt, pay_method, pay_desc FROM Payment_Archive;
+
+CREATE OR REPLACE VIEW vw_payment_audit_all AS
+SELECT audit_id, pay_id, book_id, pay_date, pay_amt, created_at FROM Payment_Audit
+UNION ALL
+SELECT audit_id, pay_id, book_id, pay_date, pay_amt, created_at FROM Payment_Audit_Archive;
+
 -- ==========================
 -- 9️⃣ STORED PROCEDURES
 -- ==========================
 
 DELIMITER $$
 
--- PROCEDURE: BOOKING
-CREATE PROCEDURE sp_make_booking(
+-- PROCEDURE: Book one room inside the caller's transaction (no START/COMMIT
+-- here). Locks the room row, re-checks overlaps, inserts Booking + Payment.
+CREATE PROCEDURE sp_book_room(
     IN p_user_id INT,
     IN p_cust_id INT,
     IN p_hotel_id INT,
@@ -186,33 +344,384 @@ CREATE PROCEDURE sp_make_booking(
     IN p_book_type VARCHAR(50),
     IN p_book_desc TEXT,
     IN p_pay_amt DECIMAL(10,2),
-    IN p_pay_method VARCHAR(20)
+    IN p_pay_method VARCHAR(20),
+    IN p_quoted_amt DECIMAL(10,2),
+    OUT p_book_id INT
 )
 BEGIN
-    DECLARE last_book_id INT;
-    START TRANSACTION;
+    DECLARE v_room_status VARCHAR(20);
+    DECLARE v_conflicts INT DEFAULT 0;
+
+    IF p_room_id IS NOT NULL THEN
+        -- Lock the room row: concurrent bookings of the same room queue here
+        SELECT room_status INTO v_room_status
+        FROM Rooms
+        WHERE room_id = p_room_id AND hotel_id = p_hotel_id
+        FOR UPDATE;
+
+        IF v_room_status IS NULL THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Room does not belong to this hotel';
+        END IF;
+        IF v_room_status = 'Maintenance' THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Room is under maintenance';
+        END IF;
+
+        -- Re-check overlaps under the lock, reading the latest committed rows
+        SELECT COUNT(*) INTO v_conflicts
+        FROM Booking
+        WHERE room_id = p_room_id
+          AND booking_status <> 'Cancelled'
+          AND stay_status <> 'NoShow'
+          AND check_in < p_check_out
+          AND check_out > p_check_in
+        LOCK IN SHARE MODE;
+
+        IF v_conflicts > 0 THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Room is already booked for the selected dates';
+        END IF;
+    END IF;
     
     -- Insert booking with user_id and room_id
-    INSERT INTO Booking (user_id, cust_id, hotel_id, room_id, book_date, check_in, check_out, book_type, book_desc)
-    VALUES (p_user_id, p_cust_id, p_hotel_id, p_room_id, p_book_date, p_check_in, p_check_out, p_book_type, p_book_desc);
+    INSERT INTO Booking (user_id, cust_id, hotel_id, room_id, book_date, check_in, check_out, book_type, book_desc, quoted_amt)
+    VALUES (p_user_id, p_cust_id, p_hotel_id, p_room_id, p_book_date, p_check_in, p_check_out, p_book_type, p_book_desc, p_quoted_amt);
     
-    SET last_book_id = LAST_INSERT_ID();
+    SET p_book_id = LAST_INSERT_ID();
     
-    -- Update room status to Reserved
-    IF p_room_id IS NOT NULL THEN
+    -- Room status reflects today only: future stays are tracked by their dates
+    IF p_room_id IS NOT NULL AND p_check_in <= CURDATE() THEN
         UPDATE Rooms SET room_status = 'Reserved' WHERE room_id = p_room_id;
     END IF;
     
     -- Insert payment with user_id
     IF p_pay_amt > 0 THEN
         INSERT INTO Payment (user_id, book_id, pay_date, pay_amt, pay_method, pay_desc)
-        VALUES (p_user_id, last_book_id, p_book_date, p_pay_amt, p_pay_method, CONCAT('Payment for booking #', last_book_id));
+        VALUES (p_user_id, p_book_id, p_book_date, p_pay_amt, p_pay_method, CONCAT('Payment for booking #', p_book_id));
     END IF;
-    
+END$$
+
+-- PROCEDURE: BOOKING
+CREATE PROCEDURE sp_make_booking(
+    IN p_user_id INT,
+    IN p_cust_id INT,
+    IN p_hotel_id INT,
+    IN p_room_id INT,
+    IN p_book_date DATE,
+    IN p_check_in DATE,
+    IN p_check_out DATE,
+    IN p_book_type VARCHAR(50),
+    IN p_book_desc TEXT,
+    IN p_pay_amt DECIMAL(10,2),
+    IN p_pay_method VARCHAR(20),
+    IN p_quoted_amt DECIMAL(10,2)
+)
+BEGIN
+    DECLARE last_book_id INT;
+
+    -- Any error (including a conflict signalled below) undoes the whole booking
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    IF p_check_in IS NULL OR p_check_out IS NULL OR p_check_out <= p_check_in THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Check-out must be after check-in';
+    END IF;
+
+    START TRANSACTION;
+    CALL sp_book_room(p_user_id, p_cust_id, p_hotel_id, p_room_id, p_book_date, p_check_in,
+                      p_check_out, p_book_type, p_book_desc, p_pay_amt, p_pay_method, p_quoted_amt,
+                      last_book_id);
     COMMIT;
     SELECT last_book_id AS booking_id;
 END$$
 
+-- PROCEDURE: CHECKOUT (customer booking form in one round trip)
+-- Finds or creates the customer by email (with its User row and customer
+-- role) and books the room, all in one transaction. The stay is charged at
+-- p_quoted_amt (from pricing.py) or, if NULL, the class rent per night.
+-- Returns the booking id and the price breakdown.
+CREATE PROCEDURE sp_checkout(
+    IN p_email VARCHAR(150),
+    IN p_hotel_id INT,
+    IN p_room_id INT,
+    IN p_check_in DATE,
+    IN p_check_out DATE,
+    IN p_book_type VARCHAR(50),
+    IN p_book_desc TEXT,
+    IN p_pay_method VARCHAR(20),
+    IN p_quoted_amt DECIMAL(10,2)
+)
+BEGIN
+    DECLARE v_cust_id INT;
+    DECLARE v_user_id INT;
+    DECLARE v_cust_name VARCHAR(120);
+    DECLARE v_cust_mobile VARCHAR(20);
+    DECLARE v_rate DECIMAL(10,2);
+    DECLARE v_nights INT;
+    DECLARE v_total DECIMAL(10,2);
+    DECLARE v_book_id INT;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    IF p_email IS NULL OR p_email = '' THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Email is required';
+    END IF;
+    IF p_room_id IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Please select a room';
+    END IF;
+    IF p_check_in IS NULL OR p_check_out IS NULL OR p_check_out <= p_check_in THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Check-out must be after check-in';
+    END IF;
+
+    SELECT hc.class_rent INTO v_rate
+    FROM Rooms r JOIN Hotel_Class hc ON hc.class_id = r.class_id
+    WHERE r.room_id = p_room_id AND r.hotel_id = p_hotel_id;
+    IF v_rate IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Room does not belong to this hotel';
+    END IF;
+    SET v_nights = DATEDIFF(p_check_out, p_check_in);
+    SET v_total = COALESCE(p_quoted_amt, v_rate * v_nights);
+    SET v_rate = ROUND(v_total / v_nights, 2);
+
+    START TRANSACTION;
+
+    -- Resolve the customer, creating / linking its User row if needed
+    SELECT cust_id, user_id, cust_name, cust_mobile
+      INTO v_cust_id, v_user_id, v_cust_name, v_cust_mobile
+    FROM Customer WHERE cust_email = p_email
+    FOR UPDATE;
+
+    IF v_user_id IS NULL THEN
+        SELECT user_id INTO v_user_id FROM `User` WHERE user_email = p_email;
+        IF v_user_id IS NULL THEN
+            INSERT INTO `User` (user_name, user_email, user_mobile, user_address)
+            VALUES (COALESCE(v_cust_name, SUBSTRING_INDEX(p_email, '@', 1)), p_email,
+                    COALESCE(v_cust_mobile, ''), 'Customer Address');
+            SET v_user_id = LAST_INSERT_ID();
+        END IF;
+        IF v_cust_id IS NULL THEN
+            INSERT INTO Customer (user_id, cust_name, cust_email, cust_mobile, cust_pass)
+            VALUES (v_user_id, SUBSTRING_INDEX(p_email, '@', 1), p_email, '', NULL);  -- no password: can't log in
+            SET v_cust_id = LAST_INSERT_ID();
+        ELSE
+            UPDATE Customer SET user_id = v_user_id WHERE cust_id = v_cust_id;
+        END IF;
+        INSERT IGNORE INTO User_Roles (user_id, role_id)
+        SELECT v_user_id, role_id FROM Roles WHERE role_name = 'customer';
+    END IF;
+
+    CALL sp_book_room(v_user_id, v_cust_id, p_hotel_id, p_room_id, CURDATE(), p_check_in,
+                      p_check_out, p_book_type, p_book_desc, v_total, p_pay_method, v_total,
+                      v_book_id);
+
+    COMMIT;
+    SELECT v_book_id AS booking_id, v_cust_id AS cust_id, v_user_id AS user_id,
+           v_nights AS nights, v_rate AS nightly_rate, v_total AS total;
+END$$
+
+-- PROCEDURE: GROUP BOOKING (many rooms of one hotel in one transaction)
+-- p_request: JSON array of {"class_id": 3, "rooms": 10, "quoted_amt": 9000.00},
+-- quoted_amt being the price of one room for the whole stay (omit it to
+-- charge class_rent per night). Rooms of the requested classes are locked
+-- in room_id order (the same order as sp_book_room, one room at a time),
+-- free ones are picked per class, and every Booking row plus one combined
+-- Payment on the lead booking is written. Unless p_allow_partial, fewer free
+-- rooms than requested signals 45000 and nothing is booked.
+-- Result sets: the group summary, then one row per booked room.
+-- Needs MySQL 8.0+ or MariaDB 10.6+ (JSON_TABLE, ROW_NUMBER).
+CREATE PROCEDURE sp_group_booking(
+    IN p_user_id INT,
+    IN p_cust_id INT,
+    IN p_hotel_id INT,
+    IN p_check_in DATE,
+    IN p_check_out DATE,
+    IN p_request JSON,
+    IN p_allow_partial BOOLEAN,
+    IN p_book_type VARCHAR(50),
+    IN p_book_desc TEXT,
+    IN p_pay_method VARCHAR(20)
+)
+BEGIN
+    DECLARE v_requested INT DEFAULT 0;
+    DECLARE v_booked INT DEFAULT 0;
+    DECLARE v_group_id INT;
+    DECLARE v_lead_id INT;
+    DECLARE v_total DECIMAL(12,2) DEFAULT 0.00;
+    DECLARE v_nights INT;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        DROP TEMPORARY TABLE IF EXISTS tmp_group_rooms, tmp_group_pick;
+        RESIGNAL;
+    END;
+
+    IF p_check_in IS NULL OR p_check_out IS NULL OR p_check_out <= p_check_in THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Check-out must be after check-in';
+    END IF;
+    SET v_nights = DATEDIFF(p_check_out, p_check_in);
+
+    -- A repeated class would join every candidate room twice and book it twice
+    IF (SELECT COUNT(*) <> COUNT(DISTINCT class_id)
+        FROM JSON_TABLE(p_request, '$[*]' COLUMNS (class_id INT PATH '$.class_id')) jc) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Each room class may be requested only once';
+    END IF;
+
+    SELECT COALESCE(SUM(rooms), 0) INTO v_requested
+    FROM JSON_TABLE(p_request, '$[*]' COLUMNS (rooms INT PATH '$.rooms')) jr;
+    IF v_requested <= 0 THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'No rooms requested';
+    END IF;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_group_rooms, tmp_group_pick;
+    CREATE TEMPORARY TABLE tmp_group_rooms (
+        room_id INT PRIMARY KEY,
+        class_id INT NOT NULL,
+        busy TINYINT NOT NULL DEFAULT 0
+    );
+
+    START TRANSACTION;
+
+    -- Lock every candidate room, in room_id order
+    INSERT INTO tmp_group_rooms (room_id, class_id)
+    SELECT r.room_id, r.class_id
+    FROM Rooms r
+    WHERE r.hotel_id = p_hotel_id
+      AND r.room_status <> 'Maintenance'
+      AND r.class_id IN (SELECT class_id FROM JSON_TABLE(p_request, '$[*]'
+                             COLUMNS (class_id INT PATH '$.class_id')) jc)
+    ORDER BY r.room_id
+    FOR UPDATE;
+
+    -- Under the locks, mark rooms with an overlapping stay
+    UPDATE tmp_group_rooms t
+    SET t.busy = 1
+    WHERE EXISTS (
+        SELECT 1 FROM Booking b
+        WHERE b.room_id = t.room_id
+          AND b.booking_status <> 'Cancelled'
+          AND b.stay_status <> 'NoShow'
+          AND b.check_in < p_check_out
+          AND b.check_out > p_check_in
+    );
+
+    -- Pick up to the requested number of free rooms per class
+    CREATE TEMPORARY TABLE tmp_group_pick AS
+    SELECT x.room_id, x.class_id,
+           COALESCE(jr.quoted_amt, hc.class_rent * v_nights) AS amount
+    FROM (
+        SELECT room_id, class_id,
+               ROW_NUMBER() OVER (PARTITION BY class_id ORDER BY room_id) AS rn
+        FROM tmp_group_rooms
+        WHERE busy = 0
+    ) x
+    JOIN JSON_TABLE(p_request, '$[*]' COLUMNS (
+            class_id INT PATH '$.class_id',
+            rooms INT PATH '$.rooms',
+            quoted_amt DECIMAL(10,2) PATH '$.quoted_amt')) jr ON jr.class_id = x.class_id
+    JOIN Hotel_Class hc ON hc.class_id = x.class_id
+    WHERE x.rn <= jr.rooms;
+
+    SELECT COUNT(*), COALESCE(SUM(amount), 0) INTO v_booked, v_total FROM tmp_group_pick;
+    IF v_booked = 0 THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'No rooms available for the selected dates';
+    END IF;
+    IF v_booked < v_requested AND NOT p_allow_partial THEN
+        SET @group_msg = CONCAT('Only ', v_booked, ' of ', v_requested, ' rooms available for the selected dates');
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = @group_msg;
+    END IF;
+
+    INSERT INTO Booking_Group (user_id, cust_id, hotel_id, check_in, check_out, rooms_requested, rooms_booked, total_amt)
+    VALUES (p_user_id, p_cust_id, p_hotel_id, p_check_in, p_check_out, v_requested, v_booked, v_total);
+    SET v_group_id = LAST_INSERT_ID();
+
+    INSERT INTO Booking (user_id, cust_id, hotel_id, room_id, book_date, check_in, check_out,
+                         book_type, book_desc, quoted_amt, group_id)
+    SELECT p_user_id, p_cust_id, p_hotel_id, room_id, CURDATE(), p_check_in, p_check_out,
+           p_book_type, p_book_desc, amount, v_group_id
+    FROM tmp_group_pick
+    ORDER BY room_id;
+
+    SELECT MIN(book_id) INTO v_lead_id FROM Booking WHERE group_id = v_group_id;
+    UPDATE Booking_Group SET lead_book_id = v_lead_id WHERE group_id = v_group_id;
+
+    -- Room status reflects today only: future stays are tracked by their dates
+    IF p_check_in <= CURDATE() THEN
+        UPDATE Rooms r JOIN tmp_group_pick p ON p.room_id = r.room_id
+        SET r.room_status = 'Reserved';
+    END IF;
+
+    -- One combined payment for the whole group, on the lead booking
+    IF v_total > 0 THEN
+        INSERT INTO Payment (user_id, book_id, pay_date, pay_amt, pay_method, pay_desc)
+        VALUES (p_user_id, v_lead_id, CURDATE(), v_total, p_pay_method,
+                CONCAT('Group payment for ', v_booked, ' rooms (group #', v_group_id, ')'));
+    END IF;
+
+    COMMIT;
+
+    SELECT v_group_id AS group_id, v_requested AS rooms_requested, v_booked AS rooms_booked,
+           v_total AS total, v_lead_id AS lead_book_id;
+    SELECT b.book_id, b.room_id, r.room_number, r.class_id, b.quoted_amt
+    FROM Booking b JOIN Rooms r ON r.room_id = b.room_id
+    WHERE b.group_id = v_group_id
+    ORDER BY b.book_id;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_group_rooms, tmp_group_pick;
+END$$
+
+-- PROCEDURE: Rebuild revenue rollup for a date range (NULL = unbounded)
+CREATE PROCEDURE sp_rebuild_revenue_rollup(
+    IN p_from DATE,
+    IN p_to DATE
+)
+BEGIN
+    START TRANSACTION;
+
+    DELETE FROM Hotel_Revenue_Daily
+    WHERE (p_from IS NULL OR rev_date >= p_from)
+      AND (p_to IS NULL OR rev_date <= p_to);
+
+    INSERT INTO Hotel_Revenue_Daily (hotel_id, rev_date, booking_count, payment_count, revenue)
+    SELECT hotel_id, rev_date, SUM(bookings), SUM(payments), SUM(amount)
+    FROM (
+        -- archived history counts too: the rollup covers every booking ever made
+        SELECT hotel_id, book_date AS rev_date, COUNT(*) AS bookings, 0 AS payments, 0 AS amount
+        FROM vw_booking_all
+        WHERE (p_from IS NULL OR book_date >= p_from)
+          AND (p_to IS NULL OR book_date <= p_to)
+        GROUP BY hotel_id, book_date
+        UNION ALL
+        SELECT b.hotel_id, p.pay_date, 0, COUNT(*), SUM(p.pay_amt)
+        FROM vw_payment_all p
+        JOIN vw_booking_all b ON b.book_id = p.book_id
+        WHERE (p_from IS NULL OR p.pay_date >= p_from)
+          AND (p_to IS NULL OR p.pay_date <= p_to)
+        GROUP BY b.hotel_id, p.pay_date
+    ) x
+    GROUP BY hotel_id, rev_date;
+
+    COMMIT;
+END$$
+
+-- PROCEDURE: Recount Room_Status_Counts from Rooms
+CREATE PROCEDURE sp_rebuild_room_status_counts()
+BEGIN
+    START TRANSACTION;
+    DELETE FROM Room_Status_Counts;
+    INSERT INTO Room_Status_Counts (hotel_id, room_status, room_count)
+    SELECT hotel_id, room_status, COUNT(*)
+    FROM Rooms
+    WHERE room_status IS NOT NULL
+    GROUP BY hotel_id, room_status;
+    COMMIT;
+END$$
+
 -- ==========================
 -- 9️⃣ FUNCTIONS
 -- ==========================
@@ -249,6 +758,56 @@ FOR EACH ROW
 BEGIN
     INSERT INTO Payment_Audit (pay_id, book_id, pay_date, pay_amt)
     VALUES (NEW.pay_id, NEW.book_id, NEW.pay_date, NEW.pay_amt);
+
+    -- Keep the daily revenue rollup current
+    INSERT INTO Hotel_Revenue_Daily (hotel_id, rev_date, payment_count, revenue)
+    SELECT b.hotel_id, NEW.pay_date, 1, NEW.pay_amt
+    FROM Booking b WHERE b.book_id = NEW.book_id
+    ON DUPLICATE KEY UPDATE payment_count = payment_count + 1,
+                            revenue = revenue + NEW.pay_amt;
+END$$
+
+-- TRIGGER: Count new bookings in the daily revenue rollup
+CREATE TRIGGER trg_after_booking
+AFTER INSERT ON Booking
+FOR EACH ROW
+BEGIN
+    INSERT INTO Hotel_Revenue_Daily (hotel_id, rev_date, booking_count)
+    VALUES (NEW.hotel_id, NEW.book_date, 1)
+    ON DUPLICATE KEY UPDATE booking_count = booking_count + 1;
+END$$
+
+-- TRIGGERS: Keep Room_Status_Counts in step with Rooms
+-- (note: rows removed by ON DELETE CASCADE from Hotel don't fire triggers;
+-- the counters for that hotel cascade away with it)
+CREATE TRIGGER trg_rooms_insert
+AFTER INSERT ON Rooms
+FOR EACH ROW
+BEGIN
+    INSERT INTO Room_Status_Counts (hotel_id, room_status, room_count)
+    VALUES (NEW.hotel_id, NEW.room_status, 1)
+    ON DUPLICATE KEY UPDATE room_count = room_count + 1;
+END$$
+
+CREATE TRIGGER trg_rooms_update
+AFTER UPDATE ON Rooms
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.room_status <=> OLD.room_status) OR NEW.hotel_id <> OLD.hotel_id THEN
+        UPDATE Room_Status_Counts SET room_count = room_count - 1
+        WHERE hotel_id = OLD.hotel_id AND room_status = OLD.room_status;
+        INSERT INTO Room_Status_Counts (hotel_id, room_status, room_count)
+        VALUES (NEW.hotel_id, NEW.room_status, 1)
+        ON DUPLICATE KEY UPDATE room_count = room_count + 1;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_rooms_delete
+AFTER DELETE ON Rooms
+FOR EACH ROW
+BEGIN
+    UPDATE Room_Status_Counts SET room_count = room_count - 1
+    WHERE hotel_id = OLD.hotel_id AND room_status = OLD.room_status;
 END$$
 
 DELIMITER ;
@@ -294,6 +853,11 @@ INSERT INTO Hotel_Class (hotel_id, class_name, class_rent, room_count) VALUES
 (1, 'Executive Suite', 5000.00, 5),
 (1, 'Presidential Suite', 10000.00, 2);
 
+-- Sample pricing rules: Friday/Saturday nights +15%, 7+ night stays -10%
+INSERT INTO Rate_Rule (rule_type, hotel_id, class_id, weekdays, min_nights, adjust_pct) VALUES
+('weekend', NULL, NULL, '4,5', NULL, 15.00),
+('length_of_stay', NULL, NULL, NULL, 7, -10.00);
+
 -- Sample Customer (linked to User)
 INSERT INTO User (user_name, user_email, user_mobile, user_address)
 VALUES ('Jane Doe','jane.doe@example.com','7777777777','Bangalore, India');
@@ -0,0 +1,113 @@
+# stress_booking.py
+"""
+Concurrency stress check for the booking path.
+
+    python stress_booking.py --rooms 3 --attempts 300 --threads 15
+
+Fires many concurrent make_booking() calls at a few rooms of one hotel over
+a short far-future window, so most attempts collide. Afterwards it checks
+the database for overlapping non-cancelled bookings on those rooms and
+exits non-zero if any exist. Stress bookings are deleted at the end unless
+--keep is given. Run against a scratch database.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import rollups
+from booking import make_booking, BookingConflict
+from database import fetch_all, fetch_one, execute
+
+MARKER = 'stress-test'
+
+OVERLAP_SQL = """
+    SELECT a.book_id AS first_id, b.book_id AS second_id, a.room_id
+    FROM Booking a
+    JOIN Booking b
+      ON b.room_id = a.room_id
+     AND b.book_id > a.book_id
+     AND b.check_in < a.check_out
+     AND b.check_out > a.check_in
+    WHERE a.room_id IN ({ids})
+      AND a.booking_status <> 'Cancelled' AND a.stay_status <> 'NoShow'
+      AND b.booking_status <> 'Cancelled' AND b.stay_status <> 'NoShow'
+      AND a.check_in >= %s AND b.check_in >= %s
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress-test concurrent bookings")
+    parser.add_argument("--rooms", type=int, default=3, help="size of the contested room pool")
+    parser.add_argument("--attempts", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=15)
+    parser.add_argument("--window-days", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="keep the stress bookings")
+    args = parser.parse_args()
+
+    rooms = fetch_all("""
+        SELECT room_id, hotel_id FROM Rooms
+        WHERE room_status <> 'Maintenance'
+        ORDER BY room_id LIMIT %s
+    """, (args.rooms,))
+    cust = fetch_one("SELECT cust_id, user_id FROM Customer WHERE user_id IS NOT NULL LIMIT 1")
+    if not rooms or not cust:
+        sys.exit("Need at least one room and one customer with a user account")
+
+    window_start = date.today() + timedelta(days=5 * 365)
+    rnd = random.Random(args.seed)
+    plans = []
+    for _ in range(args.attempts):
+        room = rnd.choice(rooms)
+        check_in = window_start + timedelta(days=rnd.randrange(args.window_days))
+        plans.append((room, check_in, check_in + timedelta(days=rnd.randint(1, 3))))
+
+    counts = {'booked': 0, 'conflicts': 0, 'errors': 0}
+    lock = threading.Lock()
+    first_error = []
+
+    def attempt(plan):
+        room, check_in, check_out = plan
+        try:
+            make_booking(cust['user_id'], cust['cust_id'], room['hotel_id'], room['room_id'],
+                         date.today(), check_in, check_out, 'single', MARKER, 0, 'Card')
+            key = 'booked'
+        except BookingConflict:
+            key = 'conflicts'
+        except Exception as e:
+            key = 'errors'
+            first_error.append(e)
+        with lock:
+            counts[key] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(attempt, plans))
+    elapsed = time.perf_counter() - started
+
+    ids = ",".join(str(int(r['room_id'])) for r in rooms)
+    overlaps = fetch_all(OVERLAP_SQL.format(ids=ids), (window_start, window_start))
+
+    print(f"{args.attempts} attempts on {len(rooms)} rooms with {args.threads} threads "
+          f"in {elapsed:.2f}s ({args.attempts / elapsed:.0f} attempts/s)")
+    print(f"booked {counts['booked']}  conflicts {counts['conflicts']}  errors {counts['errors']}")
+    if first_error:
+        print(f"first error: {first_error[0]}")
+    print(f"double bookings: {len(overlaps)}")
+    for o in overlaps[:10]:
+        print(f"  room {o['room_id']}: bookings #{o['first_id']} and #{o['second_id']} overlap")
+
+    if not args.keep:
+        execute("DELETE FROM Booking WHERE book_desc = %s AND check_in >= %s",
+                (MARKER, window_start))
+        rollups.rebuild(date.today(), date.today())
+
+    sys.exit(1 if overlaps or counts['errors'] else 0)
+
+
+if __name__ == "__main__":
+    main()
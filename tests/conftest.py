@@ -0,0 +1,112 @@
+# tests/conftest.py
+"""
+Fake MySQL connections for the unit tests: no server needed.
+
+FakeConnection answers each statement from `responses`, a list of
+(substring, rows) pairs checked in order; the first pair whose substring
+is in the SQL wins, anything else returns no rows. A statement matching a
+(substring, exception) pair in `errors` raises that exception instead. Every statement run on
+any connection from the factory is appended to `factory.executed`.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from db_pool import ConnectionPool
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+        self.rowcount = 0
+        self.lastrowid = None
+        self.with_rows = False
+
+    def execute(self, query, params=()):
+        self.conn.factory.executed.append((query, params))
+        for needle, error in self.conn.factory.errors:
+            if needle in query:
+                raise error
+        self.rows = []
+        for needle, rows in self.conn.factory.responses:
+            if needle in query:
+                self.rows = [dict(r) for r in rows]
+                break
+        self.rowcount = len(self.rows)
+        self.with_rows = bool(self.rows)
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, factory):
+        self.factory = factory
+        self.in_transaction = False
+        self.unread_result = False
+        self.closed = False
+        self.ping_ok = True
+        self.pings = 0
+
+    def cursor(self, dictionary=False, buffered=False):
+        return FakeCursor(self)
+
+    def start_transaction(self):
+        self.in_transaction = True
+
+    def commit(self):
+        self.in_transaction = False
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.ping_ok:
+            raise OSError("server has gone away")
+
+    def is_connected(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFactory:
+    def __init__(self):
+        self.responses = []
+        self.errors = []
+        self.executed = []
+        self.made = []
+
+    def __call__(self):
+        conn = FakeConnection(self)
+        self.made.append(conn)
+        return conn
+
+
+@pytest.fixture
+def factory():
+    return FakeFactory()
+
+
+@pytest.fixture
+def fake_db(factory, monkeypatch):
+    """database.* wired to fake connections, with a cold query cache."""
+    monkeypatch.setattr(database, '_pool', ConnectionPool(factory, size=2, max_overflow=0, timeout=0))
+    database.clear_cache()
+    database.begin_run(session={})
+    yield factory
+    database.clear_cache()
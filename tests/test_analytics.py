@@ -0,0 +1,50 @@
+import numpy as np
+
+from analytics import room_nights
+
+
+def naive(rows, check_ins, check_outs, amounts, n_rows, n_days):
+    sold = np.zeros((n_rows, n_days))
+    revenue = np.zeros((n_rows, n_days))
+    for row, ci, co, amount in zip(rows, check_ins, check_outs, amounts):
+        for day in range(ci, co):
+            if 0 <= day < n_days:
+                sold[row, day] += 1
+                revenue[row, day] += amount / (co - ci)
+    return sold, revenue
+
+
+def test_single_stay():
+    sold, revenue = room_nights([0], [1], [3], [300.0], 1, 5)
+    assert sold.tolist() == [[0, 1, 1, 0, 0]]
+    assert revenue.tolist() == [[0, 150.0, 150.0, 0, 0]]
+
+
+def test_stays_cut_at_window_edges_keep_their_nightly_rate():
+    # 4 nights from two days before the window, 3 nights ending after it
+    sold, revenue = room_nights([0, 1], [-2, 3], [2, 6], [400.0, 300.0], 2, 4)
+    assert sold.tolist() == [[1, 1, 0, 0], [0, 0, 0, 1]]
+    assert revenue.tolist() == [[100.0, 100.0, 0, 0], [0, 0, 0, 100.0]]
+
+
+def test_stays_outside_window_ignored():
+    sold, revenue = room_nights([0, 0], [-5, 10], [-1, 12], [100.0, 100.0], 1, 7)
+    assert not sold.any() and not revenue.any()
+
+
+def test_overlapping_stays_add_up():
+    sold, _ = room_nights([0, 0, 0], [0, 1, 2], [3, 2, 5], [1, 1, 1], 1, 5)
+    assert sold.tolist() == [[1, 2, 2, 1, 1]]
+
+
+def test_matches_per_night_loop():
+    rnd = np.random.default_rng(5)
+    n = 500
+    rows = rnd.integers(0, 6, n)
+    ci = rnd.integers(-10, 40, n)
+    co = ci + rnd.integers(1, 12, n)
+    amounts = rnd.uniform(1000, 9000, n)
+    sold, revenue = room_nights(rows, ci, co, amounts, 6, 30)
+    want_sold, want_revenue = naive(rows, ci, co, amounts, 6, 30)
+    assert np.array_equal(sold, want_sold)
+    assert np.allclose(revenue, want_revenue)
@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from starlette.testclient import TestClient
+
+import api
+from auth import hash_pass
+
+ADMIN = {'match_rank': 0, 'login_id': 1, 'user_id': 1, 'username': 'admin', 'password': hash_pass('adminpass'),
+         'user_name': 'Admin', 'user_email': 'admin@example.test', 'user_mobile': '', 'user_address': ''}
+IN = date.today() + timedelta(days=10)
+OUT = IN + timedelta(days=2)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """api's pool answered by substring: db.responses = [(substring, rows)]; db.procs logs call_proc."""
+    db = SimpleNamespace(responses=[], procs=[], conflicts=0)
+
+    async def query(kind, sql, params):
+        rows = next((rows for key, rows in db.responses if key in sql), [])
+        return (rows[0] if rows else None) if kind == 'one' else rows
+
+    async def call_proc(name, params):
+        db.procs.append(params[2])
+        if len(db.procs) <= db.conflicts:
+            raise api.Conflict("Room is already booked for the selected dates")
+        return [(77, 9, None, 2, 100.0, 200.0)]
+
+    monkeypatch.setattr(api, '_query', query)
+    monkeypatch.setattr(api, 'call_proc', call_proc)
+    monkeypatch.setattr(api, '_pool', SimpleNamespace(size=2, freesize=1, maxsize=20))
+    monkeypatch.setattr(api._index, 'loaded_at', 0.0)
+    api._cache.clear()
+    return db
+
+
+@pytest.fixture
+def client():
+    # no `with`: the lifespan (and its real pool) never starts
+    return TestClient(api.app)
+
+
+def token(client, identifier='admin', password='adminpass'):
+    r = client.post('/login', json={'identifier': identifier, 'password': password})
+    assert r.status_code == 200, r.text
+    return {'Authorization': f"Bearer {r.json()['token']}"}
+
+
+def test_plaintext_stored_password_refused(db, client):
+    db.responses = [("match_rank", [dict(ADMIN, password='adminpass')])]
+    assert client.post('/login', json={'identifier': 'admin', 'password': 'adminpass'}).status_code == 401
+
+
+def test_hashed_login_and_customer_without_password(db, client):
+    db.responses = [("match_rank", [ADMIN]), ("User_Roles", [{'role_name': 'admin'}])]
+    r = client.post('/login', json={'identifier': 'admin', 'password': 'adminpass'})
+    assert r.json()['roles'] == ['admin']
+    db.responses = [("FROM Customer", [{'cust_id': 9, 'user_id': None, 'cust_name': 'Walk In',
+                                        'cust_email': 'w@example.test', 'cust_pass': None}])]
+    assert client.post('/login', json={'identifier': 'w@example.test', 'password': 'x'}).status_code == 401
+
+
+def test_health_is_plain_and_stats_need_admin(db, client):
+    r = client.get('/health')
+    assert r.json() == {'ok': True}
+    assert client.get('/stats').status_code == 401
+
+    db.responses = [("match_rank", [ADMIN]), ("User_Roles", [{'role_name': 'staff'}])]
+    assert client.get('/stats', headers=token(client)).status_code == 403
+
+    api._cache.clear()
+    db.responses = [("match_rank", [ADMIN]), ("User_Roles", [{'role_name': 'admin'}]),
+                    ("SELECT 1", [{'ok': 1}])]
+    r = client.get('/stats', headers=token(client))
+    assert r.status_code == 200 and r.json()['pool'] == {'size': 2, 'free': 1, 'max': 20}
+
+
+def test_revoked_role_applies_to_live_token(db, client):
+    db.responses = [("match_rank", [ADMIN]), ("User_Roles", [{'role_name': 'staff'}])]
+    headers = token(client)
+    assert client.get('/bookings?email=g@example.test', headers=headers).status_code == 200
+
+    db.responses = [("User_Roles", [])]
+    api._cache.clear()  # the role cache's TTL running out
+    assert client.get('/bookings?email=g@example.test', headers=headers).status_code == 400
+    booking = {'hotel_id': 1, 'class_id': 3, 'check_in': str(IN), 'check_out': str(OUT),
+               'email': 'g@example.test'}
+    assert client.post('/bookings', json=booking, headers=headers).status_code == 403
+
+
+def booking_db(db):
+    db.responses = [("FROM Customer", [{'cust_id': 9, 'user_id': None, 'cust_name': 'Guest',
+                                        'cust_email': 'g@example.test', 'cust_pass': hash_pass('pw')}]),
+                    ("FROM Rooms", [{'room_id': i, 'hotel_id': 1, 'class_id': 3, 'room_status': 'Available'}
+                                    for i in (11, 12, 13)]),
+                    ("FROM Hotel_Class", [{'class_id': 3, 'hotel_id': 1, 'class_name': 'Deluxe',
+                                           'class_rent': 100}])]
+
+
+def test_customer_booking(db, client):
+    booking_db(db)
+    headers = token(client, 'g@example.test', 'pw')
+    r = client.post('/bookings', json={'hotel_id': 1, 'class_id': 3, 'check_in': str(IN),
+                                       'check_out': str(OUT)}, headers=headers)
+    assert r.status_code == 201
+    assert r.json()['booking_id'] == 77 and r.json()['room_id'] == db.procs[0]
+    assert not api._index.is_free(db.procs[0], IN, OUT)
+
+
+def test_booking_conflict_on_every_candidate(db, client):
+    booking_db(db)
+    db.conflicts = api.BOOKING_ATTEMPTS
+    headers = token(client, 'g@example.test', 'pw')
+    r = client.post('/bookings', json={'hotel_id': 1, 'class_id': 3, 'check_in': str(IN),
+                                       'check_out': str(OUT)}, headers=headers)
+    assert r.status_code == 409 and 'already booked' in r.json()['error']
+    assert sorted(db.procs) == [11, 12, 13]
@@ -0,0 +1,51 @@
+from datetime import date
+
+import archive
+
+CUTOFF = date(2023, 6, 1)
+
+
+def batch(fake_db, ids, payments, audits):
+    fake_db.responses = [
+        ("FOR UPDATE", [{'book_id': i} for i in ids]),
+        ("INSERT INTO Booking_Archive", [{}] * len(ids)),
+        ("INSERT INTO Payment_Archive", [{}] * payments),
+        ("INSERT INTO Payment_Audit_Archive", [{}] * audits),
+    ]
+
+
+def test_move_batch_copies_then_deletes_children_first(fake_db):
+    batch(fake_db, [3, 8], payments=2, audits=3)
+    moved = archive.move_batch(CUTOFF, batch_size=100)
+    assert moved == {'Booking': 2, 'Payment': 2, 'Payment_Audit': 3}
+
+    statements = [(q.split()[0], q.split()[2]) for q, _ in fake_db.executed[1:]]
+    assert statements == [('INSERT', 'Booking_Archive'), ('INSERT', 'Payment_Archive'),
+                          ('INSERT', 'Payment_Audit_Archive'), ('DELETE', 'Payment_Audit'),
+                          ('DELETE', 'Payment'), ('DELETE', 'Booking')]
+    assert fake_db.executed[0][1] == (CUTOFF, CUTOFF, 100)
+    assert all(params == [3, 8] for _, params in fake_db.executed[1:])
+
+
+def test_move_batch_nothing_closed(fake_db):
+    assert archive.move_batch(CUTOFF) == {'Booking': 0, 'Payment': 0, 'Payment_Audit': 0}
+    assert len(fake_db.executed) == 1
+
+
+def test_run_stops_after_a_short_batch(fake_db):
+    batch(fake_db, [1, 2, 3], payments=3, audits=0)
+    progress = []
+    report = archive.run(days=730, batch_size=10, pause=0, progress=lambda r: progress.append(r['batches']))
+    assert report['batches'] == 1 and progress == [1]
+    assert report['moved'] == {'Booking': 3, 'Payment': 3, 'Payment_Audit': 0}
+
+
+def test_run_honours_max_batches(fake_db):
+    batch(fake_db, [1, 2], payments=0, audits=0)
+    report = archive.run(batch_size=2, pause=0, max_batches=3)
+    assert report['batches'] == 3 and report['moved']['Booking'] == 6
+
+
+def test_tables_switch_to_archive_views():
+    assert archive.tables()['booking'] == 'Booking'
+    assert archive.tables(include_archive=True)['booking'] == 'vw_booking_all'
@@ -0,0 +1,48 @@
+import database
+from auth import hash_pass, login_user
+
+STAFF = {'match_rank': 0, 'login_id': 1, 'user_id': 5, 'username': 'staff1',
+         'password': hash_pass('secret'), 'user_name': 'Sam', 'user_email': 's@example.test',
+         'user_mobile': '', 'user_address': ''}
+
+
+def login(*args):
+    before = database.query_count()
+    result = login_user(*args)
+    return result, database.query_count() - before
+
+
+def test_system_login_one_query_plus_cached_roles(fake_db):
+    fake_db.responses = [("match_rank", [STAFF]), ("User_Roles", [{'role_name': 'staff'}])]
+    result, n = login('staff1', 'secret')
+    assert result['type'] == 'system' and result['roles'] == ['staff']
+    assert result['user']['user_email'] == 's@example.test'
+    assert 'password' not in result['user']
+    assert n == 2
+    # roles come from the query cache on the next login
+    _, n = login('s@example.test', 'secret')
+    assert n == 1
+
+
+def test_wrong_password_falls_through_to_customers(fake_db):
+    fake_db.responses = [("match_rank", [STAFF])]
+    result, n = login('staff1', 'nope')
+    assert result is None
+    assert n == 2
+
+
+def test_customer_login(fake_db):
+    fake_db.responses = [("FROM Customer", [{'cust_id': 9, 'cust_email': 'c@example.test',
+                                             'cust_pass': hash_pass('pw')}])]
+    result, n = login('c@example.test', 'pw')
+    assert result['type'] == 'customer' and result['roles'] == ['customer']
+    assert n == 2
+    assert login('c@example.test', 'other')[0] is None
+
+
+def test_customer_without_password_cannot_log_in(fake_db):
+    for stored in (None, '', 'defaultpass'):
+        fake_db.responses = [("FROM Customer", [{'cust_id': 9, 'cust_email': 'c@example.test',
+                                                 'cust_pass': stored}])]
+        for attempt in ('', 'defaultpass', 'anything'):
+            assert login('c@example.test', attempt)[0] is None
@@ -0,0 +1,78 @@
+from datetime import date
+
+from availability import AvailabilityIndex, RoomCalendar
+
+
+def d(day):
+    return date(2025, 3, day)
+
+
+def calendar(*stays):
+    cal = RoomCalendar()
+    for start, end in stays:
+        cal.add(d(start), d(end))
+    return cal
+
+
+def test_empty_calendar_is_free():
+    assert not RoomCalendar().overlaps(d(1), d(2))
+
+
+def test_back_to_back_stays_do_not_overlap():
+    cal = calendar((10, 12))
+    assert not cal.overlaps(d(12), d(14))  # arrive on the morning they leave
+    assert not cal.overlaps(d(8), d(10))   # leave on the morning they arrive
+
+
+def test_partial_and_enclosing_overlaps():
+    cal = calendar((10, 12))
+    assert cal.overlaps(d(11), d(13))
+    assert cal.overlaps(d(9), d(11))
+    assert cal.overlaps(d(10), d(12))
+    assert cal.overlaps(d(9), d(20))
+    assert cal.overlaps(d(10), d(11))
+
+
+def test_long_stay_hidden_behind_later_short_ones():
+    # the 1st-20th stay ends after the 5th-6th one: max_end must carry it forward
+    cal = calendar((1, 20), (5, 6), (7, 8))
+    assert cal.overlaps(d(15), d(16))
+    assert not cal.overlaps(d(20), d(22))
+
+
+def test_out_of_order_add_and_remove():
+    cal = calendar((10, 12), (1, 3), (5, 7))
+    assert cal.starts == [d(1), d(5), d(10)]
+    assert cal.remove(d(1), d(3))
+    assert not cal.overlaps(d(1), d(3))
+    assert not cal.remove(d(1), d(3))
+    assert cal.overlaps(d(6), d(8))
+    assert len(cal) == 2
+
+
+def test_remove_picks_the_matching_end():
+    cal = calendar((1, 20), (1, 3))
+    assert cal.remove(d(1), d(20))
+    assert not cal.overlaps(d(10), d(11))
+    assert cal.overlaps(d(2), d(3))
+
+
+def test_index_skips_maintenance_and_tracks_changes():
+    index = AvailabilityIndex()
+    index.load(
+        [{'room_id': 1, 'hotel_id': 7, 'class_id': 1, 'room_status': 'Available'},
+         {'room_id': 2, 'hotel_id': 7, 'class_id': 2, 'room_status': 'Maintenance'}],
+        [{'room_id': 1, 'check_in': d(10), 'check_out': d(12)}],
+    )
+    assert index.free_rooms(7, d(10), d(11)) == []
+    assert index.free_rooms(7, d(12), d(13)) == [1]
+
+    index.cancel_booking(1, d(10), d(12))
+    index.set_room(2, 7, 2, 'Available')
+    index.set_room(3, 7, 1, 'Available')
+    assert index.free_rooms(7, d(10), d(11)) == [1, 2, 3]
+    assert index.free_rooms(7, d(10), d(11), class_id=1) == [1, 3]
+
+    index.record_booking(3, d(9), d(11))
+    assert not index.is_free(3, d(10), d(11))
+    assert index.is_free(3, d(11), d(12))
@@ -0,0 +1,127 @@
+import json
+from datetime import date
+
+import pytest
+from mysql.connector import Error
+
+import booking
+from booking import BookingConflict
+
+CHECK_IN, CHECK_OUT = date(2025, 7, 1), date(2025, 7, 3)
+
+
+class Procs:
+    """Stands in for database.call_proc: each call pops the next outcome (results or an Error)."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def __call__(self, proc_name, params=(), label=None):
+        self.calls.append((proc_name, list(params)))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    stays = []
+    monkeypatch.setattr(booking.availability, 'record_booking', lambda *stay: stays.append(stay))
+    return stays
+
+
+def signal(message):
+    return Error(msg=message, errno=1644, sqlstate='45000')
+
+
+def make(**kw):
+    args = dict(user_id=1, cust_id=2, hotel_id=3, room_id=4, book_date=date(2025, 6, 1),
+                check_in=CHECK_IN, check_out=CHECK_OUT, book_type='single', book_desc='',
+                pay_amt=5000, pay_method='Card')
+    args.update(kw)
+    return booking.make_booking(**args)
+
+
+def test_make_booking_returns_id_and_records_stay(monkeypatch, recorded):
+    procs = Procs([[(77,)]])
+    monkeypatch.setattr(booking, 'call_proc', procs)
+    assert make() == 77
+    assert procs.calls[0][0] == 'sp_make_booking'
+    assert recorded == [(4, CHECK_IN, CHECK_OUT)]
+
+
+def test_make_booking_signal_becomes_conflict(monkeypatch, recorded):
+    monkeypatch.setattr(booking, 'call_proc', Procs(signal('Room is already booked for the selected dates')))
+    with pytest.raises(BookingConflict, match="already booked"):
+        make()
+    assert recorded == []
+
+
+def test_make_booking_retries_deadlocks(monkeypatch, recorded):
+    procs = Procs(Error(msg="Deadlock found", errno=1213, sqlstate='40001'), [[(78,)]])
+    monkeypatch.setattr(booking, 'call_proc', procs)
+    assert make() == 78
+    assert len(procs.calls) == 2
+
+
+def test_make_booking_other_errors_propagate(monkeypatch, recorded):
+    monkeypatch.setattr(booking, 'call_proc', Procs(Error(msg="Unknown column", errno=1054, sqlstate='42S22')))
+    with pytest.raises(Error) as info:
+        make()
+    assert not isinstance(info.value, BookingConflict)
+
+
+def test_checkout_returns_receipt(monkeypatch, recorded):
+    procs = Procs([[(80, 2, 3, 2, 2500.0, 5000.0)]])
+    monkeypatch.setattr(booking, 'call_proc', procs)
+    receipt = booking.checkout('g@example.test', 3, 4, CHECK_IN, CHECK_OUT, 'single', '', 'Card',
+                               quoted_amt=5000)
+    assert receipt == {'booking_id': 80, 'cust_id': 2, 'user_id': 3, 'nights': 2,
+                       'nightly_rate': 2500.0, 'total': 5000.0}
+    assert procs.calls[0] == ('sp_checkout', ['g@example.test', 3, 4, CHECK_IN, CHECK_OUT, 'single', '',
+                                              'Card', 5000])
+    assert recorded == [(4, CHECK_IN, CHECK_OUT)]
+
+
+def test_checkout_signal_becomes_conflict(monkeypatch, recorded):
+    monkeypatch.setattr(booking, 'call_proc', Procs(signal('Room is under maintenance')))
+    with pytest.raises(BookingConflict, match="maintenance"):
+        booking.checkout('g@example.test', 3, 4, CHECK_IN, CHECK_OUT, 'single', '', 'Card')
+    assert recorded == []
+
+
+def test_group_booking_prices_each_class_and_records_rooms(monkeypatch, recorded):
+    classes = [{'class_id': 10, 'hotel_id': 3, 'class_rent': 1000},
+               {'class_id': 11, 'hotel_id': 3, 'class_rent': 2500}]
+    monkeypatch.setattr(booking.pricing.RateTable, 'load',
+                        classmethod(lambda cls, start, end, **kw: cls(classes, start, end)))
+    procs = Procs([[(5, 3, 3, 9000.0, 90)],
+                   [(90, 41, '101', 10, 2000.0), (91, 42, '102', 10, 2000.0), (92, 51, '201', 11, 5000.0)]])
+    monkeypatch.setattr(booking, 'call_proc', procs)
+
+    group = booking.group_booking(1, 2, 3, CHECK_IN, CHECK_OUT, {'10': 2, 11: 1, 12: 0})
+    assert group['group_id'] == 5 and group['rooms_booked'] == 3
+    assert [r['room_id'] for r in group['rooms']] == [41, 42, 51]
+    assert recorded == [(41, CHECK_IN, CHECK_OUT), (42, CHECK_IN, CHECK_OUT), (51, CHECK_IN, CHECK_OUT)]
+
+    proc, params = procs.calls[0]
+    assert proc == 'sp_group_booking'
+    assert json.loads(params[5]) == [{'class_id': 10, 'rooms': 2, 'quoted_amt': 2000.0},
+                                     {'class_id': 11, 'rooms': 1, 'quoted_amt': 5000.0}]
+    assert params[6] is False
+
+
+def test_group_booking_rejects_bad_requests(monkeypatch, recorded):
+    monkeypatch.setattr(booking.pricing.RateTable, 'load',
+                        classmethod(lambda cls, start, end, **kw: cls([{'class_id': 10, 'hotel_id': 3,
+                                                                        'class_rent': 1000}], start, end)))
+    monkeypatch.setattr(booking, 'call_proc', Procs(signal('Not enough free rooms')))
+    with pytest.raises(ValueError, match="no rooms"):
+        booking.group_booking(1, 2, 3, CHECK_IN, CHECK_OUT, {10: 0})
+    with pytest.raises(ValueError, match="unknown room class"):
+        booking.group_booking(1, 2, 3, CHECK_IN, CHECK_OUT, {10: 1, 99: 1})
+    with pytest.raises(BookingConflict, match="Not enough"):
+        booking.group_booking(1, 2, 3, CHECK_IN, CHECK_OUT, {10: 1})
+    assert recorded == []
@@ -0,0 +1,29 @@
+from datetime import date
+
+from bookings_grid import _filter_sql
+
+
+def test_no_filters():
+    assert _filter_sql(None) == ("", "", [])
+
+
+def test_all_filters_in_order():
+    join, where, params = _filter_sql({'hotel_id': 3, 'status': 'Confirmed',
+                                       'date_from': date(2025, 1, 1), 'date_to': date(2025, 1, 31),
+                                       'customer': 'ann'})
+    assert join == "JOIN Customer c ON c.cust_id = b.cust_id"
+    assert where == ("WHERE b.hotel_id = %s AND b.booking_status = %s AND b.book_date >= %s "
+                     "AND b.book_date <= %s AND c.cust_email LIKE %s")
+    assert params == [3, 'Confirmed', date(2025, 1, 1), date(2025, 1, 31), 'ann%']
+
+
+def test_customer_prefix_escapes_wildcards():
+    _, _, params = _filter_sql({'customer': 'a_b%'})
+    assert params == [r'a\_b\%%']
+
+
+def test_keyset_cursor():
+    join, where, params = _filter_sql({}, after=(date(2025, 2, 1), 99))
+    assert join == ""
+    assert where == "WHERE (b.book_date < %s OR (b.book_date = %s AND b.book_id < %s))"
+    assert params == [date(2025, 2, 1), date(2025, 2, 1), 99]
@@ -0,0 +1,152 @@
+import json
+from datetime import date
+
+import pytest
+from mysql.connector import IntegrityError
+
+import bulk_import
+from bulk_import import BulkImportError, import_file, stay_status_for
+
+
+class ImportCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.row = None
+
+    def execute(self, query, params=()):
+        if "SELECT rows_done" in query:
+            done = self.conn.progress.get(params[0])
+            self.row = (done,) if done is not None else None
+        elif "INTO Import_Progress" in query:
+            self.conn.pending_progress[params[0]] = params[2]
+        else:
+            self.conn.insert([params])
+
+    def executemany(self, query, seq_params):
+        self.conn.insert(seq_params)
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class ImportConnection:
+    """Customer table with a unique cust_email (column 3); a failed statement inserts nothing."""
+
+    def __init__(self, emails=()):
+        self.rows, self.pending = [], []
+        self.progress, self.pending_progress = {}, {}
+        self.emails = set(emails)
+
+    def cursor(self):
+        return ImportCursor(self)
+
+    def insert(self, seq_params):
+        taken = self.emails | {r[3] for r in self.rows + self.pending}
+        new = [p[3] for p in seq_params]
+        if len(set(new)) < len(new) or taken & set(new):
+            raise IntegrityError(msg="Duplicate entry for key 'cust_email'")
+        self.pending += list(seq_params)
+
+    def commit(self):
+        self.rows += self.pending
+        self.progress.update(self.pending_progress)
+        self.pending, self.pending_progress = [], {}
+
+    def rollback(self):
+        self.pending, self.pending_progress = [], {}
+
+
+class Known:
+    def __init__(self, **ids):
+        self.ids = ids
+
+    def get(self, table):
+        return self.ids.setdefault(table, set())
+
+
+def write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    return str(path)
+
+
+def customer(cust_id, email, user_id=1):
+    return {'cust_id': cust_id, 'user_id': user_id, 'cust_name': f"Guest {cust_id}", 'cust_email': email}
+
+
+def rejects_of(path):
+    with open(path + '.rejects.jsonl') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_invalid_and_colliding_rows_rejected(tmp_path):
+    path = write_jsonl(tmp_path / "customers.jsonl", [
+        customer(1, 'a@x.test'),
+        {'cust_id': 2, 'user_id': 1},                 # missing cust_name
+        customer(3, 'c@x.test', user_id=99),          # unknown user
+        customer(1, 'd@x.test'),                      # pk repeated in the file
+        customer(5, 'taken@x.test'),                  # email already in the database
+        customer(6, 'f@x.test'),
+    ])
+    conn = ImportConnection(emails={'taken@x.test'})
+    known = Known(User={1})
+    stats = import_file(conn, 'Customer', path, known, chunk_size=10)
+
+    assert stats['inserted'] == 2 and stats['rejected'] == 4
+    assert [r[0] for r in conn.rows] == [1, 6]
+    assert known.get('Customer') == {1, 6}
+    errors = {r['line']: r['error'] for r in rejects_of(path)}
+    assert errors[2] == "missing cust_name"
+    assert errors[3] == "unknown user_id 99"
+    assert errors[4] == "duplicate cust_id 1"
+    assert errors[5].startswith("duplicate key:")
+
+
+def test_resume_after_failure(tmp_path):
+    rows = [customer(i, f"g{i}@x.test") for i in range(1, 8)]
+    rows[4] = customer(5, 'taken@x.test')
+    path = write_jsonl(tmp_path / "customers.jsonl", rows)
+    conn = ImportConnection(emails={'taken@x.test'})
+
+    with pytest.raises(BulkImportError):
+        import_file(conn, 'Customer', path, Known(User={1}), chunk_size=2, strict=True)
+    # the first two chunks were committed with their progress, the third rolled back
+    assert [r[0] for r in conn.rows] == [1, 2, 3, 4]
+
+    stats = import_file(conn, 'Customer', path, Known(User={1}, Customer={1, 2, 3, 4}), chunk_size=2)
+    assert stats['resumed_at'] == 4
+    assert stats['inserted'] == 2 and stats['rejected'] == 1
+    assert [r[0] for r in conn.rows] == [1, 2, 3, 4, 6, 7]
+
+    stats = import_file(conn, 'Customer', path, Known(User={1}), chunk_size=2)
+    assert stats['resumed_at'] == 7 and stats['inserted'] == 0
+
+
+def test_stay_status_from_dates():
+    today = date(2025, 6, 10)
+    assert stay_status_for('2025-06-01', '2025-06-03', today) == 'CheckedOut'
+    assert stay_status_for('2025-06-08', '2025-06-10', today) == 'CheckedOut'
+    assert stay_status_for('2025-06-10', '2025-06-12', today) == 'CheckedIn'
+    assert stay_status_for(date(2025, 6, 11), date(2025, 6, 12), today) == 'Expected'
+    assert stay_status_for(None, None, today) == 'Expected'
+
+
+def test_booking_stay_status_derived_or_checked():
+    spec = dict(bulk_import.SPECS['Booking'], table='Booking')
+    known = Known(User={1}, Customer={1}, Hotel={1})
+    base = {'user_id': 1, 'cust_id': 1, 'hotel_id': 1, 'book_date': '2020-01-01'}
+
+    past = dict(base, check_in='2020-01-05', check_out='2020-01-07')
+    assert bulk_import.validate(past, spec, known) is None
+    assert past['stay_status'] == 'CheckedOut'
+
+    given = dict(past, stay_status='NoShow')
+    assert bulk_import.validate(given, spec, known) is None
+    assert given['stay_status'] == 'NoShow'
+
+    assert bulk_import.validate(dict(past, stay_status='Gone'), spec, known) == "bad stay_status 'Gone'"
+    assert bulk_import.validate(dict(base, check_in='soon', check_out='later'), spec, known).startswith(
+        "can't derive stay_status")
+    assert bulk_import.validate(dict(past, group_id=4), spec, known) == "unknown group_id 4"
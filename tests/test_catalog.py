@@ -0,0 +1,32 @@
+import database
+from catalog import build_catalog, load_catalog
+
+
+def catalog_rows(hotels, classes):
+    return [{'hotel_id': h, 'hotel_name': f"H{h}", 'hotel_type': 'City', 'hotel_desc': '',
+             'class_id': h * 10 + k, 'class_name': f"C{k}", 'class_rent': 1000, 'room_count': 5,
+             'available': 2} for h in range(1, hotels + 1) for k in range(classes)]
+
+
+def test_build_catalog_groups_classes_and_keeps_empty_hotels():
+    rows = catalog_rows(1, 2) + [{'hotel_id': 2, 'hotel_name': 'H2', 'hotel_type': 'City', 'hotel_desc': '',
+                                  'class_id': None, 'class_name': None, 'class_rent': None,
+                                  'room_count': None, 'available': 0}]
+    hotels = build_catalog(rows)
+    assert [h['hotel_id'] for h in hotels] == [1, 2]
+    assert [c['class_id'] for c in hotels[0]['classes']] == [10, 11]
+    assert hotels[1]['classes'] == []
+
+
+def test_catalog_queries_constant(fake_db):
+    fake_db.responses = [("COUNT(*)", [{'cnt': 25}]), ("LIMIT %s OFFSET %s", catalog_rows(10, 3))]
+    catalog = load_catalog(2, 10)
+    assert catalog['queries'] == 2
+    assert len(catalog['hotels']) == 10 and all(len(h['classes']) == 3 for h in catalog['hotels'])
+    assert catalog['pages'] == 3
+
+    fake_db.responses = [("COUNT(*)", [{'cnt': 25}]), ("LIMIT %s OFFSET %s", catalog_rows(20, 3))]
+    database.clear_cache()
+    assert load_catalog(2, 10)['queries'] == 2
+    # served from the query cache on the next rerun
+    assert load_catalog(2, 10)['queries'] == 0
@@ -0,0 +1,42 @@
+import csv
+from datetime import date
+
+import bulk_import
+from datagen import generate
+
+TODAY = date(2025, 6, 10)
+
+
+def read(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_generated_files_match_import_columns(tmp_path):
+    paths = generate(str(tmp_path), hotels=2, classes_per_hotel=2, rooms_per_class=3,
+                     customers=20, bookings=60, seed=3, today=TODAY)
+    for table, path in paths.items():
+        with open(path, newline='') as f:
+            header = next(csv.reader(f))
+        assert set(header) <= set(bulk_import.SPECS[table]['columns']), table
+
+
+def test_stay_status_follows_dates(tmp_path):
+    paths = generate(str(tmp_path), hotels=2, classes_per_hotel=2, rooms_per_class=3,
+                     customers=20, bookings=60, seed=3, today=TODAY)
+    bookings = read(paths['Booking'])
+    assert len(bookings) == 60
+    seen = set()
+    for b in bookings:
+        check_in, check_out = date.fromisoformat(b['check_in']), date.fromisoformat(b['check_out'])
+        expected = ('CheckedOut' if check_out <= TODAY else 'CheckedIn' if check_in <= TODAY
+                    else 'Expected')
+        assert b['stay_status'] == expected
+        seen.add(expected)
+    assert seen == {'CheckedOut', 'CheckedIn', 'Expected'}
+
+
+def test_same_seed_same_rows(tmp_path):
+    a = generate(str(tmp_path / "a"), hotels=1, customers=5, bookings=10, seed=9, today=TODAY)
+    b = generate(str(tmp_path / "b"), hotels=1, customers=5, bookings=10, seed=9, today=TODAY)
+    assert read(a['Booking']) == read(b['Booking'])
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from db_pool import ConnectionPool, PoolTimeout
+
+
+def test_reuses_idle_connection(factory):
+    pool = ConnectionPool(factory, size=1, max_overflow=0)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert pool.stats()['handshakes'] == 1
+
+
+def test_times_out_when_exhausted(factory):
+    pool = ConnectionPool(factory, size=1, max_overflow=0, timeout=0.05)
+    held = pool.acquire()
+    started = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.05
+    assert pool.stats()['timeouts'] == 1
+    pool.release(held)
+    assert pool.acquire() is held
+
+
+def test_overflow_closed_on_return(factory):
+    pool = ConnectionPool(factory, size=1, max_overflow=1, timeout=0)
+    a, b = pool.acquire(), pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(a)
+    pool.release(b)
+    assert b.closed and not a.closed
+    stats = pool.stats()
+    assert stats['open'] == 1 and stats['idle'] == 1
+
+
+def test_broken_connection_discarded_on_error(factory):
+    pool = ConnectionPool(factory, size=1, max_overflow=0)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.closed = True
+            raise RuntimeError("query failed")
+    assert pool.stats()['discarded'] == 1
+    assert pool.stats()['open'] == 0
+    with pool.connection() as fresh:
+        assert fresh is not conn
+
+
+def test_usable_connection_kept_after_error(factory):
+    pool = ConnectionPool(factory, size=1, max_overflow=0)
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            raise ValueError("bad input")
+    with pool.connection() as again:
+        assert again is conn
+
+
+def test_open_transaction_rolled_back_on_return(factory):
+    pool = ConnectionPool(factory, size=1, max_overflow=0)
+    with pool.connection() as conn:
+        conn.in_transaction = True
+    assert not conn.in_transaction
+
+
+def test_failed_ping_replaces_connection(factory):
+    pool = ConnectionPool(factory, size=1, max_overflow=0, ping_interval=0)
+    with pool.connection() as conn:
+        conn.ping_ok = False
+    with pool.connection() as fresh:
+        pass
+    assert fresh is not conn and conn.closed
+    assert pool.stats()['discarded'] == 1
+
+
+def test_idle_connections_reaped(factory):
+    pool = ConnectionPool(factory, size=2, max_overflow=0, idle_timeout=0.01)
+    with pool.connection() as conn:
+        pass
+    time.sleep(0.02)
+    pool.reap()
+    assert conn.closed
+    assert pool.stats()['reaped'] == 1 and pool.stats()['open'] == 0
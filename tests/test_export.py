@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+
+import export
+from export import ExportError, build_query
+
+
+class StreamCursor:
+    def __init__(self, rows, log):
+        self.rows = list(rows)
+        self.log = log
+
+    def execute(self, query, params=()):
+        self.log.append(query.split()[0])
+
+    def fetchmany(self, size):
+        self.log.append(size)
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def source(monkeypatch):
+    """export.read_connection serving `source.rows` through an unbuffered cursor."""
+    class Source:
+        rows = []
+        log = []
+
+    @contextmanager
+    def read_connection(primary=False):
+        class Conn:
+            def cursor(self, buffered=True):
+                assert buffered is False
+                return StreamCursor(Source.rows, Source.log)
+        yield Conn()
+
+    monkeypatch.setattr(export, 'read_connection', read_connection)
+    return Source
+
+
+def payment(i):
+    return (i, date(2025, 1, 1), 100.0 * i, 'Card', None, i, 1, 'Hotel', 2)
+
+
+def test_rows_come_in_chunks(source):
+    source.rows = [payment(i) for i in range(1, 8)]
+    chunks = list(export.stream_rows('payments', chunk_size=3))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+    assert [x for x in source.log if isinstance(x, int)] == [3, 3, 3, 3]
+
+
+def test_csv_export(source):
+    source.rows = [payment(i) for i in range(1, 6)]
+    out = io.BytesIO()
+    stats = export.export('payments', 'csv', out, chunk_size=2)
+    assert stats['rows'] == 5
+    lines = list(csv.reader(io.StringIO(out.getvalue().decode())))
+    assert lines[0] == [name for name, _ in export.DATASETS['payments']['columns']]
+    assert len(lines) == 6 and lines[3][0] == '3'
+
+
+def test_jsonl_export(source):
+    source.rows = [payment(i) for i in range(1, 4)]
+    out = io.BytesIO()
+    assert export.export('payments', 'jsonl', out, chunk_size=2)['rows'] == 3
+    records = [json.loads(line) for line in out.getvalue().decode().splitlines()]
+    assert records[2]['pay_id'] == 3 and records[2]['pay_date'] == '2025-01-01'
+
+
+def test_empty_export_writes_header_only(source):
+    out = io.BytesIO()
+    assert export.export('bookings', 'csv', out)['rows'] == 0
+    assert out.getvalue().decode().count('\n') == 1
+
+
+def test_unknown_dataset_or_format():
+    with pytest.raises(ExportError):
+        export.export('guests', 'csv', io.BytesIO())
+    with pytest.raises(ExportError):
+        export.export('payments', 'xlsx', io.BytesIO())
+
+
+def test_build_query_filters_and_archive():
+    query, params = build_query('bookings', {'date_from': date(2025, 1, 1), 'hotel_id': 3})
+    assert "WHERE b.book_date >= %s AND b.hotel_id = %s" in query
+    assert params == (date(2025, 1, 1), 3)
+    assert "FROM Booking b" in query
+    query, params = build_query('payments', {'include_archive': True})
+    assert "FROM vw_payment_all p" in query and "WHERE" not in query and params == ()
@@ -0,0 +1,67 @@
+import pytest
+
+import guest_search
+from guest_search import search_guests
+
+
+def guest(cust_id, name, email=None, mobile=''):
+    return {'cust_id': cust_id, 'cust_name': name, 'cust_email': email or f"g{cust_id}@example.test",
+            'cust_mobile': mobile}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """guest_search reads answered by statement: db['NAME'] = rows; db.queries logs (statement, params)."""
+    class Answers(dict):
+        queries = []
+    answers = Answers()
+    queries = answers.queries = []
+
+    def lookup(query, params=(), **kw):
+        for name in ('BOOKING', 'MOBILE', 'EMAIL', 'NAME'):
+            if query == getattr(guest_search, f"{name}_SQL"):
+                queries.append((name, params))
+                return [dict(r) for r in answers.get(name, [])]
+        raise AssertionError(query)
+
+    monkeypatch.setattr(guest_search, 'fetch_all', lookup)
+    monkeypatch.setattr(guest_search, 'fetch_one', lambda q, p=(), **kw: (lookup(q, p) or [None])[0])
+    return answers
+
+
+def test_short_terms_skip_the_database(db):
+    assert search_guests(' a ') == []
+    assert db.queries == []
+
+
+def test_typo_reranked_by_similarity(db):
+    db['NAME'] = [guest(1, 'Pradeep Iyer'), guest(2, 'Priya Nair'), guest(3, 'Ravi Prakash')]
+    results = search_guests('priay')
+    assert results[0]['cust_id'] == 2 and results[0]['match'] == 'name'
+
+
+def test_prefix_beats_similar_name(db):
+    db['NAME'] = [guest(1, 'Ananya Das'), guest(2, 'Anand Rao')]
+    assert [g['cust_id'] for g in search_guests('anand')] == [2, 1]
+
+
+def test_name_and_email_matches_merge_keeping_best(db):
+    db['NAME'] = [guest(1, 'Meera Shah', 'm.shah@example.test')]
+    db['EMAIL'] = [guest(1, 'Meera Shah', 'meera@example.test'), guest(2, 'Sam Lee', 'meeran@example.test')]
+    results = search_guests('meera')
+    assert [g['cust_id'] for g in results] == [1, 2]
+    assert 'relevance' not in results[0]
+    assert [name for name, _ in db.queries] == ['NAME', 'EMAIL']
+
+
+def test_digits_find_booking_first_then_mobile(db):
+    db['BOOKING'] = [guest(7, 'Booked Guest')]
+    db['MOBILE'] = [guest(8, 'Mobile Guest', mobile='98450000001')]
+    results = search_guests('#9845')
+    assert [(g['cust_id'], g['match']) for g in results] == [(7, 'booking #9845'), (8, 'mobile')]
+    assert db.queries[1] == ('MOBILE', ('9845%', 20))
+
+
+def test_email_prefix_escaped(db):
+    search_guests('a_b@x')
+    assert db.queries == [('EMAIL', ('a\\_b@x%', 20))]
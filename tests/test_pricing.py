@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+
+from pricing import RateTable, class_where
+
+MONDAY = date(2025, 3, 3)
+
+CLASSES = [
+    {'class_id': 1, 'hotel_id': 10, 'class_rent': 1000},
+    {'class_id': 2, 'hotel_id': 10, 'class_rent': 2000},
+    {'class_id': 3, 'hotel_id': 20, 'class_rent': 3000},
+]
+
+
+def rule(rule_type, hotel_id=None, class_id=None, weekdays=None, min_nights=None, adjust_pct=0):
+    return {'rule_type': rule_type, 'hotel_id': hotel_id, 'class_id': class_id,
+            'weekdays': weekdays, 'min_nights': min_nights, 'adjust_pct': adjust_pct}
+
+
+def day(n):
+    return date.fromordinal(MONDAY.toordinal() + n)
+
+
+def table(calendar=(), rules=()):
+    return RateTable(CLASSES, MONDAY, day(14), calendar, rules)
+
+
+def test_plain_rent():
+    q = table().quote(2, day(0), day(3))
+    assert q == {'nights': 3, 'nightly': [2000.0] * 3, 'subtotal': 6000.0, 'adjustment': 0.0, 'total': 6000.0}
+
+
+def test_calendar_overrides_one_night():
+    t = table(calendar=[{'class_id': 1, 'rate_date': day(1), 'rate': 1500},
+                        {'class_id': 1, 'rate_date': day(30), 'rate': 9999}])  # outside the window
+    assert t.quote(1, day(0), day(3))['nightly'] == [1000.0, 1500.0, 1000.0]
+
+
+def test_weekend_uplift_more_specific_rule_wins():
+    t = table(rules=[rule('weekend', weekdays='4,5', adjust_pct=10),
+                     rule('weekend', class_id=3, weekdays='5', adjust_pct=50)])
+    # Thursday .. Sunday
+    assert t.quote(1, day(3), day(7))['nightly'] == [1000.0, 1100.0, 1100.0, 1000.0]
+    assert t.quote(3, day(3), day(7))['nightly'] == [3000.0, 3000.0, 4500.0, 3000.0]
+
+
+def test_length_of_stay_discount():
+    t = table(rules=[rule('length_of_stay', hotel_id=10, min_nights=7, adjust_pct=-10)])
+    long_stay = t.quote(1, day(0), day(7))
+    assert long_stay['subtotal'] == 7000.0
+    assert long_stay['adjustment'] == -700.0 and long_stay['total'] == 6300.0
+    assert t.quote(1, day(0), day(6))['adjustment'] == 0.0
+    assert t.quote(3, day(0), day(7))['adjustment'] == 0.0  # other hotel
+
+
+def test_quote_many_matches_quote():
+    t = table(rules=[rule('weekend', weekdays='5,6', adjust_pct=20)])
+    ins, outs = [day(0), day(4), day(2)], [day(2), day(9), day(3)]
+    subtotal, total = t.quote_many(ins, outs)
+    assert subtotal.shape == (3, 3)
+    for k, c in enumerate(CLASSES):
+        for s, (ci, co) in enumerate(zip(ins, outs)):
+            assert total[k, s] == t.quote(c['class_id'], ci, co)['total']
+
+
+def test_stays_outside_window_rejected():
+    t = table()
+    with pytest.raises(ValueError):
+        t.quote_many([day(10)], [day(15)])
+    with pytest.raises(ValueError):
+        t.quote_many([day(3)], [day(3)])
+    with pytest.raises(ValueError):
+        RateTable(CLASSES, MONDAY, MONDAY)
+
+
+def test_class_where():
+    assert class_where(class_ids=[3, '4']) == "class_id IN (3,4)"
+    assert class_where(hotel_ids=[10]) == "hotel_id IN (10)"
+    assert class_where() == "1 = 1"
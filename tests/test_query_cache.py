@@ -0,0 +1,93 @@
+import database
+from query_cache import QueryCache, cache_key, tables_in, ttl_for, written_tables
+
+
+def test_tables_in_and_ttl():
+    tables = tables_in("SELECT * FROM Hotel h JOIN `Hotel_Class` hc ON hc.hotel_id = h.hotel_id")
+    assert tables == {'hotel', 'hotel_class'}
+    assert ttl_for(tables) == 300
+    assert ttl_for({'hotel', 'booking'}) == 15
+    assert ttl_for({'hotel', 'customer'}) is None
+    assert ttl_for(set()) is None
+
+
+def test_written_tables_follow_triggers():
+    assert written_tables({'rooms'}) == {'rooms', 'room_status_counts'}
+
+
+def test_invalidate_drops_only_matching_tables():
+    cache = QueryCache()
+    cache.put('hotels', [1], 60, {'hotel'})
+    cache.put('rooms', [2], 60, {'rooms', 'hotel'})
+    cache.put('roles', [3], 60, {'roles'})
+    cache.invalidate({'rooms'})
+    assert cache.get('hotels') == (True, [1])
+    assert cache.get('rooms') == (False, None)
+    assert cache.get('roles') == (True, [3])
+    cache.invalidate({'hotel'})
+    assert cache.get('hotels') == (False, None)
+    assert cache.stats()['invalidations'] == 2
+
+
+def test_expired_entry_is_a_miss():
+    cache = QueryCache()
+    cache.put('k', 'v', 0, {'hotel'})
+    assert cache.get('k') == (False, None)
+    assert cache.stats()['expired'] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = QueryCache(max_entries=2)
+    cache.put('a', 1, 60, {'hotel'})
+    cache.put('b', 2, 60, {'hotel'})
+    cache.get('a')
+    cache.put('c', 3, 60, {'hotel'})
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('c') == (True, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_fill_overtaken_by_write_is_not_stored():
+    cache = QueryCache()
+    generation = cache.generation({'rooms'})
+    cache.invalidate({'rooms'})
+    cache.put('k', 'stale', 60, {'rooms'}, generation)
+    assert cache.get('k') == (False, None)
+    assert cache.stats()['stale_fills'] == 1
+
+    generation = cache.generation({'rooms'})
+    cache.clear()
+    cache.put('k', 'stale', 60, {'rooms'}, generation)
+    assert cache.get('k') == (False, None)
+
+    generation = cache.generation({'rooms'})
+    cache.invalidate({'hotel'})
+    cache.put('k', 'fresh', 60, {'rooms'}, generation)
+    assert cache.get('k') == (True, 'fresh')
+
+
+def test_named_params_keyed_by_value():
+    assert cache_key('all', 'q', {'id': 1}) != cache_key('all', 'q', {'id': 2})
+    assert cache_key('all', 'q', {'a': 1, 'b': 2}) == cache_key('all', 'q', {'b': 2, 'a': 1})
+    assert cache_key('all', 'q', [1, 2]) == cache_key('all', 'q', (1, 2))
+
+
+def test_fetch_all_caches_per_named_param_value(fake_db):
+    query = "SELECT hotel_name FROM Hotel WHERE hotel_id = %(id)s"
+    fake_db.responses = [("FROM Hotel", [{'hotel_name': 'A'}])]
+    assert database.fetch_all(query, {'id': 1}, cached=True) == [{'hotel_name': 'A'}]
+    fake_db.responses = [("FROM Hotel", [{'hotel_name': 'B'}])]
+    assert database.fetch_all(query, {'id': 2}, cached=True) == [{'hotel_name': 'B'}]
+    assert database.fetch_all(query, {'id': 1}, cached=True) == [{'hotel_name': 'A'}]
+    assert len(fake_db.executed) == 2
+
+
+def test_write_invalidates_cached_reads(fake_db):
+    fake_db.responses = [("FROM Hotel", [{'hotel_name': 'A'}])]
+    database.fetch_all("SELECT hotel_name FROM Hotel", cached=True)
+    database.fetch_all("SELECT hotel_name FROM Hotel", cached=True)
+    assert len(fake_db.executed) == 1
+    database.execute("UPDATE Hotel SET hotel_name = %s WHERE hotel_id = %s", ('B', 1))
+    database.fetch_all("SELECT hotel_name FROM Hotel", cached=True)
+    assert len(fake_db.executed) == 3
@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+
+import rooms
+
+TODAY = date(2025, 6, 10)
+
+
+def test_nightly_steps_in_order_with_their_dates(fake_db):
+    fake_db.responses = [
+        ("SET stay_status = 'CheckedOut'", [{}] * 4),
+        ("SET stay_status = 'NoShow'", [{}] * 2),
+        ("SET stay_status = 'Arriving'", [{}] * 5),
+        ("UPDATE Rooms r", [{}] * 7),
+    ]
+    report = rooms.run_nightly(TODAY)
+    assert [(s['step'], s['rows']) for s in report['steps']] == [
+        ('departures', 4), ('no_shows', 2), ('arrivals', 5), ('room_status', 7)]
+    lookback = TODAY - timedelta(days=rooms.NO_SHOW_LOOKBACK_DAYS)
+    assert [params for _, params in fake_db.executed] == [
+        (TODAY,), (lookback, TODAY), (TODAY,), (TODAY, TODAY)]
+
+
+def test_second_run_changes_nothing(fake_db):
+    report = rooms.run_nightly(TODAY)
+    assert all(s['rows'] == 0 for s in report['steps'])
+
+
+def test_no_shows_keep_their_booking_status():
+    changes = rooms.NO_SHOWS_SQL.split("WHERE")[0]
+    assert "stay_status = 'NoShow'" in changes
+    assert "booking_status" not in changes
+
+
+def test_check_in(fake_db):
+    fake_db.responses = [("SET b.stay_status = 'CheckedIn'", [{}])]
+    assert rooms.check_in(42) is True
+    assert fake_db.executed[-1][1] == (42,)
+    fake_db.responses = []
+    assert rooms.check_in(43) is False
+
+
+def test_status_counts(fake_db):
+    fake_db.responses = [("Room_Status_Counts", [{'room_status': 'Available', 'cnt': 5},
+                                                  {'room_status': 'Occupied', 'cnt': 3},
+                                                  {'room_status': 'Maintenance', 'cnt': 1}])]
+    assert rooms.room_status_counts(2) == {'available': 5, 'occupied': 3, 'reserved': 0,
+                                           'maintenance': 1, 'total_rooms': 9}
+    assert fake_db.executed[-1][1] == (2,)
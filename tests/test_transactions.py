@@ -0,0 +1,46 @@
+import pytest
+from mysql.connector import Error
+
+import database
+
+
+def test_commit_once_and_invalidate_written_tables(fake_db):
+    fake_db.responses = [("FROM Hotel", [{'hotel_name': 'A'}])]
+    database.fetch_all("SELECT hotel_name FROM Hotel", cached=True)
+    with database.transaction() as tx:
+        tx.execute("UPDATE Hotel SET hotel_name = %s", ('B',))
+        tx.execute("INSERT INTO Rooms (hotel_id) VALUES (%s)", (1,))
+    assert tx.written >= {'hotel', 'rooms', 'room_status_counts'}
+    database.fetch_all("SELECT hotel_name FROM Hotel", cached=True)
+    assert len(fake_db.executed) == 4
+
+
+def test_rollback_on_error(fake_db):
+    with pytest.raises(ValueError):
+        with database.transaction() as tx:
+            tx.execute("UPDATE Hotel SET hotel_name = %s", ('B',))
+            raise ValueError("stop")
+    conn = fake_db.made[0]
+    assert not conn.in_transaction
+
+
+def test_savepoint_rolls_back_only_its_statements(fake_db):
+    with database.transaction() as tx:
+        tx.execute("INSERT INTO `User` (user_name) VALUES (%s)", ('a',))
+        with pytest.raises(ValueError):
+            with tx.savepoint():
+                tx.execute("INSERT INTO User_Roles (user_id) VALUES (%s)", (1,))
+                raise ValueError("duplicate role")
+        with tx.savepoint():
+            tx.execute("INSERT INTO User_Roles (user_id) VALUES (%s)", (2,))
+    assert [q for q, _ in fake_db.executed if 'SAVEPOINT' in q] == [
+        'SAVEPOINT sp_1', 'ROLLBACK TO SAVEPOINT sp_1', 'SAVEPOINT sp_2', 'RELEASE SAVEPOINT sp_2']
+
+
+def test_savepoint_keeps_original_error_when_rollback_fails(fake_db):
+    lost = Error(msg="Lost connection to MySQL server", errno=2013)
+    fake_db.errors = [("ROLLBACK TO SAVEPOINT", lost)]
+    with pytest.raises(ValueError, match="the real problem"):
+        with database.transaction() as tx:
+            with tx.savepoint():
+                raise ValueError("the real problem")